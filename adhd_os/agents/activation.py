@@ -1,156 +1,101 @@
+import functools
+
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
 
+from adhd_os.agents.callbacks import (
+    inject_context_before_model, response_cache_after_model, response_cache_before_model
+)
 from adhd_os.config import MODELS, get_model, MODEL_MODE
+from adhd_os.models.providers import get_llm
+from adhd_os.models.schemas import DecompositionPlan
 from adhd_os.tools.common import (
-    get_user_state, get_current_time, log_activation_attempt,
+    log_activation_attempt,
     check_task_cache, apply_time_calibration, activate_body_double,
     pause_body_double, resume_body_double, end_body_double,
     get_body_double_status, store_task_decomposition
 )
 
-task_init_agent = LlmAgent(
-    name="task_initiation_agent",
-    model=LiteLlm(model=MODELS["emotional"]),  # Claude for nuanced barrier detection
-    
-    description="""
-    Specialist for overcoming task initiation paralysis.
-    Triggers: "stuck", "can't start", "avoiding", "procrastinating", "don't want to"
-    """,
-    
-    instruction="""
-    You are a Task Initiation Specialist for someone with ADHD.
-    Your ONLY job is to help them START—not plan, not strategize, just START.
-    
-    PROCESS:
-    1. Use get_user_state to understand their current energy and context.
-    
-    2. Identify the ACTUAL barrier (often different from stated):
-       - "Unclear scope" → They don't know what "done" looks like
-       - "Boring/tedious" → No dopamine, needs novelty injection
-       - "Scary/high-stakes" → Fear of failure or judgment
-       - "Too big" → Overwhelm, needs microscopic first step
-       - "Low energy" → Task exceeds current capacity
-       - "Perfectionism" → Can't start until they can do it perfectly
-       
-    3. Generate the SMALLEST possible action:
-       - Must take ≤5 minutes
-       - Must be unambiguous ("open the file" not "get started")
-       - Must not require decisions
-       
-    4. Provide an ACTIVATION PHRASE:
-       "I'm just going to [specific action]."
-       
-    5. Log with log_activation_attempt for pattern learning.
-    
-    GOOD first steps:
-    ✓ "Open the QBR template file" 
-    ✓ "Write the subject line only"
-    ✓ "Set a 10-minute timer and commit to that only"
-    ✓ "Put your phone in another room"
-    
-    BAD first steps:
-    ✗ "Start working on the QBR" (too vague)
-    ✗ "Review the data and create an outline" (multiple steps)
-    ✗ "Think about what you want to accomplish" (requires decisions)
-    
-    Be warm but direct. No lectures. Just the tiny next step.
-    """,
-    
-    tools=[get_user_state, get_current_time, log_activation_attempt],
-)
+TASK_INIT_INSTRUCTION = """\
+You help an ADHD user START a task. Not plan, not strategize: start.
+1. Read energy and context from the <context> block.
+2. Name the real barrier: unclear scope, boring (no dopamine), scary/high-stakes, too big, low energy, or perfectionism.
+3. Give ONE first action: <=5 min, unambiguous, no decisions needed.
+4. Give an activation phrase: "I'm just going to [action]."
+5. Call log_activation_attempt.
+ok: "Open the QBR template file", "Write the subject line only", "Set a 10-minute timer".
+no: "Start working on the QBR" (vague), "Review data and outline" (2 steps), "Think about goals" (decision).
+Warm, direct, no lectures."""
 
-from adhd_os.models.schemas import DecompositionPlan
+DECOMPOSER_INSTRUCTION = """\
+You break tasks into steps small enough to bypass ADHD executive-function resistance.
+1. Call check_task_cache; if a plan exists, return it.
+2. Read energy from the <context> block, then call apply_time_calibration.
+3. Steps: <=10 min each (<=5 if energy <=4, larger chunks ok if >=8), each with a clear done-state, easy steps first.
+4. Add a checkpoint step (stand, stretch, water) every 20-30 min.
+5. List rabbit-hole risks with a prevention for each; activation_phrase is "I'm just going to [step 1]."
+6. Call store_task_decomposition with the plan."""
 
-decomposer_agent = LlmAgent(
-    name="task_decomposer_agent",
-    model=LiteLlm(model=get_model("decomposer", MODEL_MODE)),
-    output_schema=DecompositionPlan,
-    
-    description="""
-    Breaks complex tasks into ADHD-friendly microscopic steps.
-    Triggers: "break down", "decompose", "too big", tasks estimated >30 min
-    """,
-    
-    instruction="""
-    You are a Task Decomposition Specialist for ADHD brains.
-    Your job is to make the invisible visible—break tasks into steps so small
-    they bypass executive function resistance.
-    
-    PROTOCOL:
-    1. FIRST: Check cache with check_task_cache. If found, return cached plan.
-    
-    2. Get user state with get_user_state for energy and multiplier context.
-    
-    3. Apply time calibration using apply_time_calibration.
-    
-    4. Generate decomposition following these rules:
-       - Each step ≤10 minutes (ideally ≤5 for low energy)
-       - Each step has CLEAR completion state
-       - CHECKPOINTS every 20-30 minutes (stand, stretch, water)
-       - Front-load easy steps (build momentum)
-       - Flag rabbit hole risks
-    
-    OUTPUT FORMAT:
-    ```
-    🎯 TASK: [Task Name]
-    ⏱️ Your estimate: [X] min → Calibrated: [Y] min (×[multiplier])
-    
-    □ Step 1 (X min): [Specific action with clear end state]
-    □ Step 2 (X min): [Specific action with clear end state]
-    □ Step 3 (X min): [Specific action with clear end state]
-       ↳ CHECKPOINT: Stand, stretch, water
-    □ Step 4 (X min): [Specific action with clear end state]
-    ...
-    
-    ⚠️ RABBIT HOLE RISKS:
-    - [What might distract them] → [Prevention strategy]
-    
-    🏁 Activation phrase: "I'm just going to [Step 1]."
-    ```
-    
-    For low energy (≤4): Make steps even smaller, add more checkpoints.
-    For high energy (≥8): Can use slightly larger chunks.
-    """,
-    
-    tools=[get_user_state, check_task_cache, apply_time_calibration, get_current_time, store_task_decomposition],
-)
+BODY_DOUBLE_INSTRUCTION = """\
+You start and manage the deterministic body-double machine; it sends check-ins itself.
+Confirm task, duration (default 30 min) and check-in interval (default 10 min), then call activate_body_double.
+status -> get_body_double_status; pause -> pause_body_double; resume -> resume_body_double; done/stop -> end_body_double.
+Keep replies brief."""
 
-body_double_agent = LlmAgent(
-    name="body_double_agent",
-    model=LiteLlm(model=MODELS["temporal"]),  # Gemini Flash - just routing to machine
-    
-    description="""
-    Provides virtual body-doubling for accountability.
-    Triggers: "body double", "stay with me", "accountability", "work together"
-    """,
-    
-    instruction="""
-    You activate the body double system for accountability.
-    
-    PROCESS:
-    1. Confirm the task, duration, and check-in preference.
-    2. Use activate_body_double tool to start the deterministic machine.
-    3. The machine handles check-ins automatically (no LLM needed).
-    
-    DEFAULT VALUES:
-    - Duration: 30 minutes
-    - Check-in interval: 10 minutes
-    
-    If user asks for status, use get_body_double_status.
-    If user says "pause", use pause_body_double.
-    If user says "resume", use resume_body_double.
-    If user says "done" or "stop", use end_body_double.
 
-    Keep responses brief. The machine does the work.
-    """,
-    
-    tools=[
-        activate_body_double,
-        pause_body_double,
-        resume_body_double,
-        end_body_double,
-        get_body_double_status,
-        get_current_time,
-    ],
-)
+@functools.lru_cache(maxsize=None)
+def get_task_init_agent() -> LlmAgent:
+    return LlmAgent(
+        name="task_initiation_agent",
+        before_model_callback=[response_cache_before_model, inject_context_before_model],
+        after_model_callback=response_cache_after_model,
+        model=get_llm(MODELS["emotional"]),  # Claude for nuanced barrier detection
+        description='Overcomes task-initiation paralysis. Triggers: "stuck", "can\'t start", "avoiding", "procrastinating".',
+        instruction=TASK_INIT_INSTRUCTION,
+        tools=[log_activation_attempt],
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_decomposer_agent() -> LlmAgent:
+    return LlmAgent(
+        name="task_decomposer_agent",
+        model=get_llm(get_model("decomposer", MODEL_MODE)),
+        output_schema=DecompositionPlan,
+        description='Breaks big tasks into ADHD-sized steps. Triggers: "break down", "decompose", "too big", tasks >30 min.',
+        instruction=DECOMPOSER_INSTRUCTION,
+        before_model_callback=inject_context_before_model,
+        tools=[check_task_cache, apply_time_calibration, store_task_decomposition],
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_body_double_agent() -> LlmAgent:
+    return LlmAgent(
+        name="body_double_agent",
+        model=get_llm(MODELS["temporal"]),  # Gemini Flash - just routing to machine
+        description='Virtual body-doubling for accountability. Triggers: "body double", "stay with me", "work together".',
+        instruction=BODY_DOUBLE_INSTRUCTION,
+        before_model_callback=inject_context_before_model,
+        tools=[
+            activate_body_double,
+            pause_body_double,
+            resume_body_double,
+            end_body_double,
+            get_body_double_status,
+        ],
+    )
+
+
+_AGENT_BUILDERS = {
+    "task_init_agent": get_task_init_agent,
+    "decomposer_agent": get_decomposer_agent,
+    "body_double_agent": get_body_double_agent,
+}
+
+
+def __getattr__(name: str):
+    """Resolve legacy module-level agent names to their cached instances."""
+    builder = _AGENT_BUILDERS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return builder()
@@ -0,0 +1,146 @@
+import json
+import logging
+from typing import List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from adhd_os.infrastructure.cache import RESPONSE_CACHE
+from adhd_os.state import USER_STATE
+from adhd_os.tools.common import get_current_time, get_user_state
+
+logger = logging.getLogger(__name__)
+
+
+def _user_text(callback_context: CallbackContext) -> str:
+    parts = getattr(callback_context.user_content, "parts", None) or []
+    return " ".join(part.text for part in parts if getattr(part, "text", None)).strip()
+
+
+def _awaiting_tool_result(llm_request: LlmRequest) -> bool:
+    """True when the model is being re-invoked with a tool result mid-turn."""
+    if not llm_request.contents:
+        return False
+    parts = llm_request.contents[-1].parts or []
+    return any(part.function_response for part in parts)
+
+
+def _agent_used_tools(callback_context: CallbackContext) -> bool:
+    """True when this agent already called a tool during the current invocation.
+
+    A reply written after a tool ran depends on that side effect, so serving it
+    from cache later would skip the tool.
+    """
+    invocation_id = callback_context.invocation_id
+    for event in reversed(callback_context.session.events):
+        if event.invocation_id != invocation_id:
+            break
+        if event.author == callback_context.agent_name and (
+            event.get_function_calls() or event.get_function_responses()
+        ):
+            return True
+    return False
+
+
+def _previous_reply(callback_context: CallbackContext) -> str:
+    """Text of the last model turn before this invocation; empty when the user opened."""
+    invocation_id = callback_context.invocation_id
+    for event in reversed(callback_context.session.events):
+        if event.invocation_id == invocation_id or event.author == "user" or event.partial:
+            continue
+        parts = event.content.parts if event.content else None
+        text = "".join(part.text or "" for part in parts or [] if not part.thought)
+        if text.strip():
+            return text
+    return ""
+
+
+def _latest_user_turn_index(contents: List[types.Content]) -> int:
+    """Index of the newest user message with text (tool results don't count), else 0."""
+    for index in range(len(contents) - 1, -1, -1):
+        content = contents[index]
+        if content.role == "user" and any(part.text for part in content.parts or []):
+            return index
+    return 0
+
+
+def inject_context_before_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Adds current time and user state so agents never spend a tool round-trip on them.
+
+    The block goes just before the latest user turn, not at the top, so the
+    earlier history stays a stable prefix for provider prompt caching.
+    """
+    context = json.dumps(
+        {"now": get_current_time.func(), "user_state": get_user_state.func()},
+        default=str,
+        separators=(",", ":"),
+    )
+    llm_request.contents.insert(
+        _latest_user_turn_index(llm_request.contents),
+        types.Content(role="user", parts=[types.Part(text=f"<context>{context}</context>")]),
+    )
+    return None
+
+
+def response_cache_before_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Short-circuits the LLM when a near-identical prompt was already answered."""
+    if _awaiting_tool_result(llm_request) or _agent_used_tools(callback_context):
+        return None
+
+    prompt = _user_text(callback_context)
+    if not prompt:
+        return None
+
+    try:
+        cached = RESPONSE_CACHE.get(
+            callback_context.agent_name,
+            prompt,
+            USER_STATE.energy_level,
+            previous_reply=_previous_reply(callback_context),
+        )
+    except Exception as exc:
+        logger.warning("Response cache lookup failed: %s", exc)
+        return None
+    if cached is None:
+        return None
+
+    logger.debug("[CACHE] Serving cached %s reply", callback_context.agent_name)
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=cached)]),
+        turn_complete=True,
+    )
+
+
+def response_cache_after_model(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """Stores final text replies of tool-free turns so later repeats can skip the LLM."""
+    if llm_response.partial or llm_response.error_code or llm_response.content is None:
+        return None
+
+    parts = llm_response.content.parts or []
+    if not parts or any(part.function_call for part in parts):
+        return None
+    if _agent_used_tools(callback_context):
+        return None
+
+    text = "".join(part.text or "" for part in parts)
+    prompt = _user_text(callback_context)
+    if prompt and text.strip():
+        try:
+            RESPONSE_CACHE.store(
+                callback_context.agent_name,
+                prompt,
+                USER_STATE.energy_level,
+                text,
+                previous_reply=_previous_reply(callback_context),
+            )
+        except Exception as exc:
+            logger.warning("Response cache store failed: %s", exc)
+    return None
@@ -0,0 +1,82 @@
+import logging
+import re
+from typing import Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from adhd_os.agents.callbacks import _user_text
+
+logger = logging.getLogger(__name__)
+
+
+def _keywords(*phrases: str) -> "re.Pattern[str]":
+    return re.compile(r"\b(?:" + "|".join(phrases) + r")\b", re.IGNORECASE)
+
+
+# Trigger phrases from the orchestrator's routing table, one pattern per agent.
+ROUTES: Dict[str, "re.Pattern[str]"] = {
+    "task_initiation_agent": _keywords(r"stuck", r"can'?t (?:get )?start(?:ed)?", r"avoiding", r"procrastinat\w*"),
+    "task_decomposer_agent": _keywords(r"break (?:it |this |that )?down", r"decompose", r"too big"),
+    "body_double_agent": _keywords(r"body[- ]?doubl\w*", r"stay with me", r"work (?:together|with me)"),
+    "time_calibrator_agent": _keywords(r"how long", r"time check", r"realistic(?:ally)?"),
+    "calendar_agent": _keywords(r"schedul\w*", r"calendar", r"block (?:out )?time", r"when should i"),
+    "focus_timer_agent": _keywords(r"focus session", r"hyperfocus\w*", r"hard stop", r"guardrails?"),
+    "reflector_agent": _keywords(r"review", r"critique", r"what am i missing", r"sanity check"),
+    "catastrophe_check_agent": _keywords(
+        r"worr(?:y|ied|ying)", r"anxious", r"anxiety", r"disaster\w*", r"ruined", r"fail(?:ed|ing|ure)?", r"stressed"
+    ),
+    "rsd_shield_agent": _keywords(
+        r"hates? me", r"(?:angry|mad) at me", r"disappointed in me", r"rejected", r"criticized"
+    ),
+    "motivation_agent": _keywords(r"boring", r"bored", r"motivat\w*", r"make (?:it|this) interesting", r"hate this"),
+}
+
+# Turns the orchestrator handles itself: commands and completion logging.
+_ORCHESTRATOR_ONLY = _keywords(
+    r"shutdown", r"morning activation", r"status", r"(?:i )?finished", r"done with", r"completed"
+)
+
+
+def match_route(text: str) -> Optional[str]:
+    """Returns the single agent whose triggers match *text*, or None if zero or several do."""
+    text = text.replace("’", "'")
+    if _ORCHESTRATOR_ONLY.search(text):
+        return None
+    matches = [agent_name for agent_name, pattern in ROUTES.items() if pattern.search(text)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def fast_route_before_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Transfers keyword-shaped turns straight to a specialist without a routing LLM call."""
+    if not llm_request.contents:
+        return None
+    prompt = _user_text(callback_context)
+    last = llm_request.contents[-1]
+    last_text = " ".join(part.text for part in last.parts or [] if part.text).strip()
+    # Only the opening call of a turn: not a tool round-trip or a hand-back from a sub-agent.
+    if not prompt or last.role != "user" or last_text != prompt:
+        return None
+
+    agent_name = match_route(prompt)
+    if agent_name is None:
+        return None
+
+    logger.debug("[ROUTER] Fast-routing to %s", agent_name)
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        name="transfer_to_agent", args={"agent_name": agent_name}
+                    )
+                )
+            ],
+        ),
+        turn_complete=True,
+    )
@@ -1,133 +1,127 @@
-from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+import functools
 
+from google.adk.agents import LlmAgent, ParallelAgent
+
+from adhd_os.agents.callbacks import inject_context_before_model
+from adhd_os.agents.fast_router import fast_route_before_model
 from adhd_os.config import MODELS
+from adhd_os.models.providers import get_llm
+from adhd_os.models.schemas import SessionSummary
 from adhd_os.tools.common import (
-    get_user_state, get_current_time, update_user_state, get_body_double_status, log_task_completion
+    update_user_state, get_body_double_status, log_task_completion
 )
 
 # Import sub-agents
 from adhd_os.agents.activation import (
-    task_init_agent, decomposer_agent, body_double_agent
+    get_task_init_agent, get_decomposer_agent, get_body_double_agent
 )
 from adhd_os.agents.temporal import (
-    time_calibrator_agent, calendar_agent, focus_timer_agent
+    get_time_calibrator_agent, get_calendar_agent, get_focus_timer_agent
 )
 from adhd_os.agents.emotional import (
-    catastrophe_agent, rsd_agent, motivation_agent
-)
-from adhd_os.agents.reflector import reflector_agent
-from adhd_os.agents.pattern_analysis import pattern_analysis_agent
-
-session_summarizer = LlmAgent(
-    name="session_summarizer",
-    model=LiteLlm(model=MODELS["temporal"]),  # Fast summarization
-    
-    description="Compresses session context for storage and handoff.",
-    
-    instruction="""
-    Summarize the current session into a compact JSON object:
-    
-    {
-        "session_date": "YYYY-MM-DD",
-        "energy_trajectory": "started X, ended Y",
-        "tasks_discussed": ["task1", "task2"],
-        "tasks_completed": ["task1"],
-        "accomplishments": ["Small win 1", "Big win 2"],
-        "narrative_summary": "A warm, encouraging paragraph celebrating what was done, even if it was just 'showing up'.",
-        "barriers_encountered": ["type1", "type2"],
-        "interventions_used": ["intervention1"],
-        "open_loops": ["things still pending"],
-        "notable_patterns": ["any recurring themes"],
-        "tomorrow_priorities": ["if discussed"]
-    }
-    
-    The 'narrative_summary' should be written directly to the user, validating their effort.
-    """,
-    
-    tools=[get_user_state],
+    get_catastrophe_agent, get_rsd_agent, get_motivation_agent
 )
+from adhd_os.agents.reflector import get_reflector_agent
+from adhd_os.agents.pattern_analysis import build_pattern_analysis_agent, get_pattern_analysis_agent
 
-orchestrator = LlmAgent(
-    name="adhd_os_orchestrator",
-    model=LiteLlm(model=MODELS["orchestrator"]),  # Gemini Flash for fast routing
-    
-    description="Root orchestrator for ADHD Operating System v2.1",
-    
-    instruction="""
-    You are the central coordinator of an executive function support system
-    for someone with ADHD. Route requests to the appropriate specialist.
-    
-    ROUTING RULES:
-    
-    ACTIVATION CLUSTER (getting started):
-    - "stuck", "can't start", "avoiding" → task_initiation_agent
-    - "break down", "too big", "decompose" → task_decomposer_agent
-    - "body double", "stay with me" → body_double_agent
-    
-    TEMPORAL CLUSTER (time management):
-    - "how long", "time check", "realistic" → time_calibrator_agent
-    - "schedule", "calendar", "when should" → calendar_agent
-    - "focus session", "hyperfocus", "guardrail" → focus_timer_agent
-    
-    REFLECTOR CLUSTER (planning & critique):
-    - "review", "critique", "what am i missing", "sanity check", "plan check" → reflector_agent
-    
-    EMOTIONAL CLUSTER (regulation):
-    - worry, anxiety, "disaster", "fail" → catastrophe_check_agent
-    - "hate me", "rejected", "criticized" → rsd_shield_agent
-    - "boring", "motivate", "interesting" → motivation_agent
-    
-    SPECIAL COMMANDS:
-    - "morning activation" → Run morning protocol (ask energy, meds, priorities)
-    - "shutdown" → Run pattern_analysis_agent, then session_summarizer, then end
-    - "status" → Report current state and any active sessions
-    
-    TASK COMPLETION:
-    - If the user says "I finished [task]" or "Done with [task]":
-      1. CELEBRATE! (Dopamine hit)
-      2. ASK: "How long did that actually take?" (Crucial for calibration)
-      3. Once they answer, use `log_task_completion` tool.
-    
-    For morning activation, ask:
-    1. Energy level (1-10)?
-    2. Did you take medication? What time?
-    3. What are today's top 3 priorities?
-    4. Any anxiety or blockers?
-    
-    Then create a day structure optimized for their peak window.
-    
-    CONTEXT AWARENESS:
-    - Check get_user_state before routing emotional issues (low energy amplifies anxiety)
-    - If user seems to be spiraling (repeated questions), gently note the pattern
-    - If user is avoiding (long gaps, topic-switching), name it compassionately
-    
-    Be warm but direct. Prefer action over discussion.
-    """,
-    
-    sub_agents=[
-        # Activation Cluster
-        task_init_agent,
-        decomposer_agent,
-        body_double_agent,
-        
-        # Temporal Cluster
-        time_calibrator_agent,
-        calendar_agent,
-        focus_timer_agent,
-        
-        # Reflector Cluster
-        reflector_agent,
-        pattern_analysis_agent,
-        
-        # Emotional Cluster
-        catastrophe_agent,
-        rsd_agent,
-        motivation_agent,
-        
-        # Utility
-        session_summarizer,
-    ],
-    
-    tools=[get_user_state, get_current_time, update_user_state, get_body_double_status, log_task_completion],
-)
+SESSION_SUMMARIZER_INSTRUCTION = """\
+Summarize the session for storage and handoff. Keep list items short.
+narrative_summary is a warm paragraph written to the user that celebrates what got done, even if it was just showing up."""
+
+ORCHESTRATOR_INSTRUCTION = """\
+You coordinate an executive-function support system for someone with ADHD. Route each request to a specialist:
+- stuck / can't start / avoiding -> task_initiation_agent
+- break down / too big / decompose -> task_decomposer_agent
+- body double / stay with me -> body_double_agent
+- how long / time check / realistic -> time_calibrator_agent
+- schedule / calendar / when should -> calendar_agent
+- focus session / hyperfocus / guardrail -> focus_timer_agent
+- review / critique / what am i missing / sanity check -> reflector_agent
+- worry / anxiety / disaster / fail -> catastrophe_check_agent
+- hate me / rejected / criticized -> rsd_shield_agent
+- boring / motivate / interesting -> motivation_agent
+Commands:
+- "morning activation": ask energy (1-10), medication and time, top 3 priorities, blockers; then build a day around the peak window.
+- "shutdown": pattern_analysis_agent and session_summarizer, then end.
+- "status": report current state and active sessions.
+Task completion ("I finished X" / "done with X"): celebrate, ask how long it actually took, then call log_task_completion.
+Check energy in the <context> block before routing emotional issues (low energy amplifies anxiety). Gently name spiraling or avoidance.
+Warm but direct; prefer action over discussion."""
+
+
+def build_session_summarizer() -> LlmAgent:
+    """Builds a fresh instance; an ADK agent can only belong to one parent."""
+    return LlmAgent(
+        name="session_summarizer",
+        model=get_llm(MODELS["temporal"]),  # Fast summarization
+        output_schema=SessionSummary,
+        output_key="session_summary",
+        description="Compresses session context for storage and handoff.",
+        instruction=SESSION_SUMMARIZER_INSTRUCTION,
+        before_model_callback=inject_context_before_model,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_session_summarizer() -> LlmAgent:
+    return build_session_summarizer()
+
+
+@functools.lru_cache(maxsize=None)
+def get_shutdown_agent() -> ParallelAgent:
+    """Shutdown fan-out: pattern analysis and the session summary run concurrently."""
+    return ParallelAgent(
+        name="shutdown_fanout",
+        description="Runs end-of-session pattern analysis and summarization in parallel.",
+        sub_agents=[build_pattern_analysis_agent(), build_session_summarizer()],
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_orchestrator() -> LlmAgent:
+    return LlmAgent(
+        name="adhd_os_orchestrator",
+        model=get_llm(MODELS["orchestrator"]),  # Gemini Flash for fast routing
+        description="Root orchestrator for ADHD Operating System v2.1",
+        instruction=ORCHESTRATOR_INSTRUCTION,
+        sub_agents=[
+            # Activation Cluster
+            get_task_init_agent(),
+            get_decomposer_agent(),
+            get_body_double_agent(),
+
+            # Temporal Cluster
+            get_time_calibrator_agent(),
+            get_calendar_agent(),
+            get_focus_timer_agent(),
+
+            # Reflector Cluster
+            get_reflector_agent(),
+            get_pattern_analysis_agent(),
+
+            # Emotional Cluster
+            get_catastrophe_agent(),
+            get_rsd_agent(),
+            get_motivation_agent(),
+
+            # Utility
+            get_session_summarizer(),
+        ],
+        before_model_callback=[fast_route_before_model, inject_context_before_model],
+        tools=[update_user_state, get_body_double_status, log_task_completion],
+    )
+
+
+_AGENT_BUILDERS = {
+    "session_summarizer": get_session_summarizer,
+    "orchestrator": get_orchestrator,
+    "shutdown_agent": get_shutdown_agent,
+}
+
+
+def __getattr__(name: str):
+    """Resolve legacy module-level agent names to their cached instances."""
+    builder = _AGENT_BUILDERS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return builder()
@@ -1,37 +1,68 @@
+import asyncio
+import functools
+from typing import Optional
+
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
-
-from adhd_os.config import MODELS, get_model, MODEL_MODE
-from adhd_os.tools.common import get_recent_history, get_user_state
-
-pattern_analysis_agent = LlmAgent(
-    name="pattern_analysis_agent",
-    model=LiteLlm(model=MODELS["temporal"]),  # Gemini Flash for data analysis
-    
-    description="Analyzes task history to find patterns and correlations.",
-    
-    instruction="""
-    You are the Pattern Recognition Specialist.
-    Your job is to analyze the user's task history and find hidden correlations.
-    
-    DATA SOURCES:
-    - get_recent_history(): Returns list of recent tasks with estimates, actuals, energy, etc.
-    - get_user_state(): Returns current context.
-    
-    ANALYSIS GOALS:
-    1. **Time Blindness**: Are they consistently underestimating specific task types?
-       - "You tend to underestimate 'Coding' tasks by 40%."
-    2. **Energy Correlation**: Does low energy (<4) lead to specific failures?
-       - "When energy is below 4, you avoid 'Admin' tasks."
-    3. **Peak Window**: How much more efficient are they in their peak window?
-       - "You are 2x faster during your peak window."
-       
-    OUTPUT:
-    Provide a bulleted list of 1-3 key insights. Be specific with numbers.
-    If no strong patterns found, say "Not enough data yet for strong patterns."
-    
-    Tone: Objective, scientific, but encouraging. "Data is neutral."
-    """,
-    
-    tools=[get_recent_history, get_user_state],
-)
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from adhd_os.agents.callbacks import inject_context_before_model
+from adhd_os.config import get_model, MODEL_MODE
+from adhd_os.infrastructure.database import DB
+from adhd_os.models.providers import get_llm
+from adhd_os.tools.common import get_recent_history
+
+PATTERN_ANALYSIS_INSTRUCTION = """\
+You find patterns in the user's task history (get_recent_history: estimates, actuals, energy, peak window; the <context> block: current state).
+Look for:
+1. Time blindness by task type (e.g. "You underestimate 'Coding' by 40%.").
+2. Energy correlations (e.g. "Below energy 4 you avoid 'Admin' tasks.").
+3. Peak-window efficiency (e.g. "You are 2x faster in your peak window.").
+Output 1-3 bullet insights with specific numbers, or "Not enough data yet for strong patterns."
+Objective but encouraging: data is neutral."""
+
+
+async def route_model_before_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Picks Flash or Pro per run from the current history size.
+
+    The agent instance is cached for the life of the process, so the
+    escalation has to follow history growth here rather than at build time.
+    """
+    history_size = await asyncio.to_thread(DB.get_task_history_count)
+    llm_request.model = get_llm(get_model("pattern_analysis", MODEL_MODE, history_size=history_size)).model
+    return None
+
+
+def build_pattern_analysis_agent() -> LlmAgent:
+    """Builds a fresh instance; an ADK agent can only belong to one parent."""
+    return LlmAgent(
+        name="pattern_analysis_agent",
+        # Flash for typical history sizes; route_model_before_model escalates to
+        # Pro once there is enough data to mine.
+        model=get_llm(get_model("pattern_analysis", MODEL_MODE)),
+        description="Analyzes task history to find patterns and correlations.",
+        instruction=PATTERN_ANALYSIS_INSTRUCTION,
+        before_model_callback=[route_model_before_model, inject_context_before_model],
+        tools=[get_recent_history],
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_pattern_analysis_agent() -> LlmAgent:
+    return build_pattern_analysis_agent()
+
+
+_AGENT_BUILDERS = {
+    "pattern_analysis_agent": get_pattern_analysis_agent,
+}
+
+
+def __getattr__(name: str):
+    """Resolve legacy module-level agent names to their cached instances."""
+    builder = _AGENT_BUILDERS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return builder()
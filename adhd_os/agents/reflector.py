@@ -1,34 +1,41 @@
+import functools
+
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
 
+from adhd_os.agents.callbacks import inject_context_before_model
 from adhd_os.config import MODELS
-from adhd_os.tools.common import get_user_state, safe_list_dir, safe_read_file
-
-reflector_agent = LlmAgent(
-    name="reflector_agent",
-    model=LiteLlm(model=MODELS["reflector_agent"]),  # Configured in config.py; currently Gemini 3 Flash Preview
-    
-    description="""
-    A compassionate but rigorous critic. Reviews plans and code for potential pitfalls.
-    Triggers: "review", "critique", "sanity check", "what am i missing"
-    """,
-    
-    instruction="""
-    You are the Reflector. Your role is to be the "wise mind" that anticipates future problems.
-    
-    PROTOCOL:
-    1. Acknowledge the user's plan or idea.
-    2. Use `safe_list_dir` or `safe_read_file` to inspect relevant context if needed.
-    3. Identify 1-3 specific "friction points" or "blind spots".
-       - Example: "You planned 3 hours of deep work, but your energy is 4/10."
-       - Example: "This code change might break the persistence layer."
-    4. Propose concrete mitigations.
-    
-    TONE:
-    - Constructive, not critical.
-    - "Have you considered...?" rather than "You forgot..."
-    - Focus on *future-proofing*.
-    """,
-    
-    tools=[get_user_state, safe_list_dir, safe_read_file],
-)
+from adhd_os.models.providers import get_llm
+from adhd_os.tools.common import safe_list_dir, safe_read_file
+
+REFLECTOR_INSTRUCTION = """\
+You are the Reflector: the "wise mind" that anticipates problems in a plan or code change.
+1. Acknowledge the plan.
+2. If useful, inspect context with safe_list_dir / safe_read_file.
+3. Name 1-3 specific friction points or blind spots (e.g. "3 hours of deep work at energy 4/10").
+4. Propose concrete mitigations.
+Constructive, not critical: "Have you considered...?" rather than "You forgot...". Focus on future-proofing."""
+
+
+@functools.lru_cache(maxsize=None)
+def get_reflector_agent() -> LlmAgent:
+    return LlmAgent(
+        name="reflector_agent",
+        model=get_llm(MODELS["reflector_agent"]),  # Configured in config.py; currently Gemini 3 Flash Preview
+        description='Compassionate but rigorous critic of plans and code. Triggers: "review", "critique", "sanity check", "what am i missing".',
+        instruction=REFLECTOR_INSTRUCTION,
+        before_model_callback=inject_context_before_model,
+        tools=[safe_list_dir, safe_read_file],
+    )
+
+
+_AGENT_BUILDERS = {
+    "reflector_agent": get_reflector_agent,
+}
+
+
+def __getattr__(name: str):
+    """Resolve legacy module-level agent names to their cached instances."""
+    builder = _AGENT_BUILDERS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return builder()
@@ -1,6 +1,9 @@
-import os
 import logging
+import random
 from enum import Enum
+from typing import Callable, Dict, Optional, Tuple
+
+from adhd_os.envs import ENV
 
 _logger = logging.getLogger(__name__)
 
@@ -21,7 +24,8 @@ MODELS = {
     "emotional": "anthropic/claude-sonnet-4-6",
     "temporal": "gemini/gemini-3-flash-preview",
     "motivation": "gemini/gemini-3-flash-preview",
-    "pattern_analysis": "gemini/gemini-3-flash-preview",
+    "pattern_analysis_fast": "gemini/gemini-3-flash-preview",
+    "pattern_analysis_quality": "gemini/gemini-3-pro-preview",
     "reflector_agent": "gemini/gemini-3-flash-preview",
 }
 
@@ -32,28 +36,73 @@ FALLBACK_MODELS = {
 }
 
 
-def get_model(role: str, mode: ModelMode = ModelMode.PRODUCTION) -> str:
-    """Returns appropriate model based on role and mode."""
-    if mode == ModelMode.AB_TEST and role == "decomposer":
-        import random
-        return random.choice([MODELS["decomposer_quality"], MODELS["decomposer_fast"]])
-    elif mode == ModelMode.QUALITY and role == "decomposer":
-        return MODELS["decomposer_quality"]
-    elif role == "decomposer":
-        return MODELS["decomposer_fast"]
-    return MODELS.get(role, DEFAULT_FAST_MODEL)
+# History size at which pattern analysis escalates to the quality model.
+PATTERN_ANALYSIS_ESCALATION_ROWS = 50
+
+
+# Dedicated RNG for A/B routing so decomposer picks don't contend on the
+# global random state shared with the rest of the process.
+_AB_TEST_RNG = random.Random()
+_AB_TEST_DECOMPOSERS = (MODELS["decomposer_quality"], MODELS["decomposer_fast"])
+
+
+def _ab_test_decomposer(history_size: Optional[int]) -> str:
+    return _AB_TEST_RNG.choice(_AB_TEST_DECOMPOSERS)
+
+
+def _pattern_analysis_model(history_size: Optional[int]) -> str:
+    if (history_size or 0) >= PATTERN_ANALYSIS_ESCALATION_ROWS:
+        return MODELS["pattern_analysis_quality"]
+    return MODELS["pattern_analysis_fast"]
+
+
+def _resolve_static_routes() -> Dict[Tuple[str, ModelMode], str]:
+    """Resolves every (role, mode) pair whose model does not depend on the call."""
+    resolved: Dict[Tuple[str, ModelMode], str] = {}
+    for mode in ModelMode:
+        for role, model in MODELS.items():
+            resolved[(role, mode)] = model
+        resolved[("decomposer", mode)] = MODELS["decomposer_fast"]
+    resolved[("decomposer", ModelMode.QUALITY)] = MODELS["decomposer_quality"]
+    resolved[("pattern_analysis", ModelMode.QUALITY)] = MODELS["pattern_analysis_quality"]
+    return resolved
+
+
+_RESOLVED = _resolve_static_routes()
+
+# Routes that must be decided per call: A/B picks and history-based escalation.
+_DYNAMIC_ROUTES: Dict[Tuple[str, ModelMode], Callable[[Optional[int]], str]] = {
+    ("decomposer", ModelMode.AB_TEST): _ab_test_decomposer,
+    ("pattern_analysis", ModelMode.PRODUCTION): _pattern_analysis_model,
+    ("pattern_analysis", ModelMode.AB_TEST): _pattern_analysis_model,
+}
+
+
+def get_model(
+    role: str,
+    mode: ModelMode = ModelMode.PRODUCTION,
+    history_size: Optional[int] = None,
+) -> str:
+    """Returns appropriate model based on role and mode.
+
+    Pattern analysis stays on the fast model unless running in quality mode or
+    *history_size* reaches PATTERN_ANALYSIS_ESCALATION_ROWS.
+    """
+    route = _DYNAMIC_ROUTES.get((role, mode))
+    if route is not None:
+        return route(history_size)
+    return _RESOLVED.get((role, mode)) or MODELS.get(role, DEFAULT_FAST_MODEL)
 
 
 def get_fallback_model(role: str) -> str:
     """Returns the fallback model for a role, or the default fast model."""
     return FALLBACK_MODELS.get(role, DEFAULT_FAST_MODEL)
 
-_mode_raw = os.environ.get("ADHD_OS_MODEL_MODE", "production")
+_mode_raw = ENV.model_mode
 try:
     MODEL_MODE = ModelMode(_mode_raw)
 except ValueError:
-    import logging
-    logging.getLogger(__name__).warning(
+    _logger.warning(
         "Unknown ADHD_OS_MODEL_MODE '%s', falling back to 'production'", _mode_raw
     )
     MODEL_MODE = ModelMode.PRODUCTION
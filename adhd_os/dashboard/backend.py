@@ -1,34 +1,59 @@
 import asyncio
+import hashlib
 import json
-import os
+import logging
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 from adhd_os.infrastructure.event_bus import EVENT_BUS, EventType
 from adhd_os.infrastructure.settings import apply_saved_environment_settings
 
 apply_saved_environment_settings()
 
+from adhd_os.envs import ENV
 from adhd_os.runtime import RUNTIME
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     await RUNTIME.startup()
     yield
+    await RUNTIME.drain_background_tasks()
+    RUNTIME.db.close()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when available.
 
+    Returning one directly from a route also skips FastAPI's jsonable_encoder
+    pass, which dominates serialization cost for the list-heavy read endpoints.
+    """
 
-app = FastAPI(title="ADHD-OS Dashboard API", lifespan=lifespan)
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
-_cors_origins_raw = os.environ.get("ADHD_OS_CORS_ORIGINS", "http://localhost:5173")
-CORS_ORIGINS = [origin.strip() for origin in _cors_origins_raw.split(",") if origin.strip()]
+
+app = FastAPI(title="ADHD-OS Dashboard API", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+CORS_ORIGINS = list(ENV.cors_origins)
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +62,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# JSON lists with repeated keys compress several-fold; SSE responses are
+# excluded by the middleware so live updates still flush per event.
+app.add_middleware(GZipMiddleware, minimum_size=500)
 
 
 class ChatTurnRequest(BaseModel):
@@ -167,7 +195,7 @@ async def live_event_stream(
 @app.get("/api/bootstrap")
 async def get_bootstrap(session_id: Optional[str] = Query(default=None)):
     try:
-        return await RUNTIME.bootstrap(session_id=session_id)
+        return FastJSONResponse(await RUNTIME.bootstrap(session_id=session_id))
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -178,6 +206,44 @@ async def post_chat_turn(request: ChatTurnRequest):
         return await RUNTIME.chat_turn(request.text, session_id=request.session_id)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    finally:
+        # A turn may log completions or change energy through agent tools.
+        _invalidate_stats_cache()
+
+
+@app.post("/api/chat/stream")
+async def post_chat_stream(request: ChatTurnRequest):
+    stream = RUNTIME.stream_chat_turn(request.text, session_id=request.session_id)
+    try:
+        first_chunk = await stream.__anext__()
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    async def _sse():
+        # Closing the runtime stream on disconnect releases its session lock.
+        chunk = first_chunk
+        try:
+            while True:
+                payload = chunk["turn"] if chunk["type"] == "turn" else chunk
+                yield f"event: {chunk['type']}\ndata: {json.dumps(payload)}\n\n"
+                try:
+                    chunk = await stream.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception as exc:
+                    logger.exception("Chat stream failed for session %s", request.session_id)
+                    detail = str(exc) if isinstance(exc, ValueError) else "Chat turn failed."
+                    yield f"event: error\ndata: {json.dumps({'detail': detail})}\n\n"
+                    return
+        finally:
+            await stream.aclose()
+            _invalidate_stats_cache()
+
+    return StreamingResponse(
+        _sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 @app.patch("/api/user-state")
@@ -191,6 +257,8 @@ async def patch_user_state(request: UserStatePatchRequest):
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    finally:
+        _invalidate_stats_cache()
 
 
 @app.get("/api/settings/providers")
@@ -221,22 +289,79 @@ async def post_shutdown(session_id: str):
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
+# The dashboard polls stats on every tick; serve one rendered payload per
+# STATS_TTL_SECONDS and let clients revalidate it by ETag.
+STATS_TTL_SECONDS = 2.0
+_stats_cache: Dict[str, Any] = {}
+# Bumped on every invalidation so a snapshot computed while a mutation was in
+# flight is served once but never cached.
+_stats_generation = 0
+
+
+def _invalidate_stats_cache() -> None:
+    """Drops the cached stats; call after (not before) a mutation completes."""
+    global _stats_generation
+    _stats_generation += 1
+    _stats_cache.clear()
+
+
+# Read endpoints run their SQLite queries on the default thread pool so a slow
+# query never stalls the event loop serving chat turns and the live stream.
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(request: Request):
     await RUNTIME.startup()
-    return RUNTIME.get_stats_snapshot()
+    now = time.monotonic()
+    entry = _stats_cache
+    if not entry or now - entry["at"] >= STATS_TTL_SECONDS:
+        generation = _stats_generation
+        body = FastJSONResponse(await asyncio.to_thread(RUNTIME.get_stats_snapshot)).body
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        entry = {"at": now, "body": body, "etag": etag}
+        if generation == _stats_generation:
+            _stats_cache.update(entry)
+
+    headers = {"ETag": entry["etag"], "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == entry["etag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+# Rows go straight from sqlite to JSON, so the schema is documented by hand
+# rather than through a response_model that would validate every item.
+HISTORY_RESPONSES: Dict[int, Dict[str, Any]] = {
+    200: {
+        "description": "Most recent completed tasks, newest first.",
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "task_type": {"type": "string"},
+                            "completed_at": {"type": "string", "nullable": True},
+                            "duration_minutes": {"type": "number"},
+                        },
+                        "required": ["id", "task_type", "completed_at", "duration_minutes"],
+                    },
+                }
+            }
+        },
+    }
+}
 
 
-@app.get("/api/history")
+@app.get("/api/history", responses=HISTORY_RESPONSES)
 async def get_history(limit: int = Query(default=50, ge=1, le=200)):
     await RUNTIME.startup()
-    return RUNTIME.get_task_history(limit=limit)
+    return FastJSONResponse(await asyncio.to_thread(RUNTIME.get_task_history, limit=limit))
 
 
 @app.get("/api/tasks")
 async def get_tasks():
     await RUNTIME.startup()
-    return RUNTIME.get_task_board()
+    return FastJSONResponse(await asyncio.to_thread(RUNTIME.get_task_board))
 
 
 @app.post("/api/tasks")
@@ -251,6 +376,8 @@ async def post_task(request: TaskCreateRequest):
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    finally:
+        _invalidate_stats_cache()
 
 
 @app.patch("/api/tasks/{task_id}")
@@ -266,6 +393,8 @@ async def patch_task(task_id: int, request: TaskUpdateRequest):
         detail = str(exc)
         status_code = 404 if detail.startswith("Unknown task") else 400
         raise HTTPException(status_code=status_code, detail=detail) from exc
+    finally:
+        _invalidate_stats_cache()
 
 
 @app.patch("/api/tasks/{task_id}/steps/{step_id}")
@@ -276,6 +405,8 @@ async def patch_task_step(task_id: int, step_id: int, request: TaskStepUpdateReq
         detail = str(exc)
         status_code = 404 if detail.startswith("Unknown task step") else 400
         raise HTTPException(status_code=status_code, detail=detail) from exc
+    finally:
+        _invalidate_stats_cache()
 
 
 @app.post("/api/tasks/decompose")
@@ -294,13 +425,13 @@ async def post_task_decomposition(request: TaskDecomposeRequest):
 @app.get("/api/sessions")
 async def get_sessions():
     await RUNTIME.startup()
-    return RUNTIME.db.get_recent_sessions()
+    return FastJSONResponse(await asyncio.to_thread(RUNTIME.db.get_recent_sessions))
 
 
 @app.get("/api/body-double/status")
 async def get_body_double_status():
     await RUNTIME.startup()
-    return RUNTIME.get_body_double_status()
+    return FastJSONResponse(RUNTIME.get_body_double_status())
 
 
 @app.post("/api/body-double/start")
@@ -330,7 +461,7 @@ async def post_body_double_end(request: BodyDoubleEndRequest):
 @app.get("/api/focus-guardrail/status")
 async def get_focus_guardrail_status():
     await RUNTIME.startup()
-    return RUNTIME.get_focus_guardrail_status()
+    return FastJSONResponse(RUNTIME.get_focus_guardrail_status())
 
 
 @app.post("/api/focus-guardrail")
@@ -0,0 +1,55 @@
+"""Launch-time environment settings, parsed once at import.
+
+Import this after apply_saved_environment_settings() so persisted settings
+are visible. API keys are deliberately absent: the dashboard can change them
+at runtime, so they are still read from os.environ where they are used.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid %s '%s', using %d", name, raw, default)
+        return default
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+def _env_list(name: str, default: str) -> Tuple[str, ...]:
+    raw = os.environ.get(name, default)
+    return tuple(item.strip() for item in raw.split(",") if item.strip())
+
+
+@dataclass(frozen=True)
+class _Env:
+    model_mode: str
+    cors_origins: Tuple[str, ...]
+    demo_mode: bool
+    anthropic_max_concurrent: int
+    anthropic_requests_per_minute: int
+
+
+def _load_env() -> _Env:
+    return _Env(
+        model_mode=os.environ.get("ADHD_OS_MODEL_MODE", "production"),
+        cors_origins=_env_list("ADHD_OS_CORS_ORIGINS", "http://localhost:5173"),
+        demo_mode=_env_flag("ADHD_OS_DEMO_MODE"),
+        anthropic_max_concurrent=_env_int("ANTHROPIC_MAX_CONCURRENT", 4),
+        anthropic_requests_per_minute=_env_int("ANTHROPIC_REQUESTS_PER_MINUTE", 500),
+    )
+
+
+ENV = _load_env()
@@ -1,9 +1,10 @@
 import hashlib
-import json
 import logging
 import math
-from collections import Counter
-from typing import Dict, List, Optional
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -75,6 +76,61 @@ def _tfidf_vectors(query_tokens: List[str], corpus: List[List[str]]):
     return query_vec, doc_vecs
 
 
+class _FuzzyIndex:
+    """Inverted index over cached task descriptions.
+
+    Scores equal _tfidf_vectors + _cosine_similarity over the same corpus, but
+    only documents sharing a token with the query are visited, and the
+    per-document work is done once when the index is built.
+    """
+
+    def __init__(self, rows: List[tuple]):
+        self.hashes: List[int] = []
+        self.counts: List[Counter] = []
+        self.postings: Dict[str, List[int]] = {}
+        for task_hash, description in rows:
+            counts = Counter(_tokenize(description))
+            for tok in counts:
+                self.postings.setdefault(tok, []).append(len(self.hashes))
+            self.hashes.append(task_hash)
+            self.counts.append(counts)
+        self.n_docs = len(self.hashes) + 1  # +1 for the query, as in _tfidf_vectors
+        # Squared norms with corpus-only IDF; query tokens are adjusted per lookup.
+        self.base_norms = [
+            sum((cnt * self._idf(len(self.postings[tok]))) ** 2 for tok, cnt in counts.items())
+            for counts in self.counts
+        ]
+
+    def _idf(self, df: int) -> float:
+        return math.log((self.n_docs + 1) / (df + 1)) + 1  # smoothed IDF
+
+    def best_match(self, query_tokens: List[str]) -> Tuple[float, Optional[int]]:
+        """Returns (cosine, task hash) of the closest description, or (0.0, None)."""
+        query = Counter(query_tokens)
+        # The query counts towards document frequency, so its tokens' IDF shifts.
+        idf = {tok: self._idf(len(self.postings.get(tok, ())) + 1) for tok in query}
+        query_norm = math.sqrt(sum((cnt * idf[tok]) ** 2 for tok, cnt in query.items()))
+
+        candidates = sorted({doc for tok in query for doc in self.postings.get(tok, ())})
+        best_score, best_doc = 0.0, -1
+        for doc in candidates:
+            counts = self.counts[doc]
+            dot, norm = 0.0, self.base_norms[doc]
+            for tok, q_cnt in query.items():
+                d_cnt = counts.get(tok)
+                if d_cnt:
+                    weight = d_cnt * idf[tok]
+                    base = d_cnt * self._idf(len(self.postings[tok]))
+                    norm += weight * weight - base * base
+                    dot += q_cnt * idf[tok] * weight
+            score = dot / (query_norm * math.sqrt(norm))
+            if score > best_score:
+                best_score, best_doc = score, doc
+        if best_doc < 0:
+            return 0.0, None
+        return best_score, self.hashes[best_doc]
+
+
 # ---- TaskCache -------------------------------------------------------------
 
 class TaskCache:
@@ -84,46 +140,66 @@ class TaskCache:
     """
 
     SIMILARITY_THRESHOLD = 0.35  # minimum cosine similarity for a cache hit
+    MAX_MEMO_ENTRIES = 512  # exact-hash results (hits and misses) kept in memory
+    MEMO_TTL_SECONDS = 6 * 60 * 60  # after this a memoized plan is re-read from SQLite
+    # Misses and the fuzzy index go stale as soon as another process sharing
+    # the database (CLI vs dashboard) stores a plan, so they expire quickly.
+    MISS_TTL_SECONDS = 60
+    INDEX_TTL_SECONDS = 60
+
+    def __init__(self):
+        # task hash -> (parsed plan or None for a known exact-match miss, monotonic time stored)
+        self._memo: "OrderedDict[int, Tuple[Optional[DecompositionPlan], float]]" = OrderedDict()
+        # Lookup outcomes and memo entries dropped (LRU or TTL), for tuning the limits above.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Fuzzy-match index over cached descriptions, built on the first miss
+        # and dropped whenever this cache stores a plan or it is INDEX_TTL_SECONDS old.
+        self._index: Optional[_FuzzyIndex] = None
+        self._index_built_at = 0.0
 
     def _normalize_task(self, task: str) -> str:
         return task.lower().strip()
 
-    def _compute_hash(self, task: str) -> str:
+    def _compute_hash(self, task: str) -> int:
+        """Signed 64-bit key so it fits SQLite's INTEGER PRIMARY KEY (rowid) directly."""
         normalized = self._normalize_task(task)
-        return hashlib.md5(normalized.encode()).hexdigest()[:12]
+        digest = hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
 
     # --- retrieval ---
 
     def get(self, task: str, energy_level: int) -> Optional[DecompositionPlan]:
         """Exact-hash lookup, then fuzzy TF-IDF fallback."""
-        # Fast path: exact match
+        plan = self._lookup(task)
+        if plan is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return plan
+
+    def _lookup(self, task: str) -> Optional[DecompositionPlan]:
+        # Fast path: exact match, memoized so repeats skip SQLite and parsing
         task_hash = self._compute_hash(task)
-        plan_dict = DB.get_cached_plan(task_hash)
-        if plan_dict:
-            return DecompositionPlan(**plan_dict)
-
-        # Slow path: semantic similarity over all cached descriptions
-        all_rows = self._fetch_all_cache_rows()
-        if not all_rows:
-            return None
+        plan = self._load_plan(task_hash)
+        if plan is not None:
+            return plan
 
+        # Slow path: TF-IDF similarity against every cached description
         query_tokens = _tokenize(task)
         if not query_tokens:
             return None
 
-        corpus = [_tokenize(desc) for desc, _ in all_rows]
-        query_vec, doc_vecs = _tfidf_vectors(query_tokens, corpus)
+        now = time.monotonic()
+        if self._index is None or now - self._index_built_at >= self.INDEX_TTL_SECONDS:
+            self._index = _FuzzyIndex(self._fetch_all_cache_rows())
+            self._index_built_at = now
+        best_score, best_hash = self._index.best_match(query_tokens)
 
-        best_score, best_idx = 0.0, -1
-        for idx, dv in enumerate(doc_vecs):
-            score = _cosine_similarity(query_vec, dv)
-            if score > best_score:
-                best_score, best_idx = score, idx
-
-        if best_score >= self.SIMILARITY_THRESHOLD and best_idx >= 0:
-            _, plan_json_str = all_rows[best_idx]
+        if best_hash is not None and best_score >= self.SIMILARITY_THRESHOLD:
             try:
-                return DecompositionPlan(**json.loads(plan_json_str))
+                return self._load_plan(best_hash)
             except Exception:
                 pass
 
@@ -137,43 +213,137 @@ class TaskCache:
     def store_with_energy(self, task: str, plan: DecompositionPlan, energy: int):
         task_hash = self._compute_hash(task)
         DB.cache_plan(task_hash, task, plan.model_dump_json(), energy)
+        self._remember(task_hash, plan)
+        self._index = None
         logger.debug("[CACHE] Stored decomposition for: %s", task[:30])
 
     # --- similarity search ---
 
     def get_similar_tasks(self, task: str, limit: int = 3) -> List[str]:
-        """Returns the top-*limit* most similar cached task descriptions."""
-        all_rows = self._fetch_all_cache_rows()
-        if not all_rows:
-            return []
-
+        """Returns the top-*limit* cached task descriptions, ranked by the FTS index."""
         query_tokens = _tokenize(task)
         if not query_tokens:
             return []
-
-        descriptions = [desc for desc, _ in all_rows]
-        corpus = [_tokenize(d) for d in descriptions]
-        query_vec, doc_vecs = _tfidf_vectors(query_tokens, corpus)
-
-        scored = []
-        for idx, dv in enumerate(doc_vecs):
-            score = _cosine_similarity(query_vec, dv)
-            if score > 0:
-                scored.append((descriptions[idx], score))
-
-        scored.sort(key=lambda x: x[1], reverse=True)
-        return [desc for desc, _ in scored[:limit]]
+        return DB.get_similar_tasks(query_tokens, limit=limit)
 
     # --- helpers ---
 
+    def _load_plan(self, task_hash: int) -> Optional[DecompositionPlan]:
+        entry = self._memo.get(task_hash)
+        if entry is not None:
+            plan, stored_at = entry
+            ttl = self.MEMO_TTL_SECONDS if plan is not None else self.MISS_TTL_SECONDS
+            if time.monotonic() - stored_at < ttl:
+                self._memo.move_to_end(task_hash)
+                return plan
+            del self._memo[task_hash]
+            self.evictions += 1
+        # pydantic-core parses and validates in one pass; no intermediate dict.
+        plan_json = DB.get_cached_plan_json(task_hash)
+        plan = DecompositionPlan.model_validate_json(plan_json) if plan_json else None
+        self._remember(task_hash, plan)
+        return plan
+
+    def _remember(self, task_hash: int, plan: Optional[DecompositionPlan]) -> None:
+        self._memo[task_hash] = (plan, time.monotonic())
+        self._memo.move_to_end(task_hash)
+        while len(self._memo) > self.MAX_MEMO_ENTRIES:
+            self._memo.popitem(last=False)
+            self.evictions += 1
+
     @staticmethod
     def _fetch_all_cache_rows() -> List[tuple]:
-        """Returns list of (task_description, plan_json) from cache table."""
+        """Returns list of (hash, task_description) from cache table; plans load on demand."""
         with DB.get_connection() as conn:
             cursor = conn.execute(
-                "SELECT task_description, plan_json FROM task_cache LIMIT 500"
+                "SELECT hash, task_description FROM task_cache LIMIT 500"
             )
             return cursor.fetchall()
 
 
 TASK_CACHE = TaskCache()
+
+
+# ---- ResponseCache ---------------------------------------------------------
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+class ResponseCache:
+    """
+    Semantic cache for template-shaped agent replies.
+    Keys on agent name + energy bucket + a digest of the reply the user was
+    answering, then matches the user's prompt with TF-IDF cosine similarity
+    so repeat phrasings skip the LLM.
+    """
+
+    SIMILARITY_THRESHOLD = 0.92  # near-verbatim repeats only
+    MAX_CANDIDATES = 200
+    MIN_PROMPT_TOKENS = 3  # "yes" / "ok let's do it" mean nothing without context
+
+    @staticmethod
+    def energy_bucket(energy_level: int) -> str:
+        if energy_level <= 3:
+            return "low"
+        if energy_level >= 8:
+            return "high"
+        return "mid"
+
+    @staticmethod
+    def context_hash(previous_reply: str) -> str:
+        """Digest of the model turn being answered; empty for an opening message."""
+        previous_reply = previous_reply.strip()
+        if not previous_reply:
+            return ""
+        return hashlib.blake2b(previous_reply.encode("utf-8"), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _prompt_tokens(prompt: str) -> List[str]:
+        return _tokenize(_PUNCTUATION_RE.sub(" ", prompt))
+
+    def get(
+        self, agent_name: str, prompt: str, energy_level: int, previous_reply: str = ""
+    ) -> Optional[str]:
+        """Returns a cached reply for a near-identical prompt in the same context, or None."""
+        query_tokens = self._prompt_tokens(prompt)
+        if len(query_tokens) < self.MIN_PROMPT_TOKENS:
+            return None
+
+        rows = DB.get_cached_responses(
+            agent_name,
+            self.energy_bucket(energy_level),
+            self.context_hash(previous_reply),
+            limit=self.MAX_CANDIDATES,
+        )
+        if not rows:
+            return None
+
+        corpus = [self._prompt_tokens(cached_prompt) for cached_prompt, _ in rows]
+        query_vec, doc_vecs = _tfidf_vectors(query_tokens, corpus)
+
+        best_score, best_idx = 0.0, -1
+        for idx, dv in enumerate(doc_vecs):
+            score = _cosine_similarity(query_vec, dv)
+            if score > best_score:
+                best_score, best_idx = score, idx
+
+        if best_score >= self.SIMILARITY_THRESHOLD and best_idx >= 0:
+            return rows[best_idx][1]
+        return None
+
+    def store(
+        self, agent_name: str, prompt: str, energy_level: int, response: str, previous_reply: str = ""
+    ):
+        if len(self._prompt_tokens(prompt)) < self.MIN_PROMPT_TOKENS or not response.strip():
+            return
+        DB.cache_response(
+            agent_name,
+            self.energy_bucket(energy_level),
+            prompt,
+            response,
+            context_hash=self.context_hash(previous_reply),
+        )
+        logger.debug("[CACHE] Stored %s reply for: %s", agent_name, prompt[:30])
+
+
+RESPONSE_CACHE = ResponseCache()
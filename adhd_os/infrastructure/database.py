@@ -1,10 +1,203 @@
+import atexit
 import json
+import logging
+import queue
+import re
 import sqlite3
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Idle connections kept open per DatabaseManager; extra concurrent callers get
+# a short-lived connection instead of waiting.
+POOL_SIZE = 8
+
+# Task completions are queued and written by a background flusher, so a burst
+# of completions shares one transaction instead of committing row by row.
+WRITE_BATCH_SIZE = 64
+WRITE_FLUSH_INTERVAL = 0.5  # seconds
+
+# The background flusher also truncates the WAL on this cadence; the raised
+# autocheckpoint threshold keeps foreground writers from doing it themselves.
+WAL_CHECKPOINT_INTERVAL = 60.0  # seconds
+
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA wal_autocheckpoint=10000;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-65536;",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456;",  # read through a 256 MiB memory map
+)
+
+# Read-only handles for the dashboard read paths: opened with mode=ro and
+# query_only so they never take write locks, pooled apart from writers.
+_READ_ONLY_PRAGMAS = _CONNECTION_PRAGMAS[3:] + ("PRAGMA query_only=1;",)
+
+_FTS_TOKEN_RE = re.compile(r"\w+")
+
+# Hot-path statements live at module level so every call hands sqlite3 the
+# identical text and hits the connection's prepared-statement cache.
+_STATEMENT_CACHE_SIZE = 256
+
+# Local-time ISO timestamp computed by SQLite itself, for ISO-typed columns
+# on frequent writes; matches datetime.now().isoformat() to the millisecond.
+SQL_NOW_ISO = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+_SQL_GET_STATE = "SELECT value FROM user_state WHERE key = ?"
+_SQL_SAVE_STATE = "INSERT OR REPLACE INTO user_state (key, value, updated_at) VALUES (?, ?, ?)"
+_SQL_GET_APP_SETTING = "SELECT value FROM app_settings WHERE key = ?"
+_SQL_GET_CACHED_PLAN = "SELECT plan_json FROM task_cache WHERE hash = ?"
+_SQL_CACHE_PLAN = """
+    INSERT INTO task_cache (hash, task_description, plan_json, energy_level, created_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(hash) DO UPDATE SET
+        task_description = excluded.task_description,
+        plan_json = excluded.plan_json,
+        energy_level = excluded.energy_level,
+        created_at = excluded.created_at
+"""
+_SQL_LOG_TASK_COMPLETION = """
+    INSERT INTO task_history
+    (task_type, estimated_minutes, actual_minutes, energy_level, in_peak_window, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_TASK_MULTIPLIER = """
+    SELECT AVG(CAST(actual_minutes AS REAL) / estimated_minutes), COUNT(*)
+    FROM (
+        SELECT estimated_minutes, actual_minutes
+        FROM task_history
+        WHERE task_type = ? AND estimated_minutes > 0
+        ORDER BY timestamp DESC LIMIT ?
+    )
+"""
+_SQL_INSERT_CONVERSATION_MESSAGE = """
+    INSERT INTO conversation_messages (session_id, role, kind, text, created_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_TOUCH_SESSION = "UPDATE sessions SET last_updated_at = ? WHERE id = ?"
+_SQL_INSERT_TASK_STEP = """
+    INSERT INTO task_steps (
+        task_id, step_number, text, duration_minutes, is_checkpoint,
+        completed, created_at, completed_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_PERSIST_BUS_EVENT = "INSERT INTO bus_events (event_type, data_json, timestamp) VALUES (?, ?, ?)"
+_SQL_HISTORY = """
+    SELECT task_type, estimated_minutes, actual_minutes,
+           energy_level, in_peak_window,
+           date(timestamp / 1e9, 'unixepoch', 'localtime')
+    FROM task_history
+    ORDER BY timestamp DESC LIMIT ?
+"""
+# Range predicates with bounds computed per call so both counts use an index:
+# task_history stores epoch nanoseconds, tasks.completed_at stores ISO text.
+_SQL_STATS_COMPLETED_TODAY = """
+    SELECT
+        (
+            SELECT COUNT(*)
+            FROM task_history
+            WHERE timestamp >= ? AND timestamp < ?
+        ) +
+        (
+            SELECT COUNT(*)
+            FROM tasks
+            WHERE completed_at >= ? AND completed_at < ?
+        )
+"""
+# Each side is cut to the newest rows through its own index first, so the
+# final merge sorts at most 2 * limit rows.
+_SQL_HISTORY_ITEMS = """
+    SELECT history_id, task_type, completed_at, duration_minutes
+    FROM (
+        SELECT * FROM (
+            SELECT
+                'history-' || id AS history_id,
+                task_type,
+                strftime('%Y-%m-%dT%H:%M:%f', timestamp / 1e9, 'unixepoch', 'localtime') AS completed_at,
+                actual_minutes AS duration_minutes
+            FROM task_history
+            ORDER BY timestamp DESC
+            LIMIT ?
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT
+                'task-' || id AS history_id,
+                title AS task_type,
+                completed_at,
+                estimated_minutes AS duration_minutes
+            FROM tasks
+            WHERE completed_at IS NOT NULL
+            ORDER BY completed_at DESC
+            LIMIT ?
+        )
+    )
+    ORDER BY completed_at DESC
+    LIMIT ?
+"""
+_SQL_RECENT_SESSIONS = """
+    SELECT id, created_at, last_updated_at
+    FROM sessions
+    ORDER BY last_updated_at DESC
+    LIMIT ?
+"""
+
+# Legacy rows stored datetime.now().isoformat() (local time); rewrite them as
+# epoch nanoseconds so every row in the column compares as an integer.
+_ISO_TO_NS = "CAST(ROUND((julianday({col}, 'utc') - 2440587.5) * 86400000) AS INTEGER) * 1000000"
+
+
+def _local_day_bounds() -> tuple:
+    """Returns today's local [start, end) as epoch nanoseconds and as ISO dates."""
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=1)
+    return (
+        int(start.timestamp()) * 1_000_000_000,
+        int(end.timestamp()) * 1_000_000_000,
+        start.date().isoformat(),
+        end.date().isoformat(),
+    )
+
+
+def json_dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Encodes *value* as JSON text, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, default=default)
+
+
+def json_loads(raw: Any) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers'
+    # except clauses work with either parser.
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _fts_match_query(keywords: List[str]) -> str:
+    """Builds an FTS5 OR-of-prefixes query from free-text keywords, quoting every token."""
+    tokens = {tok for kw in keywords for tok in _FTS_TOKEN_RE.findall(kw.lower())}
+    return " OR ".join(f'"{tok}"*' for tok in sorted(tokens))
+
 
 class ManagedConnection(sqlite3.Connection):
-    """sqlite3 connection that closes itself when used as a context manager."""
+    """sqlite3 connection that closes itself when used as a context manager.
+
+    Connections handed out by a DatabaseManager pool go back to the pool
+    instead of closing, keeping their page cache warm for the next caller.
+    """
+
+    _pool: Optional["queue.Queue[ManagedConnection]"] = None
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         try:
@@ -12,36 +205,108 @@ class ManagedConnection(sqlite3.Connection):
         finally:
             self.close()
 
+    def close(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            if self.in_transaction:
+                self.rollback()
+            self.row_factory = None
+            try:
+                pool.put_nowait(self)
+                return
+            except queue.Full:
+                pass
+        super().close()
+
 
 class DatabaseManager:
     """
     Manages SQLite connection and schema for ADHD-OS.
     Handles user state, sessions, task history, and normalized UI transcripts.
     """
-    def __init__(self, db_path: str = "adhd_os.db"):
+    def __init__(self, db_path: str = "adhd_os.db", pool_size: int = POOL_SIZE):
         self.db_path = db_path
+        # LIFO so the most recently used (warmest) connection is handed out next.
+        self._pool: "queue.Queue[ManagedConnection]" = queue.LifoQueue(maxsize=pool_size)
+        self._read_pool: "queue.Queue[ManagedConnection]" = queue.LifoQueue(maxsize=pool_size)
+        self._write_queue: "queue.Queue[tuple]" = queue.Queue()
+        # Rows taken off _write_queue stay here until their transaction commits,
+        # so a failed flush (e.g. "database is locked") retries them next time.
+        self._pending_writes: "deque[tuple]" = deque()
+        self._flush_lock = threading.Lock()
+        self._writer_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_stop = threading.Event()
         self._init_db()
-    
-    def _get_conn(self):
-        conn = sqlite3.connect(self.db_path, factory=ManagedConnection)
-        conn.execute("PRAGMA journal_mode=WAL;")
+
+    def _connect(self, read_only: bool = False) -> ManagedConnection:
+        target, pragmas = self.db_path, _CONNECTION_PRAGMAS
+        if read_only:
+            target, pragmas = Path(self.db_path).resolve().as_uri() + "?mode=ro", _READ_ONLY_PRAGMAS
+        conn = sqlite3.connect(
+            target,
+            factory=ManagedConnection,
+            check_same_thread=False,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+            uri=read_only,
+        )
+        for pragma in pragmas:
+            conn.execute(pragma)
+        return conn
+
+    def _get_conn(self) -> ManagedConnection:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        conn._pool = self._pool
+        return conn
+
+    def _get_read_conn(self) -> ManagedConnection:
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect(read_only=True)
+        conn._pool = self._read_pool
         return conn
 
     def get_connection(self):
-        """Returns a new database connection. Caller is responsible for closing it."""
+        """Returns a pooled connection; closing it (or leaving its with-block) releases it."""
         return self._get_conn()
+
+    def get_read_connection(self):
+        """Returns a pooled read-only connection; writes through it raise sqlite3.OperationalError."""
+        return self._get_read_conn()
+
+    def close(self):
+        """Flushes queued writes, refreshes planner stats and closes idle pooled connections."""
+        self._stop_writer()
+        self.flush_writes()
+        with self._get_conn() as conn:
+            conn.execute("PRAGMA optimize")
+        for pool in (self._pool, self._read_pool):
+            while True:
+                try:
+                    conn = pool.get_nowait()
+                except queue.Empty:
+                    break
+                conn._pool = None
+                conn.close()
     
     def _init_db(self):
-        """Initialize database schema."""
+        """Initialize database schema in a single transaction."""
         with self._get_conn() as conn:
             cursor = conn.cursor()
-            
+            # sqlite3 autocommits DDL by default; one explicit transaction
+            # turns the whole schema pass into a single WAL commit.
+            cursor.execute("BEGIN")
+
             # User State Table (Key-Value store for flexibility)
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS user_state (
                     key TEXT PRIMARY KEY,
                     value TEXT,
-                    updated_at TIMESTAMP
+                    updated_at INTEGER
                 )
             """)
 
@@ -86,18 +351,79 @@ class DatabaseManager:
                     actual_minutes INTEGER,
                     energy_level INTEGER,
                     in_peak_window BOOLEAN,
-                    timestamp TIMESTAMP
+                    timestamp INTEGER
                 )
             """)
 
-            # Task Cache Table
+            # Task Cache Table (hash is a 64-bit integer key aliasing the rowid).
+            # Caches keyed by the old 12-char text hash are dropped and rebuilt.
+            hash_column = cursor.execute(
+                "SELECT type FROM pragma_table_info('task_cache') WHERE name = 'hash'"
+            ).fetchone()
+            if hash_column and hash_column[0].upper() != "INTEGER":
+                cursor.execute("DROP TABLE IF EXISTS task_cache_fts")
+                cursor.execute("DROP TABLE task_cache")
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS task_cache (
-                    hash TEXT PRIMARY KEY,
+                    hash INTEGER PRIMARY KEY,
                     task_description TEXT,
                     plan_json TEXT,
                     energy_level INTEGER,
-                    created_at TIMESTAMP
+                    created_at INTEGER
+                )
+            """)
+
+            # Full-text index over cached task descriptions, kept in sync by triggers
+            fts_exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_cache_fts'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS task_cache_fts
+                USING fts5(task_description, content='task_cache', content_rowid='rowid')
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS task_cache_fts_ai AFTER INSERT ON task_cache BEGIN
+                    INSERT INTO task_cache_fts (rowid, task_description)
+                    VALUES (new.rowid, new.task_description);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS task_cache_fts_ad AFTER DELETE ON task_cache BEGIN
+                    INSERT INTO task_cache_fts (task_cache_fts, rowid, task_description)
+                    VALUES ('delete', old.rowid, old.task_description);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS task_cache_fts_au AFTER UPDATE ON task_cache BEGIN
+                    INSERT INTO task_cache_fts (task_cache_fts, rowid, task_description)
+                    VALUES ('delete', old.rowid, old.task_description);
+                    INSERT INTO task_cache_fts (rowid, task_description)
+                    VALUES (new.rowid, new.task_description);
+                END
+            """)
+            if not fts_exists:
+                cursor.execute("INSERT INTO task_cache_fts (task_cache_fts) VALUES ('rebuild')")
+
+            # Response Cache Table (agent replies reused for repeat prompts).
+            # context_hash digests the reply the user was answering; caches
+            # written before it existed can't be keyed safely and are dropped.
+            table_exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'response_cache'"
+            ).fetchone()
+            context_column = cursor.execute(
+                "SELECT 1 FROM pragma_table_info('response_cache') WHERE name = 'context_hash'"
+            ).fetchone()
+            if table_exists and not context_column:
+                cursor.execute("DROP TABLE response_cache")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    agent_name TEXT NOT NULL,
+                    energy_bucket TEXT NOT NULL,
+                    context_hash TEXT NOT NULL DEFAULT '',
+                    prompt_text TEXT NOT NULL,
+                    response_text TEXT NOT NULL,
+                    created_at TIMESTAMP NOT NULL
                 )
             """)
 
@@ -172,6 +498,29 @@ class DatabaseManager:
                 CREATE INDEX IF NOT EXISTS idx_task_history_timestamp
                 ON task_history (timestamp)
             """)
+            # Text sorts after integers, so MAX() via the index spots legacy rows.
+            newest = cursor.execute("SELECT typeof(MAX(timestamp)) FROM task_history").fetchone()
+            if newest[0] == "text":
+                cursor.execute(
+                    f"UPDATE task_history SET timestamp = {_ISO_TO_NS.format(col='timestamp')} "
+                    "WHERE typeof(timestamp) = 'text'"
+                )
+            for table, col in (("user_state", "updated_at"), ("task_cache", "created_at")):
+                cursor.execute(
+                    f"UPDATE {table} SET {col} = {_ISO_TO_NS.format(col=col)} WHERE typeof({col}) = 'text'"
+                )
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_task_history_type_timestamp
+                ON task_history (task_type, timestamp DESC)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_events_session
+                ON events (session_id)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_sessions_user_created
+                ON sessions (user_id, app_name, created_at)
+            """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_bus_events_type
                 ON bus_events (event_type, timestamp)
@@ -188,10 +537,25 @@ class DatabaseManager:
                 CREATE INDEX IF NOT EXISTS idx_tasks_status_updated
                 ON tasks (status, updated_at DESC)
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tasks_completed_at
+                ON tasks (completed_at)
+            """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_task_steps_task
                 ON task_steps (task_id, step_number)
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_response_cache_lookup
+                ON response_cache (agent_name, energy_bucket, context_hash, created_at DESC)
+            """)
+
+            # Give the planner index statistics once; close() keeps them fresh.
+            has_stats = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            ).fetchone()
+            if not has_stats:
+                cursor.execute("ANALYZE")
 
             conn.commit()
     
@@ -201,17 +565,23 @@ class DatabaseManager:
         """Saves a value to user_state."""
         with self._get_conn() as conn:
             conn.execute(
-                "INSERT OR REPLACE INTO user_state (key, value, updated_at) VALUES (?, ?, ?)",
-                (key, json.dumps(value), datetime.now().isoformat())
+                _SQL_SAVE_STATE, (key, json_dumps(value), time.time_ns())
             )
-            
+
+    def save_states(self, values: Dict[str, Any]):
+        """Saves several user_state values in one transaction."""
+        now = time.time_ns()
+        with self._get_conn() as conn:
+            conn.executemany(
+                _SQL_SAVE_STATE, [(key, json_dumps(value), now) for key, value in values.items()]
+            )
+
     def get_state(self, key: str, default: Any = None) -> Any:
         """Retrieves a value from user_state."""
-        with self._get_conn() as conn:
-            cursor = conn.execute("SELECT value FROM user_state WHERE key = ?", (key,))
-            row = cursor.fetchone()
+        with self._get_read_conn() as conn:
+            row = conn.execute(_SQL_GET_STATE, (key,)).fetchone()
             if row:
-                return json.loads(row[0])
+                return json_loads(row[0])
             return default
 
     # --- App Settings Methods ---
@@ -220,17 +590,16 @@ class DatabaseManager:
         """Saves a local application setting."""
         with self._get_conn() as conn:
             conn.execute(
-                "INSERT OR REPLACE INTO app_settings (key, value, updated_at) VALUES (?, ?, ?)",
-                (key, json.dumps(value), datetime.now().isoformat()),
+                f"INSERT OR REPLACE INTO app_settings (key, value, updated_at) VALUES (?, ?, {SQL_NOW_ISO})",
+                (key, json_dumps(value)),
             )
 
     def get_app_setting(self, key: str, default: Any = None) -> Any:
         """Retrieves a local application setting."""
-        with self._get_conn() as conn:
-            cursor = conn.execute("SELECT value FROM app_settings WHERE key = ?", (key,))
-            row = cursor.fetchone()
+        with self._get_read_conn() as conn:
+            row = conn.execute(_SQL_GET_APP_SETTING, (key,)).fetchone()
             if row:
-                return json.loads(row[0])
+                return json_loads(row[0])
             return default
 
     def get_app_settings(self, keys: List[str]) -> Dict[str, Any]:
@@ -239,7 +608,7 @@ class DatabaseManager:
             return {}
 
         placeholders = ", ".join("?" for _ in keys)
-        with self._get_conn() as conn:
+        with self._get_read_conn() as conn:
             cursor = conn.execute(
                 f"SELECT key, value FROM app_settings WHERE key IN ({placeholders})",
                 tuple(keys),
@@ -247,7 +616,7 @@ class DatabaseManager:
             values: Dict[str, Any] = {}
             for key, raw_value in cursor.fetchall():
                 try:
-                    values[key] = json.loads(raw_value)
+                    values[key] = json_loads(raw_value)
                 except (TypeError, json.JSONDecodeError):
                     values[key] = raw_value
             return values
@@ -259,36 +628,67 @@ class DatabaseManager:
 
     # --- Task Cache Methods ---
 
-    def get_cached_plan(self, task_hash: str) -> Optional[Dict]:
+    def get_cached_plan(self, task_hash: int) -> Optional[Dict]:
+        plan_json = self.get_cached_plan_json(task_hash)
+        return json_loads(plan_json) if plan_json else None
+
+    def get_cached_plan_json(self, task_hash: int) -> Optional[str]:
+        """Returns the stored plan JSON text, for callers that validate it directly."""
+        with self._get_read_conn() as conn:
+            row = conn.execute(_SQL_GET_CACHED_PLAN, (task_hash,)).fetchone()
+            return row[0] if row else None
+
+    def cache_plan(self, task_hash: int, description: str, plan_json: str, energy: int):
         with self._get_conn() as conn:
+            conn.execute(
+                _SQL_CACHE_PLAN, (task_hash, description, plan_json, energy, time.time_ns())
+            )
+
+    # --- Response Cache Methods ---
+
+    def get_cached_responses(
+        self, agent_name: str, energy_bucket: str, context_hash: str = "", limit: int = 200
+    ) -> List[tuple]:
+        """Returns recent (prompt_text, response_text) pairs for an agent, energy bucket and context."""
+        with self._get_read_conn() as conn:
             cursor = conn.execute(
-                "SELECT plan_json FROM task_cache WHERE hash = ?", 
-                (task_hash,)
+                """
+                SELECT prompt_text, response_text FROM response_cache
+                WHERE agent_name = ? AND energy_bucket = ? AND context_hash = ?
+                ORDER BY created_at DESC
+                LIMIT ?
+                """,
+                (agent_name, energy_bucket, context_hash, limit),
             )
-            row = cursor.fetchone()
-            return json.loads(row[0]) if row else None
+            return cursor.fetchall()
 
-    def cache_plan(self, task_hash: str, description: str, plan_json: str, energy: int):
+    def cache_response(
+        self, agent_name: str, energy_bucket: str, prompt_text: str, response_text: str,
+        context_hash: str = "",
+    ):
         with self._get_conn() as conn:
             conn.execute(
-                """
-                INSERT OR REPLACE INTO task_cache (hash, task_description, plan_json, energy_level, created_at)
-                VALUES (?, ?, ?, ?, ?)
+                f"""
+                INSERT INTO response_cache
+                    (agent_name, energy_bucket, context_hash, prompt_text, response_text, created_at)
+                VALUES (?, ?, ?, ?, ?, {SQL_NOW_ISO})
                 """,
-                (task_hash, description, plan_json, energy, datetime.now())
+                (agent_name, energy_bucket, context_hash, prompt_text, response_text),
             )
 
     def get_similar_tasks(self, keywords: List[str], limit: int = 50) -> List[str]:
-        """Returns task descriptions matching any keyword, with a row limit."""
-        with self._get_conn() as conn:
-            if keywords:
-                conditions = " OR ".join(
-                    "task_description LIKE ?" for _ in keywords
-                )
-                params = [f"%{kw}%" for kw in keywords] + [limit]
+        """Returns task descriptions matching any keyword (prefix match), best BM25 score first."""
+        match = _fts_match_query(keywords)
+        with self._get_read_conn() as conn:
+            if match:
                 cursor = conn.execute(
-                    f"SELECT task_description FROM task_cache WHERE {conditions} LIMIT ?",
-                    params,
+                    """
+                    SELECT task_description FROM task_cache_fts
+                    WHERE task_cache_fts MATCH ?
+                    ORDER BY bm25(task_cache_fts)
+                    LIMIT ?
+                    """,
+                    (match, limit),
                 )
             else:
                 cursor = conn.execute(
@@ -299,36 +699,109 @@ class DatabaseManager:
     # --- Task History Methods ---
     
     def log_task_completion(self, task_type: str, estimated: int, actual: int, energy: int, in_peak: bool):
-        """Logs a completed task for analytics."""
+        """Queues a completed task for analytics; the background flusher writes it."""
+        self._write_queue.put(
+            (_SQL_LOG_TASK_COMPLETION, (task_type, estimated, actual, energy, in_peak, time.time_ns()))
+        )
+        self._ensure_writer()
+
+    def flush_writes(self):
+        """Writes queued rows now, up to WRITE_BATCH_SIZE rows per transaction.
+
+        A batch is only dropped once it commits; on error it stays at the
+        front of the pending rows and the exception propagates.
+        """
+        with self._flush_lock:
+            pending = self._pending_writes
+            while True:
+                while len(pending) < WRITE_BATCH_SIZE:
+                    try:
+                        pending.append(self._write_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not pending:
+                    return
+                count = min(len(pending), WRITE_BATCH_SIZE)
+                batch: Dict[str, List[tuple]] = {}
+                for i in range(count):
+                    sql, row = pending[i]
+                    batch.setdefault(sql, []).append(row)
+                with self._get_conn() as conn:
+                    for sql, rows in batch.items():
+                        conn.executemany(sql, rows)
+                for _ in range(count):
+                    pending.popleft()
+
+    def _flush_before_read(self):
+        """Flushes queued rows for a read; a failed flush is logged and retried later."""
+        try:
+            self.flush_writes()
+        except sqlite3.Error:
+            logger.warning("Queued writes not flushed before read; will retry", exc_info=True)
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer_stop.clear()
+                self._writer = threading.Thread(
+                    target=self._run_writer, name="adhd-os-db-writer", daemon=True
+                )
+                self._writer.start()
+                atexit.register(self.flush_writes)
+
+    def _stop_writer(self):
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+            if writer is None:
+                return
+            self._writer_stop.set()
+            atexit.unregister(self.flush_writes)
+        writer.join()
+
+    def start_background_writer(self):
+        """Starts the background flusher, which also checkpoints the WAL periodically."""
+        self._ensure_writer()
+
+    def checkpoint(self):
+        """Copies the WAL back into the database file and truncates it."""
         with self._get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO task_history 
-                (task_type, estimated_minutes, actual_minutes, energy_level, in_peak_window, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (task_type, estimated, actual, energy, in_peak, datetime.now().isoformat())
-            )
-            
+            busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            logger.debug("WAL checkpoint incomplete; readers still active")
+
+    def _run_writer(self):
+        next_checkpoint = time.monotonic() + WAL_CHECKPOINT_INTERVAL
+        while not self._writer_stop.wait(WRITE_FLUSH_INTERVAL):
+            try:
+                self.flush_writes()
+            except sqlite3.Error:
+                logger.exception(
+                    "Failed to flush queued writes; %d row(s) kept for retry",
+                    len(self._pending_writes),
+                )
+            if time.monotonic() >= next_checkpoint:
+                next_checkpoint = time.monotonic() + WAL_CHECKPOINT_INTERVAL
+                try:
+                    self.checkpoint()
+                except sqlite3.Error:
+                    logger.exception("WAL checkpoint failed")
+
+    def get_task_history_count(self) -> int:
+        """Returns the number of logged task completions."""
+        self._flush_before_read()
+        with self._get_read_conn() as conn:
+            return conn.execute("SELECT COUNT(*) FROM task_history").fetchone()[0]
+
     def get_task_multiplier(self, task_type: str, limit: int = 20) -> Optional[float]:
         """Calculates historical multiplier for a task type."""
-        with self._get_conn() as conn:
-            cursor = conn.execute(
-                """
-                SELECT estimated_minutes, actual_minutes 
-                FROM task_history 
-                WHERE task_type = ? AND estimated_minutes > 0
-                ORDER BY timestamp DESC LIMIT ?
-                """,
-                (task_type, limit)
-            )
-            rows = cursor.fetchall()
-            
-            if len(rows) < 3:  # Need minimal data
+        self._flush_before_read()
+        with self._get_read_conn() as conn:
+            multiplier, count = conn.execute(_SQL_TASK_MULTIPLIER, (task_type, limit)).fetchone()
+            if count < 3:  # Need minimal data
                 return None
-                
-            ratios = [actual / est for est, actual in rows]
-            return sum(ratios) / len(ratios)
+            return multiplier
 
     def prune_old_sessions(self, max_age_days: int = 90) -> int:
         """Deletes sessions and their events older than *max_age_days*. Returns count deleted."""
@@ -353,25 +826,16 @@ class DatabaseManager:
     # --- Bus Event Persistence ---
 
     def persist_bus_event(self, event_type: str, data_json: str):
-        """Writes an event-bus event to the persistent bus_events table."""
-        with self._get_conn() as conn:
-            conn.execute(
-                "INSERT INTO bus_events (event_type, data_json, timestamp) VALUES (?, ?, ?)",
-                (event_type, data_json, datetime.now().isoformat()),
-            )
+        """Queues an event-bus event for the bus_events table; the background flusher writes it."""
+        timestamp = datetime.now().isoformat(timespec="milliseconds")
+        self._write_queue.put((_SQL_PERSIST_BUS_EVENT, (event_type, data_json, timestamp)))
+        self._ensure_writer()
 
     def get_recent_history(self, limit: int = 50) -> List[Dict]:
         """Retrieves recent task history for pattern analysis."""
-        with self._get_conn() as conn:
-            cursor = conn.execute(
-                """
-                SELECT task_type, estimated_minutes, actual_minutes,
-                       energy_level, in_peak_window, timestamp
-                FROM task_history
-                ORDER BY timestamp DESC LIMIT ?
-                """,
-                (limit,)
-            )
+        self._flush_before_read()
+        with self._get_read_conn() as conn:
+            cursor = conn.execute(_SQL_HISTORY, (limit,))
             return [
                 {
                     "type": r[0],
@@ -379,9 +843,9 @@ class DatabaseManager:
                     "act": r[2],
                     "energy": r[3],
                     "peak": bool(r[4]),
-                    "date": r[5][:10] if r[5] else None,
+                    "date": r[5],
                 }
-                for r in cursor.fetchall()
+                for r in cursor
             ]
 
     # --- Dashboard / UI transcript methods ---
@@ -392,7 +856,7 @@ class DatabaseManager:
             return {}
 
         placeholders = ", ".join("?" for _ in keys)
-        with self._get_conn() as conn:
+        with self._get_read_conn() as conn:
             cursor = conn.execute(
                 f"SELECT key, value FROM user_state WHERE key IN ({placeholders})",
                 tuple(keys),
@@ -400,62 +864,25 @@ class DatabaseManager:
             values: Dict[str, Any] = {}
             for key, raw_value in cursor.fetchall():
                 try:
-                    values[key] = json.loads(raw_value)
+                    values[key] = json_loads(raw_value)
                 except (TypeError, json.JSONDecodeError):
                     values[key] = raw_value
             return values
 
     def get_tasks_completed_today(self) -> int:
-        with self._get_conn() as conn:
-            cursor = conn.execute(
-                """
-                SELECT
-                    (
-                        SELECT COUNT(*)
-                        FROM task_history
-                        WHERE date(timestamp) = date('now', 'localtime')
-                    ) +
-                    (
-                        SELECT COUNT(*)
-                        FROM tasks
-                        WHERE completed_at IS NOT NULL
-                          AND date(completed_at) = date('now', 'localtime')
-                    )
-                """
-            )
-            row = cursor.fetchone()
+        self._flush_before_read()
+        with self._get_read_conn() as conn:
+            row = conn.execute(_SQL_STATS_COMPLETED_TODAY, _local_day_bounds()).fetchone()
             return int(row[0] if row else 0)
 
     def get_task_history_items(self, limit: int = 50) -> List[Dict[str, Any]]:
-        with self._get_conn() as conn:
-            cursor = conn.execute(
-                """
-                SELECT history_id, task_type, completed_at, duration_minutes
-                FROM (
-                    SELECT
-                        'history-' || id AS history_id,
-                        task_type,
-                        timestamp AS completed_at,
-                        actual_minutes AS duration_minutes
-                    FROM task_history
-                    UNION ALL
-                    SELECT
-                        'task-' || id AS history_id,
-                        title AS task_type,
-                        completed_at,
-                        estimated_minutes AS duration_minutes
-                    FROM tasks
-                    WHERE completed_at IS NOT NULL
-                )
-                ORDER BY completed_at DESC
-                LIMIT ?
-                """,
-                (limit,),
-            )
+        self._flush_before_read()
+        with self._get_read_conn() as conn:
+            cursor = conn.execute(_SQL_HISTORY_ITEMS, (limit, limit, limit))
             return [
                 {
                     "id": row[0],
-                    "task_type": row[1],
+                    "task_type": row[1] or "unknown",
                     "completed_at": row[2],
                     "duration_minutes": float(row[3] or 0),
                 }
@@ -463,16 +890,8 @@ class DatabaseManager:
             ]
 
     def get_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
-        with self._get_conn() as conn:
-            cursor = conn.execute(
-                """
-                SELECT id, created_at, last_updated_at
-                FROM sessions
-                ORDER BY last_updated_at DESC
-                LIMIT ?
-                """,
-                (limit,),
-            )
+        with self._get_read_conn() as conn:
+            cursor = conn.execute(_SQL_RECENT_SESSIONS, (limit,))
             return [
                 {
                     "id": row[0],
@@ -490,44 +909,46 @@ class DatabaseManager:
         text: str,
         created_at: Optional[str] = None,
     ) -> Dict[str, Any]:
-        created_at = created_at or datetime.now().isoformat()
-        clean_text = (text or "").strip()
-        if not clean_text:
-            raise ValueError("Conversation message text cannot be empty.")
-
-        with self._get_conn() as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO conversation_messages (session_id, role, kind, text, created_at)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (session_id, role, kind, clean_text, created_at),
-            )
-            conn.execute(
-                "UPDATE sessions SET last_updated_at = ? WHERE id = ?",
-                (created_at, session_id),
-            )
-            return {
-                "id": cursor.lastrowid,
-                "session_id": session_id,
-                "role": role,
-                "kind": kind,
-                "text": clean_text,
-                "created_at": created_at,
-            }
+        return self.store_conversation_messages(
+            [
+                {
+                    "session_id": session_id,
+                    "role": role,
+                    "kind": kind,
+                    "text": text,
+                    "created_at": created_at,
+                }
+            ]
+        )[0]
 
     def store_conversation_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        stored: List[Dict[str, Any]] = []
+        """Stores a batch of transcript messages in one transaction."""
+        rows = []
         for message in messages:
-            stored.append(
-                self.store_conversation_message(
-                    session_id=message["session_id"],
-                    role=message["role"],
-                    kind=message["kind"],
-                    text=message["text"],
-                    created_at=message.get("created_at"),
+            clean_text = (message["text"] or "").strip()
+            if not clean_text:
+                raise ValueError("Conversation message text cannot be empty.")
+            created_at = message.get("created_at") or datetime.now().isoformat()
+            rows.append((message["session_id"], message["role"], message["kind"], clean_text, created_at))
+
+        stored: List[Dict[str, Any]] = []
+        latest: Dict[str, str] = {}
+        with self._get_conn() as conn:
+            for row in rows:
+                cursor = conn.execute(_SQL_INSERT_CONVERSATION_MESSAGE, row)
+                session_id, role, kind, clean_text, created_at = row
+                latest[session_id] = created_at
+                stored.append(
+                    {
+                        "id": cursor.lastrowid,
+                        "session_id": session_id,
+                        "role": role,
+                        "kind": kind,
+                        "text": clean_text,
+                        "created_at": created_at,
+                    }
                 )
-            )
+            conn.executemany(_SQL_TOUCH_SESSION, [(ts, sid) for sid, ts in latest.items()])
         return stored
 
     def get_conversation_messages(self, session_id: str) -> List[Dict[str, Any]]:
@@ -586,6 +1007,7 @@ class DatabaseManager:
             return rows
 
     def get_recent_bus_events(self, limit: int = 25) -> List[Dict[str, Any]]:
+        self._flush_before_read()
         with self._get_conn() as conn:
             cursor = conn.execute(
                 """
@@ -609,11 +1031,11 @@ class DatabaseManager:
     def save_machine_state(self, name: str, state: Dict[str, Any]):
         with self._get_conn() as conn:
             conn.execute(
-                """
+                f"""
                 INSERT OR REPLACE INTO machine_state (name, state_json, updated_at)
-                VALUES (?, ?, ?)
+                VALUES (?, ?, {SQL_NOW_ISO})
                 """,
-                (name, json.dumps(state), datetime.now().isoformat()),
+                (name, json_dumps(state)),
             )
 
     def get_machine_state(self, name: str) -> Optional[Dict[str, Any]]:
@@ -625,7 +1047,7 @@ class DatabaseManager:
             row = cursor.fetchone()
             if not row:
                 return None
-            return json.loads(row[0])
+            return json_loads(row[0])
 
     def clear_machine_state(self, name: str):
         with self._get_conn() as conn:
@@ -761,30 +1183,25 @@ class DatabaseManager:
 
     def create_task_steps(self, task_id: int, steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         now = datetime.now().isoformat()
-        with self._get_conn() as conn:
-            for index, step in enumerate(steps, start=1):
-                text = (step.get("text") or step.get("action") or "").strip()
-                if not text:
-                    continue
-                conn.execute(
-                    """
-                    INSERT INTO task_steps (
-                        task_id, step_number, text, duration_minutes, is_checkpoint,
-                        completed, created_at, completed_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        task_id,
-                        int(step.get("step_number") or index),
-                        text,
-                        step.get("duration_minutes"),
-                        int(bool(step.get("is_checkpoint"))),
-                        int(bool(step.get("completed"))),
-                        now,
-                        now if step.get("completed") else None,
-                    ),
+        rows = []
+        for index, step in enumerate(steps, start=1):
+            text = (step.get("text") or step.get("action") or "").strip()
+            if not text:
+                continue
+            rows.append(
+                (
+                    task_id,
+                    int(step.get("step_number") or index),
+                    text,
+                    step.get("duration_minutes"),
+                    int(bool(step.get("is_checkpoint"))),
+                    int(bool(step.get("completed"))),
+                    now,
+                    now if step.get("completed") else None,
                 )
+            )
+        with self._get_conn() as conn:
+            conn.executemany(_SQL_INSERT_TASK_STEP, rows)
             conn.execute(
                 "UPDATE tasks SET updated_at = ? WHERE id = ?",
                 (now, task_id),
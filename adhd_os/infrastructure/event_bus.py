@@ -1,16 +1,19 @@
 import asyncio
 import inspect
-import json
 import logging
 from collections import deque
+from itertools import islice
 from datetime import datetime
-from typing import Dict, List, Any, Callable
+from typing import Dict, List, Any, Callable, Tuple
 from enum import Enum
 
 from adhd_os.infrastructure import database as database_module
 
 logger = logging.getLogger(__name__)
 
+# Recent events kept in memory for agent context; older ones live in the DB.
+EVENT_LOG_SIZE = 1024
+
 class EventType(Enum):
     """Typed events for the event bus."""
     TASK_STARTED = "task_started"
@@ -24,59 +27,78 @@ class EventType(Enum):
     SESSION_SUMMARIZED = "session_summarized"
     SYSTEM_NOTICE = "system_notice"
 
+
+# Plain-string names so publish skips the Enum.value descriptor per use.
+_EVENT_NAMES: Dict[EventType, str] = {event_type: event_type.value for event_type in EventType}
+
+
 class EventBus:
     """
     Async event bus for decoupled component communication.
     In production, this would use Redis Streams or Cloud Pub/Sub.
     """
     def __init__(self, db=None):
-        self._subscribers: Dict[EventType, List[Callable]] = {}
-        self._event_log: deque = deque(maxlen=1000)
+        # Each handler is stored with whether it is a coroutine function, so
+        # publish doesn't re-inspect it on every dispatch. The per-type tuples
+        # are replaced on (un)subscribe, so publish can iterate them directly.
+        self._subscribers: Dict[EventType, Tuple[Tuple[Callable, bool], ...]] = {}
+        self._event_log: deque = deque(maxlen=EVENT_LOG_SIZE)
         self.db = db or database_module.DB
     
     def subscribe(self, event_type: EventType, handler: Callable):
         """Subscribe a handler to an event type."""
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        self._subscribers[event_type].append(handler)
+        entry = (handler, inspect.iscoroutinefunction(handler))
+        self._subscribers[event_type] = self._subscribers.get(event_type, ()) + (entry,)
 
     def unsubscribe(self, event_type: EventType, handler: Callable):
         """Removes a handler from an event type if present."""
-        handlers = self._subscribers.get(event_type, [])
-        if handler in handlers:
-            handlers.remove(handler)
-        if not handlers and event_type in self._subscribers:
+        handlers = self._subscribers.get(event_type, ())
+        for index, (subscribed, _) in enumerate(handlers):
+            if subscribed == handler:
+                handlers = handlers[:index] + handlers[index + 1:]
+                break
+        if handlers:
+            self._subscribers[event_type] = handlers
+        else:
             self._subscribers.pop(event_type, None)
     
     async def publish(self, event_type: EventType, data: Dict[str, Any]):
         """Publish an event to all subscribers and persist to DB."""
+        name = _EVENT_NAMES[event_type]
         event = {
-            "type": event_type.value,
+            "type": name,
             "data": data,
             "timestamp": datetime.now().isoformat()
         }
         self._event_log.append(event)
-        logger.debug("[EVENT] %s: %s", event_type.value, json.dumps(data, default=str))
+        payload = database_module.json_dumps(data, default=str)
+        logger.debug("[EVENT] %s: %s", name, payload)
 
         # Persist to DB for cross-session pattern analysis
         try:
-            self.db.persist_bus_event(event_type.value, json.dumps(data, default=str))
+            self.db.persist_bus_event(name, payload)
         except Exception:
             pass  # best-effort; don't break the event pipeline
 
-        # Dispatch to subscribers
-        if event_type in self._subscribers:
-            for handler in list(self._subscribers[event_type]):
-                try:
-                    if inspect.iscoroutinefunction(handler):
-                        await handler(data)
-                    else:
-                        handler(data)
-                except Exception as e:
-                    logger.error("[EVENT] Handler failed for %s: %s", event_type.value, e)
+        # Dispatch to subscribers: sync handlers inline, async ones concurrently
+        pending = []
+        for handler, is_coro in self._subscribers.get(event_type, ()):
+            try:
+                if is_coro:
+                    pending.append(handler(data))
+                else:
+                    handler(data)
+            except Exception as e:
+                logger.error("[EVENT] Handler failed for %s: %s", name, e)
+        if not pending:
+            return
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error("[EVENT] Handler failed for %s: %s", name, result)
     
     def get_recent_events(self, count: int = 10) -> List[Dict]:
         """Returns recent events for context."""
-        return list(self._event_log)[-count:]
+        start = max(0, len(self._event_log) - count)
+        return list(islice(self._event_log, start, None))
 
 EVENT_BUS = EventBus()
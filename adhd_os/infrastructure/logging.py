@@ -1,15 +1,36 @@
+import atexit
 import logging
+import logging.handlers
 import json
+import queue
 import sys
 import os
-from datetime import datetime
+import time
 from typing import Any, Dict
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 class JsonFormatter(logging.Formatter):
     """Formats logs as JSON lines."""
+
+    # (whole second, "YYYY-MM-DDTHH:MM:SS") for the last record formatted;
+    # bursts within one second only format the microseconds.
+    _second_prefix = (None, "")
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, prefix = self._second_prefix
+        if cached_second != second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+            self._second_prefix = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}"
+
     def format(self, record):
         log_obj = {
-            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
@@ -20,11 +41,38 @@ class JsonFormatter(logging.Formatter):
         if record.exc_info:
             log_obj["exception"] = self.formatException(record.exc_info)
             
-        return json.dumps(log_obj)
+        if orjson is not None:
+            return orjson.dumps(log_obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(log_obj, default=str)
+
+# Records buffered for the listener thread before new ones are dropped.
+LOG_QUEUE_SIZE = 10000
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queues records without ever blocking; drops them if the listener lags."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room rather than failing to stop when the queue is full.
+        self.queue.put(self._sentinel)
+
 
 def setup_logging(log_file: str = "logs/adhd_os.jsonl"):
-    """Configures structured logging to file and pretty print to console."""
-    
+    """Configures structured logging to file and pretty print to console.
+
+    Records are handed to a QueueListener thread through a bounded queue, so
+    callers never block on JSON formatting, stdout or disk writes.
+    """
+    global _listener
+
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
     
     root_logger = logging.getLogger()
@@ -32,21 +80,39 @@ def setup_logging(log_file: str = "logs/adhd_os.jsonl"):
     
     # Clear existing handlers
     root_logger.handlers = []
-    
+    _stop_listener()
+
     # File Handler (JSONL)
     file_handler = logging.FileHandler(log_file)
     file_handler.setFormatter(JsonFormatter())
-    root_logger.addHandler(file_handler)
-    
+
     # Console Handler (Human Readable)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(logging.Formatter(
         '%(asctime)s | %(levelname)s | %(message)s'
     ))
-    root_logger.addHandler(console_handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    root_logger.addHandler(_DroppingQueueHandler(log_queue))
+    _listener = _QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
 
     return logging.getLogger("adhd_os")
 
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+_listener: logging.handlers.QueueListener | None = None
+atexit.register(_stop_listener)
+
 # Lazy logger — initialized on first use or explicit call from main.
 _logger: logging.Logger | None = None
 
@@ -1,17 +1,24 @@
 import asyncio
-import os
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Dict, Optional
 
+from adhd_os.envs import ENV
 from adhd_os.infrastructure import database as database_module
 from adhd_os.infrastructure.event_bus import EVENT_BUS, EventBus, EventType
 
-DEMO_MODE = os.environ.get("ADHD_OS_DEMO_MODE", "").lower() in ("1", "true", "yes")
+DEMO_MODE = ENV.demo_mode
 
 BODY_DOUBLE_STATE_KEY = "body_double"
 FOCUS_TIMER_STATE_KEY = "focus_timer"
 
+# Rotating body-double check-in messages; only the selected one is formatted.
+_CHECKIN_TEMPLATES = (
+    "Check-in {n}/{total}: still on '{task}'?",
+    "{minutes} minutes in. How's '{task}' going?",
+    "Checkpoint reached. Take a breath, then back to '{task}'.",
+)
+
 
 def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
     if not value:
@@ -362,13 +369,13 @@ class BodyDoubleMachine:
         }
 
     def _checkin_message(self) -> str:
-        total_checkins = max(1, self._total_checkins())
-        messages = [
-            f"Check-in {self.checkin_count}/{total_checkins}: still on '{self.task}'?",
-            f"{self.checkin_interval * self.checkin_count} minutes in. How's '{self.task}' going?",
-            f"Checkpoint reached. Take a breath, then back to '{self.task}'.",
-        ]
-        return messages[(self.checkin_count - 1) % len(messages)]
+        template = _CHECKIN_TEMPLATES[(self.checkin_count - 1) % len(_CHECKIN_TEMPLATES)]
+        return template.format(
+            n=self.checkin_count,
+            total=max(1, self._total_checkins()),
+            minutes=self.checkin_interval * self.checkin_count,
+            task=self.task,
+        )
 
     def _cancel_active_task(self):
         if self._active_task:
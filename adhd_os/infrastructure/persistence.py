@@ -1,17 +1,50 @@
 import asyncio
-import json
+import logging
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
+from uuid import uuid4
 
 from google.adk.sessions import BaseSessionService, Session
-from google.adk.sessions.base_session_service import ListSessionsResponse
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
 from google.adk.events import Event
 from adhd_os.infrastructure import database as database_module
 
+logger = logging.getLogger(__name__)
+
 # Shared executor for offloading blocking sqlite calls.
 _db_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="db")
 
+# Write-path statements are built once so every append hands sqlite3 the same
+# text and reuses the connection's prepared statement.
+_SQL_INSERT_EVENT = "INSERT INTO events (session_id, type, data_json, timestamp) VALUES (?, ?, ?, ?)"
+_SQL_TOUCH_SESSION = "UPDATE sessions SET last_updated_at = ? WHERE id = ?"
+_SQL_SAVE_STATE = "UPDATE sessions SET state_json = ? WHERE id = ?"
+
+# How long the writer waits before retrying appends whose write failed.
+WRITE_RETRY_SECONDS = 1.0
+
+# Events get_session loads when the caller passes no config: the runner only
+# needs recent context, so a long-lived session resumes in bounded time.
+SESSION_EVENT_WINDOW = 200
+
+
+def _events_query(session_id: str, config: Optional[GetSessionConfig]) -> Tuple[str, Tuple[Any, ...]]:
+    """Builds the ADK event query for get_session, applying *config* in SQL."""
+    where = "session_id = ? AND type = 'adk_event'"
+    params: Tuple[Any, ...] = (session_id,)
+    if config and config.after_timestamp:
+        # Stored timestamps are local ISO strings, which sort chronologically.
+        where += " AND timestamp >= ?"
+        params += (datetime.fromtimestamp(config.after_timestamp).isoformat(),)
+    if config and config.num_recent_events:
+        return (
+            f"SELECT data_json FROM (SELECT id, data_json FROM events WHERE {where} "
+            "ORDER BY id DESC LIMIT ?) ORDER BY id ASC",
+            params + (config.num_recent_events,),
+        )
+    return f"SELECT data_json FROM events WHERE {where} ORDER BY id ASC", params
+
 
 class SqliteSessionService(BaseSessionService):
     """
@@ -21,6 +54,91 @@ class SqliteSessionService(BaseSessionService):
 
     def __init__(self, db=None):
         self.db = db or database_module.DB
+        # Write-behind queue for appended events, drained by a writer task on
+        # the loop that first appends (sessions outlive any one asyncio.run).
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._writer_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Appends whose write failed, retried ahead of anything queued later.
+        self._unwritten: List[Tuple[Optional[str], List[tuple], Optional[str]]] = []
+        self._write_error: Optional[BaseException] = None
+
+    def _ensure_writer(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._writer_task is None or self._writer_task.done() or self._writer_loop is not loop:
+            self._queue = asyncio.Queue()
+            self._writer_loop = loop
+            self._writer_task = loop.create_task(self._writer())
+        return self._queue
+
+    async def _writer(self) -> None:
+        """Writes queued appends, coalescing whatever has piled up into one transaction.
+
+        A failed batch is kept and retried, ahead of newer appends so events
+        keep their order, every WRITE_RETRY_SECONDS until it commits.
+        """
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                if self._unwritten:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=WRITE_RETRY_SECONDS))
+                else:
+                    batch.append(await queue.get())
+            except asyncio.TimeoutError:
+                pass
+            while True:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            pending = self._unwritten + batch
+            try:
+                await loop.run_in_executor(_db_executor, self._write_batch, pending)
+                self._unwritten, self._write_error = [], None
+            except Exception as exc:
+                self._unwritten, self._write_error = pending, exc
+                logger.error(
+                    "Failed to persist %d queued append(s); will retry", len(pending), exc_info=True
+                )
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _write_batch(self, batch: List[Tuple[str, List[tuple], Optional[str]]]) -> None:
+        rows = [row for _, session_rows, _ in batch for row in session_rows]
+        # A session's last update is its newest event's already-formatted
+        # timestamp (later rows win), so touching it needs no clock read.
+        latest = {row[0]: row[3] for row in rows}
+        touched = [(timestamp, sid) for sid, timestamp in latest.items()]
+        # Likewise only the newest state snapshot per session needs writing.
+        states = {sid: state_json for sid, _, state_json in batch if state_json is not None}
+        with self.db.get_connection() as conn:
+            conn.executemany(_SQL_INSERT_EVENT, rows)
+            conn.executemany(_SQL_TOUCH_SESSION, touched)
+            conn.executemany(_SQL_SAVE_STATE, [(state_json, sid) for sid, state_json in states.items()])
+
+    async def flush(self, *, strict: bool = True) -> None:
+        """Waits until every appended event has been written to SQLite.
+
+        Appends that still can't be written after one more attempt raise
+        RuntimeError; with ``strict=False`` (reads) they are logged instead.
+        """
+        if self._queue is not None and self._writer_loop is asyncio.get_running_loop():
+            await self._queue.join()
+        if not self._unwritten:
+            return
+        # Nudge the writer into retrying now rather than on its next tick.
+        queue = self._ensure_writer()
+        queue.put_nowait((None, [], None))
+        await queue.join()
+        if not self._unwritten:
+            return
+        message = f"{len(self._unwritten)} session append(s) could not be written"
+        if strict:
+            raise RuntimeError(message) from self._write_error
+        logger.warning("%s; reading without them", message)
 
     async def create_session(
         self,
@@ -32,8 +150,7 @@ class SqliteSessionService(BaseSessionService):
     ) -> Session:
         """Creates a new session in DB."""
         if not session_id:
-            import uuid
-            session_id = str(uuid.uuid4())
+            session_id = str(uuid4())
 
         now = datetime.now()
         session = Session(
@@ -45,6 +162,8 @@ class SqliteSessionService(BaseSessionService):
             last_update_time=now.timestamp(),
         )
 
+        created = now.isoformat()
+
         def _write():
             with self.db.get_connection() as conn:
                 conn.execute(
@@ -52,10 +171,10 @@ class SqliteSessionService(BaseSessionService):
                     INSERT INTO sessions (id, user_id, app_name, created_at, last_updated_at, state_json)
                     VALUES (?, ?, ?, ?, ?, ?)
                     """,
-                    (session.id, user_id, app_name, now, now, json.dumps(session.state)),
+                    (session.id, user_id, app_name, created, created, database_module.json_dumps(session.state)),
                 )
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(_db_executor, _write)
         return session
 
@@ -65,11 +184,20 @@ class SqliteSessionService(BaseSessionService):
         app_name: str,
         user_id: str,
         session_id: str,
-        config: Optional[Any] = None,
+        config: Optional[GetSessionConfig] = None,
+        load_events: bool = True,
     ) -> Optional[Session]:
-        """Retrieves a session from DB."""
+        """Retrieves a session from DB.
+
+        ``config`` limits the events loaded (most recent N, or at/after a
+        timestamp) in SQL; without one, the last SESSION_EVENT_WINDOW events
+        are loaded. Callers that only need the session's identity or
+        state pass ``load_events=False`` to skip reading events entirely.
+        """
+        await self.flush(strict=False)
+
         def _read():
-            with self.db.get_connection() as conn:
+            with self.db.get_read_connection() as conn:
                 cursor = conn.execute(
                     "SELECT user_id, app_name, created_at, last_updated_at, state_json "
                     "FROM sessions WHERE id = ? AND app_name = ? AND user_id = ?",
@@ -79,15 +207,16 @@ class SqliteSessionService(BaseSessionService):
                 if not row:
                     return None
 
-                cursor = conn.execute(
-                    "SELECT type, data_json, timestamp FROM events "
-                    "WHERE session_id = ? ORDER BY id ASC",
-                    (session_id,),
-                )
+                # Rows are validated as the cursor yields them; no fetchall copy.
                 events = []
-                for e_row in cursor.fetchall():
-                    if e_row[0] == "adk_event":
-                        events.append(Event.model_validate_json(e_row[1]))
+                if load_events:
+                    sql, params = _events_query(
+                        session_id, config or GetSessionConfig(num_recent_events=SESSION_EVENT_WINDOW)
+                    )
+                    events = [
+                        Event.model_validate_json(data_json)
+                        for (data_json,) in conn.execute(sql, params)
+                    ]
 
                 last_update = row[3]
                 if isinstance(last_update, str):
@@ -101,18 +230,20 @@ class SqliteSessionService(BaseSessionService):
                     id=session_id,
                     app_name=row[1],
                     user_id=row[0],
-                    state=json.loads(row[4]),
+                    state=database_module.json_loads(row[4]),
                     events=events,
                     last_update_time=last_update_ts,
                 )
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(_db_executor, _read)
 
     async def list_sessions(
         self, *, app_name: str, user_id: Optional[str] = None
     ) -> ListSessionsResponse:
         """Lists sessions for user."""
+        await self.flush(strict=False)
+
         def _read():
             with self.db.get_connection() as conn:
                 if user_id:
@@ -141,20 +272,22 @@ class SqliteSessionService(BaseSessionService):
                             id=r[0],
                             app_name=r[2],
                             user_id=r[1],
-                            state=json.loads(r[5]) if r[5] else {},
+                            state=database_module.json_loads(r[5]) if r[5] else {},
                             events=[],
                             last_update_time=ts,
                         )
                     )
                 return ListSessionsResponse(sessions=sessions)
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(_db_executor, _read)
 
     async def delete_session(
         self, *, app_name: str, user_id: str, session_id: str
     ) -> None:
         """Deletes a session."""
+        await self.flush()
+
         def _delete():
             with self.db.get_connection() as conn:
                 conn.execute(
@@ -167,27 +300,37 @@ class SqliteSessionService(BaseSessionService):
                     (session_id, app_name, user_id),
                 )
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(_db_executor, _delete)
 
     async def append_event(self, session: Session, event: Event) -> Event:
         """Appends an event to DB."""
-        event_json = event.model_dump_json()
-        ts_iso = datetime.fromtimestamp(event.timestamp).isoformat()
-        sid = session.id
+        await self.append_events(session, [event])
+        return event
 
-        def _write():
-            with self.db.get_connection() as conn:
-                conn.execute(
-                    "INSERT INTO events (session_id, type, data_json, timestamp) VALUES (?, ?, ?, ?)",
-                    (sid, "adk_event", event_json, ts_iso),
-                )
-                conn.execute(
-                    "UPDATE sessions SET last_updated_at = ? WHERE id = ?",
-                    (datetime.now(), sid),
-                )
+    async def append_events(self, session: Session, events: List[Event]) -> List[Event]:
+        """Queues events for the background writer and returns without waiting.
 
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(_db_executor, _write)
-        session.events.append(event)
-        return event
+        Appends that pile up while a write is in flight are committed together
+        in one transaction; reads on this service call ``flush()`` first.
+        State deltas are applied to ``session.state`` (as the base service
+        does) and the resulting state is persisted with the events.
+        """
+        if not events:
+            return events
+        sid = session.id
+        state_changed = False
+        for event in events:
+            event = self._trim_temp_delta_state(event)
+            if event.actions and event.actions.state_delta:
+                self._update_session_state(session, event)
+                state_changed = True
+        rows = [
+            (sid, "adk_event", event.model_dump_json(), datetime.fromtimestamp(event.timestamp).isoformat())
+            for event in events
+        ]
+        state_json = database_module.json_dumps(session.state) if state_changed else None
+        self._ensure_writer().put_nowait((sid, rows, state_json))
+        session.events.extend(events)
+        session.last_update_time = events[-1].timestamp
+        return events
@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+import logging
+import time
+from typing import AsyncIterator, Callable, Optional
+
+from adhd_os.envs import ENV
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Caps concurrent and per-minute calls to one provider.
+
+    Concurrency follows AIMD: a rate-limit error halves the cap, and each
+    quiet BACKOFF_SECONDS afterwards restores one slot up to max_concurrent.
+    A token bucket of requests_per_minute smooths bursts below the provider's
+    own limit so calls queue here instead of bouncing off 429 retries.
+    """
+
+    BACKOFF_SECONDS = 60.0
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        requests_per_minute: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.limit = self.max_concurrent
+        self.requests_per_minute = requests_per_minute
+        self._clock = clock
+        self._in_flight = 0
+        self._tokens = float(max(requests_per_minute, 0))
+        self._refilled_at = clock()
+        self._adjusted_at = clock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cond: Optional[asyncio.Condition] = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives bind to one loop; start fresh if the loop changed.
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._loop = loop
+            self._cond = asyncio.Condition()
+            self._in_flight = 0
+        return self._cond
+
+    def _recover(self) -> None:
+        if self.limit >= self.max_concurrent:
+            return
+        steps = int((self._clock() - self._adjusted_at) // self.BACKOFF_SECONDS)
+        if steps > 0:
+            self.limit = min(self.max_concurrent, self.limit + steps)
+            self._adjusted_at += steps * self.BACKOFF_SECONDS
+
+    def _take_token(self) -> float:
+        """Consumes one request token; returns seconds to wait if none is available."""
+        if self.requests_per_minute <= 0:
+            return 0.0
+        rate = self.requests_per_minute / 60.0
+        now = self._clock()
+        self._tokens = min(
+            float(self.requests_per_minute),
+            self._tokens + (now - self._refilled_at) * rate,
+        )
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / rate
+
+    def record_rate_limited(self) -> None:
+        """Halves the concurrency cap after the provider rejects a call."""
+        new_limit = max(1, self.limit // 2)
+        if new_limit < self.limit:
+            logger.warning("Rate limited; reducing concurrency %d -> %d", self.limit, new_limit)
+        self.limit = new_limit
+        self._adjusted_at = self._clock()
+
+    async def acquire(self) -> None:
+        cond = self._condition()
+        async with cond:
+            self._recover()
+            while self._in_flight >= self.limit:
+                await cond.wait()
+                self._recover()
+            self._in_flight += 1
+        try:
+            while (wait := self._take_token()) > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            await self.release()
+            raise
+
+    async def release(self) -> None:
+        cond = self._condition()
+        async with cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._recover()
+            cond.notify(max(1, self.limit - self._in_flight))
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+
+# Shared across every Anthropic-backed agent in the process.
+ANTHROPIC_LIMITER = AdaptiveConcurrencyLimiter(
+    max_concurrent=ENV.anthropic_max_concurrent,
+    requests_per_minute=ENV.anthropic_requests_per_minute,
+)
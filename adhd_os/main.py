@@ -9,7 +9,6 @@ apply_saved_environment_settings()
 from adhd_os.config import MODEL_MODE
 from adhd_os.infrastructure.event_bus import EVENT_BUS, EventType
 from adhd_os.infrastructure.logging import logger
-from adhd_os.runtime import RUNTIME
 from adhd_os.state import USER_STATE
 
 
@@ -20,6 +19,23 @@ def _print_messages(messages):
             print(f"\n{speaker}: {message['text']}")
 
 
+async def _stream_chat_turn(runtime, text: str, session_id: str):
+    """Prints assistant text as it streams, then anything that wasn't streamed."""
+    streamed = False
+    async for chunk in runtime.stream_chat_turn(text, session_id):
+        if chunk["type"] == "delta":
+            if not streamed:
+                print("\nADHD-OS: ", end="", flush=True)
+                streamed = True
+            print(chunk["text"], end="", flush=True)
+        elif chunk["type"] == "turn":
+            messages = chunk["turn"]["messages"]
+            if streamed:
+                print()
+                messages = [m for m in messages if not (m["role"] == "assistant" and m["kind"] == "chat")]
+            _print_messages(messages)
+
+
 def _print_live_event(prefix: str, message: str):
     if not message:
         return
@@ -28,17 +44,6 @@ def _print_live_event(prefix: str, message: str):
 
 async def run_adhd_os():
     """Main interaction loop for ADHD-OS v2.1."""
-    await RUNTIME.startup()
-    session = await RUNTIME.ensure_session()
-
-    logger.info("ADHD Operating System v2.1 Started")
-    logger.info("Model Mode: %s", MODEL_MODE.value)
-
-    if RUNTIME.db.conversation_message_count(session.id) > 0:
-        print(f"\nWelcome back! Resuming session {session.id[:8]}.")
-        if USER_STATE.current_task:
-            print(f"   You were working on: {USER_STATE.current_task}")
-
     print("=" * 70)
     print("  ADHD Operating System v2.1")
     print("  UI-First Runtime + Full Agent Roster")
@@ -56,6 +61,21 @@ async def run_adhd_os():
     print("  'quit'               - Exit immediately")
     print()
 
+    # The runtime pulls in ADK, genai and the agent roster; import it after
+    # the banner so the user sees output before that cost is paid.
+    from adhd_os.runtime import RUNTIME
+
+    await RUNTIME.startup()
+    session = await RUNTIME.ensure_session()
+
+    logger.info("ADHD Operating System v2.1 Started")
+    logger.info("Model Mode: %s", MODEL_MODE.value)
+
+    if RUNTIME.db.conversation_message_count(session.id) > 0:
+        print(f"Welcome back! Resuming session {session.id[:8]}.")
+        if USER_STATE.current_task:
+            print(f"   You were working on: {USER_STATE.current_task}")
+
     async def on_task_completed(data):
         ratio = data.get("ratio", 1.0)
         if ratio > 1.5:
@@ -104,20 +124,22 @@ async def run_adhd_os():
 
             if user_input.lower() == "quit":
                 print("\n Work mode complete. See you tomorrow!")
+                await RUNTIME.drain_background_tasks()
                 break
 
             if user_input.lower() == "shutdown":
                 result = await RUNTIME.shutdown_session(session.id)
                 _print_messages(result["messages"])
+                await RUNTIME.drain_background_tasks()
                 break
 
-            result = await RUNTIME.chat_turn(user_input, session.id)
-            _print_messages(result["messages"])
+            await _stream_chat_turn(RUNTIME, user_input, session.id)
 
         except KeyboardInterrupt:
             print("\n\n Interrupted. Running quick shutdown...")
             result = await RUNTIME.shutdown_session(session.id)
             _print_messages(result["messages"])
+            await RUNTIME.drain_background_tasks()
             break
         except Exception as exc:
             err_msg = str(exc).lower()
@@ -0,0 +1,156 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import Client
+from pydantic import PrivateAttr
+
+from adhd_os.infrastructure.rate_limit import ANTHROPIC_LIMITER
+
+logger = logging.getLogger(__name__)
+
+# LiteLLM-style provider prefix for models served by the native Gemini client.
+GEMINI_PREFIX = "gemini/"
+ANTHROPIC_PREFIX = "anthropic/"
+
+# Anthropic prompt-cache breakpoints, applied by LiteLLM's cache-control hook.
+# The system message (tools + instruction) is static per agent because
+# per-turn context is injected into the contents, so it caches across turns.
+# The <context> block is inserted just before the latest user turn, so the
+# history before it is unchanged from the previous turn and the trailing
+# breakpoint's prefix is read back from cache on the next turn.
+ANTHROPIC_CACHE_POINTS = (
+    {"location": "message", "role": "system"},
+    {"location": "message", "index": -1},
+)
+
+
+class CoalescingGemini(Gemini):
+    """Native Gemini client that shares one upstream call between identical in-flight requests.
+
+    Concurrent sessions (CLI + dashboard tabs, retried requests) that submit the
+    same non-streaming request while the first is still pending wait on that
+    call instead of issuing their own.
+    """
+
+    _in_flight: Dict[str, "asyncio.Future[List[LlmResponse]]"] = PrivateAttr(default_factory=dict)
+    _client: Optional[Client] = PrivateAttr(default=None)
+    _client_keys: Optional[tuple] = PrivateAttr(default=None)
+
+    @property
+    def api_client(self) -> Client:
+        """Rebuilds the genai client when the API key in the environment changes.
+
+        Instances are shared for the life of the process (see get_llm), and the
+        dashboard updates keys in os.environ without a restart.
+        """
+        keys = (os.environ.get("GOOGLE_API_KEY"), os.environ.get("GEMINI_API_KEY"))
+        if self._client is None or keys != self._client_keys:
+            self._client = Gemini.api_client.func(self)
+            self._client_keys = keys
+        return self._client
+
+    @staticmethod
+    def _request_key(llm_request: LlmRequest) -> Optional[str]:
+        try:
+            payload = llm_request.model_dump_json(
+                exclude={"tools_dict", "live_connect_config"},
+                exclude_none=True,
+            )
+        except Exception:
+            return None
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = None if stream else self._request_key(llm_request)
+        if key is None:
+            async for response in super().generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            logger.debug("Coalescing identical Gemini request %s", key[:12])
+            try:
+                shared = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                shared = None  # the leading call was abandoned; make our own
+            if shared is not None:
+                for response in shared:
+                    yield response.model_copy(deep=True)
+                return
+            async for response in super().generate_content_async(llm_request, stream=False):
+                yield response
+            return
+
+        future: "asyncio.Future[List[LlmResponse]]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        responses: List[LlmResponse] = []
+        try:
+            async for response in super().generate_content_async(llm_request, stream=False):
+                responses.append(response.model_copy(deep=True))
+                yield response
+            future.set_result(responses)
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure doesn't log "exception was never retrieved".
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    return getattr(exc, "status_code", None) == 429
+
+
+class RateLimitedLiteLlm(LiteLlm):
+    """LiteLLM client that queues Anthropic calls behind the shared adaptive limiter."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async with ANTHROPIC_LIMITER.slot():
+            try:
+                async for response in super().generate_content_async(llm_request, stream=stream):
+                    yield response
+            except Exception as exc:
+                if _is_rate_limited(exc):
+                    ANTHROPIC_LIMITER.record_rate_limited()
+                raise
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm(model_name: str) -> BaseLlm:
+    """Returns the shared LLM client for a model string.
+
+    Gemini models go straight through ADK's native google-genai client;
+    everything else (Anthropic, etc.) stays on LiteLLM. Agents configured
+    with the same model reuse one client, and with it one connection pool.
+    Anthropic models mark the static system prompt for server-side prompt
+    caching so repeat turns skip re-processing it, and share one adaptive
+    rate limiter so bursts queue locally instead of triggering 429 retries.
+    """
+    if model_name.startswith(GEMINI_PREFIX):
+        return CoalescingGemini(model=model_name[len(GEMINI_PREFIX):])
+    if model_name.startswith(ANTHROPIC_PREFIX):
+        return RateLimitedLiteLlm(
+            model=model_name,
+            cache_control_injection_points=[dict(point) for point in ANTHROPIC_CACHE_POINTS],
+        )
+    return LiteLlm(model=model_name)
@@ -39,3 +39,17 @@ class TimeCalibration(BaseModel):
     calibrated_estimate: int
     similar_past_tasks: List[str] = []
     recommendation: str
+
+class SessionSummary(BaseModel):
+    """Structured end-of-session summary for storage and handoff."""
+    session_date: str = Field(..., description="YYYY-MM-DD")
+    energy_trajectory: str = Field(..., description='e.g. "started 4, ended 6"')
+    tasks_discussed: List[str]
+    tasks_completed: List[str]
+    accomplishments: List[str]
+    narrative_summary: str = Field(..., description="Warm paragraph addressed to the user")
+    barriers_encountered: List[str]
+    interventions_used: List[str]
+    open_loops: List[str]
+    notable_patterns: List[str]
+    tomorrow_priorities: List[str]
@@ -1,14 +1,15 @@
 import asyncio
 import inspect
 import json
+import logging
 import os
 from datetime import datetime
-from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, List, Optional, Set
 
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
 from google.genai import types
 
-from adhd_os.agents.orchestrator import orchestrator
 from adhd_os.config import MODEL_MODE, ModelMode
 from adhd_os.infrastructure.cache import TASK_CACHE
 from adhd_os.infrastructure.database import DB
@@ -29,6 +30,8 @@ from adhd_os.models.schemas import DecompositionPlan, TaskStep
 from adhd_os.state import USER_STATE
 from adhd_os.tools.common import capture_event_loop
 
+logger = logging.getLogger(__name__)
+
 
 def _as_iso(value: Any) -> Optional[str]:
     if value is None:
@@ -72,7 +75,8 @@ class ADHDOSRuntime:
         event_bus=EVENT_BUS,
         body_double=BODY_DOUBLE,
         focus_timer=FOCUS_TIMER,
-        agent=orchestrator,
+        agent=None,
+        shutdown_agent=None,
         runner_factory: Callable[..., Runner] = Runner,
         session_service: Optional[SqliteSessionService] = None,
     ):
@@ -83,11 +87,14 @@ class ADHDOSRuntime:
         self.body_double = body_double
         self.focus_timer = focus_timer
         self.agent = agent
+        self.shutdown_agent = shutdown_agent
         self.runner_factory = runner_factory
         self._session_service = session_service
         self._runner: Optional[Runner] = None
+        self._shutdown_runner: Optional[Runner] = None
         self._startup_lock = asyncio.Lock()
         self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
         self._started = False
 
     @property
@@ -99,6 +106,12 @@ class ADHDOSRuntime:
     @property
     def runner(self) -> Runner:
         if self._runner is None:
+            if self.agent is None:
+                # Imported here so state-only callers (dashboard reads, health
+                # checks) never load the agent graph.
+                from adhd_os.agents.orchestrator import get_orchestrator
+
+                self.agent = get_orchestrator()
             self._runner = self.runner_factory(
                 agent=self.agent,
                 app_name=self.app_name,
@@ -106,6 +119,21 @@ class ADHDOSRuntime:
             )
         return self._runner
 
+    @property
+    def shutdown_runner(self) -> Runner:
+        """Runner for the parallel pattern-analysis + summary fan-out used at shutdown."""
+        if self._shutdown_runner is None:
+            if self.shutdown_agent is None:
+                from adhd_os.agents.orchestrator import get_shutdown_agent
+
+                self.shutdown_agent = get_shutdown_agent()
+            self._shutdown_runner = self.runner_factory(
+                agent=self.shutdown_agent,
+                app_name=self.app_name,
+                session_service=self.session_service,
+            )
+        return self._shutdown_runner
+
     async def startup(self):
         if self._started:
             return
@@ -115,8 +143,8 @@ class ADHDOSRuntime:
                 return
             self._load_saved_provider_environment()
             capture_event_loop()
+            self.db.start_background_writer()
             self.user_state.load_from_db()
-            _ = self.runner
             await self.body_double.restore_state()
             await self.focus_timer.restore_state()
             self._started = True
@@ -148,6 +176,7 @@ class ADHDOSRuntime:
                 app_name=self.app_name,
                 user_id=self.user_state.user_id,
                 session_id=session_id,
+                load_events=False,
             )
             if not session:
                 raise ValueError(f"Unknown session: {session_id}")
@@ -161,6 +190,8 @@ class ADHDOSRuntime:
         if self.db.conversation_message_count(session_id) > 0:
             return
 
+        await self.session_service.flush(strict=False)
+
         normalized: List[Dict[str, Any]] = []
         for event in self.db.get_session_event_payloads(session_id):
             text, role = self._project_event_to_message(event)
@@ -180,6 +211,16 @@ class ADHDOSRuntime:
             self.db.store_conversation_messages(normalized)
 
     async def chat_turn(self, text: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        async for chunk in self.stream_chat_turn(text, session_id=session_id):
+            if chunk["type"] == "turn":
+                result = chunk["turn"]
+        return result
+
+    async def stream_chat_turn(
+        self, text: str, session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Runs a chat turn, yielding text deltas as they stream and then the final turn payload."""
         clean_text = (text or "").strip()
         if not clean_text:
             raise ValueError("Chat turn text cannot be empty.")
@@ -202,13 +243,20 @@ class ADHDOSRuntime:
                     kind="safety",
                     text=self.CRISIS_MESSAGE,
                 )
-                return self._turn_response(
-                    session.id,
-                    [user_message, safety_message],
-                )
+                yield {
+                    "type": "turn",
+                    "turn": self._turn_response(session.id, [user_message, safety_message]),
+                }
+                return
 
             assistant_texts: List[str] = []
-            async for event in self._iter_runner_events(session.id, clean_text):
+            async for event in self._iter_runner_events(session.id, clean_text, streaming=True):
+                if getattr(event, "partial", False):
+                    delta = self._extract_assistant_delta(event)
+                    if delta:
+                        yield {"type": "delta", "author": getattr(event, "author", None), "text": delta}
+                    continue
+
                 text_parts = self._extract_assistant_texts(event)
                 for part in text_parts:
                     if not assistant_texts or assistant_texts[-1] != part:
@@ -226,9 +274,10 @@ class ADHDOSRuntime:
                     )
                 )
 
-            return self._turn_response(session.id, stored_messages)
+            yield {"type": "turn", "turn": self._turn_response(session.id, stored_messages)}
 
     async def shutdown_session(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Acknowledges shutdown immediately; the summary fan-out runs in the background."""
         session = await self.ensure_session(session_id)
         lock = self._get_session_lock(session.id)
 
@@ -239,44 +288,61 @@ class ADHDOSRuntime:
                 kind="system",
                 text="shutdown",
             )
-
-            assistant_texts: List[str] = []
-            async for event in self._iter_runner_events(session.id, "shutdown"):
-                text_parts = self._extract_assistant_texts(event)
-                for part in text_parts:
-                    if not assistant_texts or assistant_texts[-1] != part:
-                        assistant_texts.append(part)
-
             self.user_state.save_to_db()
-            await self.event_bus.publish(
-                EventType.SESSION_SUMMARIZED,
-                {
-                    "timestamp": datetime.now().isoformat(),
-                    "session_id": session.id,
-                },
+            ack_message = self.db.store_conversation_message(
+                session_id=session.id,
+                role="system",
+                kind="system",
+                text="Session saved. Work mode complete!",
             )
 
-            stored_messages = [user_message]
+        self._spawn_background(self._summarize_session(session.id))
+        return self._turn_response(session.id, [user_message, ack_message])
+
+    async def _summarize_session(self, session_id: str) -> None:
+        async with self._get_session_lock(session_id):
+            assistant_texts: List[str] = []
+            try:
+                async for event in self._iter_runner_events(
+                    session_id, "shutdown", runner=self.shutdown_runner
+                ):
+                    for part in self._extract_assistant_texts(event):
+                        if not assistant_texts or assistant_texts[-1] != part:
+                            assistant_texts.append(part)
+            except Exception:
+                logger.exception("Shutdown summary failed for session %s", session_id)
+                return
+
             assistant_text = "\n\n".join(assistant_texts).strip()
             if assistant_text:
-                stored_messages.append(
-                    self.db.store_conversation_message(
-                        session_id=session.id,
-                        role="assistant",
-                        kind="chat",
-                        text=assistant_text,
-                    )
-                )
-
-            stored_messages.append(
                 self.db.store_conversation_message(
-                    session_id=session.id,
-                    role="system",
-                    kind="system",
-                    text="Session saved. Work mode complete!",
+                    session_id=session_id,
+                    role="assistant",
+                    kind="chat",
+                    text=assistant_text,
                 )
-            )
-            return self._turn_response(session.id, stored_messages)
+            self.user_state.save_to_db()
+
+        await self.event_bus.publish(
+            EventType.SESSION_SUMMARIZED,
+            {
+                "timestamp": datetime.now().isoformat(),
+                "session_id": session_id,
+                "message": "Session summary saved.",
+            },
+        )
+
+    def _spawn_background(self, coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def drain_background_tasks(self) -> None:
+        """Waits for deferred work (shutdown summaries, queued event writes) before the process exits."""
+        while self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self.session_service.flush()
 
     async def update_user_state_data(
         self,
@@ -307,7 +373,7 @@ class ADHDOSRuntime:
             changes.append("current_task")
 
         if mood_indicator:
-            self.user_state.mood_indicators.append(mood_indicator)
+            self.user_state.add_mood_indicator(mood_indicator)
             changes.append("mood_indicator")
 
         if changes:
@@ -508,7 +574,7 @@ class ADHDOSRuntime:
             "peak_window": self.user_state.peak_window_status,
             "current_task": self.user_state.current_task,
             "focus_block_active": self.user_state.focus_block_active,
-            "mood_indicators": self.user_state.mood_indicators[-5:],
+            "mood_indicators": self.user_state.recent_moods(),
             "medication_time": _as_iso(self.user_state.medication_time),
             "time": datetime.now().strftime("%H:%M"),
         }
@@ -568,6 +634,7 @@ class ADHDOSRuntime:
                     app_name=self.app_name,
                     user_id=self.user_state.user_id,
                     session_id=latest.id,
+                    load_events=False,
                 )
                 if session:
                     return session
@@ -577,14 +644,19 @@ class ADHDOSRuntime:
             user_id=self.user_state.user_id,
         )
 
-    async def _iter_runner_events(self, session_id: str, text: str) -> AsyncIterator[Any]:
-        result = self.runner.run_async(
+    async def _iter_runner_events(
+        self, session_id: str, text: str, *, streaming: bool = False, runner: Optional[Runner] = None
+    ) -> AsyncIterator[Any]:
+        # Shutdown stays non-streaming: the summarizer and pattern agents emit JSON.
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE)
+        result = (runner or self.runner).run_async(
             user_id=self.user_state.user_id,
             session_id=session_id,
             new_message=types.Content(
                 role="user",
                 parts=[types.Part(text=text)],
             ),
+            run_config=run_config,
         )
 
         if inspect.isawaitable(result) and not hasattr(result, "__aiter__"):
@@ -601,6 +673,16 @@ class ADHDOSRuntime:
         for event in result:
             yield event
 
+    def _extract_assistant_delta(self, event: Any) -> str:
+        content = getattr(event, "content", None)
+        if not content or getattr(content, "role", None) == "user":
+            return ""
+        parts = getattr(content, "parts", None) or []
+        return "".join(
+            part.text for part in parts
+            if getattr(part, "text", None) and not getattr(part, "thought", False)
+        )
+
     def _extract_assistant_texts(self, event: Any) -> List[str]:
         content = getattr(event, "content", None)
         if not content:
@@ -1,10 +1,33 @@
+import time
+from collections import deque
+from itertools import islice
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from datetime import datetime
+from typing import Optional, List, Deque, Dict, Any, Tuple
 
 # Hard ceiling to prevent runaway multiplier accumulation.
 MAX_MULTIPLIER = 4.0
 
+# dynamic_multiplier adjustments as lookup tables.
+# Energy 0-10: very low (<=3) is much slower, below average (4-5) slower,
+# high (>=8) slightly faster.
+_ENERGY_ADJUSTMENT = (0.4, 0.4, 0.4, 0.4, 0.2, 0.2, 0.0, 0.0, -0.1, -0.1, -0.1)
+# Indexed by is_in_peak_window: off-peak is slower.
+_PEAK_ADJUSTMENT = (0.3, 0.0)
+# By hour: afternoon slump from 15:00, evening from 20:00.
+_HOUR_ADJUSTMENT = tuple(0.25 if hour >= 20 else 0.15 if hour >= 15 else 0.0 for hour in range(24))
+
+# Recent completions kept in memory per task type.
+TASK_HISTORY_WINDOW = 20
+# Mood indicators kept in memory; agents only see the last few.
+MOOD_HISTORY_SIZE = 50
+
+# user_state keys written by save_to_db and read back by load_from_db.
+_PERSISTED_KEYS = ("base_multiplier", "peak_window_hours", "current_task", "energy_level", "medication_time")
+
+# How long an agent-facing snapshot is reused when no field has changed.
+SNAPSHOT_TTL_SECONDS = 10.0
+
 @dataclass
 class UserState:
     """
@@ -22,10 +45,68 @@ class UserState:
     medication_time: Optional[datetime] = None
     current_task: Optional[str] = None
     focus_block_active: bool = False
-    mood_indicators: List[str] = field(default_factory=list)
+    mood_indicators: Deque[str] = field(default_factory=lambda: deque(maxlen=MOOD_HISTORY_SIZE))
     
-    # Historical data (for calibration)
-    task_history: Dict[str, List[Dict]] = field(default_factory=dict)
+    # Historical data (for calibration); the DB keeps the full record.
+    task_history: Dict[str, Deque[Dict]] = field(default_factory=dict)
+
+    # Cached agent-facing snapshot; cleared whenever a public field is assigned.
+    _snapshot: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _snapshot_at: float = field(default=0.0, init=False, repr=False, compare=False)
+    # (start, end) of the peak window as Unix timestamps, so window checks
+    # compare against time.time(); recomputed when its inputs change.
+    _peak_bounds: Optional[Tuple[float, float]] = field(default=None, init=False, repr=False, compare=False)
+    # Learned per-type multipliers read from the DB; a type's entry is dropped
+    # when a completion for it is logged, the only way task_history changes.
+    _type_multipliers: Dict[str, Optional[float]] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            object.__setattr__(self, "_snapshot", None)
+            if name in ("medication_time", "peak_window_hours"):
+                object.__setattr__(self, "_peak_bounds", None)
+
+    def _peak_window(self) -> Optional[Tuple[float, float]]:
+        if not self.medication_time:
+            return None
+        if self._peak_bounds is None:
+            taken = self.medication_time.timestamp()
+            self._peak_bounds = (
+                taken + self.peak_window_hours[0] * 3600,
+                taken + self.peak_window_hours[1] * 3600,
+            )
+        return self._peak_bounds
+
+    def add_mood_indicator(self, indicator: str) -> None:
+        """Records a mood indicator (in-place changes bypass __setattr__)."""
+        self.mood_indicators.append(indicator)
+        self._snapshot = None
+
+    def recent_moods(self, count: int = 5) -> List[str]:
+        """The newest *count* mood indicators, oldest first."""
+        moods = self.mood_indicators
+        return list(islice(moods, max(0, len(moods) - count), None))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Agent-facing state with derived fields, reused for SNAPSHOT_TTL_SECONDS."""
+        now = time.monotonic()
+        if self._snapshot is None or now - self._snapshot_at >= SNAPSHOT_TTL_SECONDS:
+            # One wall-clock read shared by every time-dependent field.
+            wall = time.time()
+            self._snapshot = {
+                "user_id": self.user_id,
+                "energy_level": self.energy_level,
+                "dynamic_multiplier": self._multiplier_at(wall),
+                "base_multiplier": self.base_multiplier,
+                "peak_window": self._peak_status_at(wall),
+                "current_task": self.current_task,
+                "focus_block_active": self.focus_block_active,
+                "mood_indicators": self.recent_moods(),
+                "time": time.strftime("%H:%M", time.localtime(wall)),
+            }
+            self._snapshot_at = now
+        return dict(self._snapshot)
     
     @property
     def dynamic_multiplier(self) -> float:
@@ -33,100 +114,97 @@ class UserState:
         Calculates real-time multiplier based on current state.
         This is the key insight from v2.0 - multiplier isn't static.
         """
-        mult = self.base_multiplier
-        
-        # Energy adjustment (-0.1 to +0.4)
-        if self.energy_level <= 3:
-            mult += 0.4  # Very low energy = much slower
-        elif self.energy_level <= 5:
-            mult += 0.2  # Below average
-        elif self.energy_level >= 8:
-            mult -= 0.1  # High energy = slightly faster
-            
-        # Medication adjustment
-        if not self.is_in_peak_window:
-            mult += 0.3  # Off-peak = slower
-            
-        # Time of day adjustment
-        hour = datetime.now().hour
-        if hour >= 15:  # Afternoon slump
-            mult += 0.15
-        elif hour >= 20:  # Evening
-            mult += 0.25
-            
+        return self._multiplier_at(time.time())
+
+    def _multiplier_at(self, now: float) -> float:
+        level = min(max(int(self.energy_level), 0), 10)
+        mult = (
+            self.base_multiplier
+            + _ENERGY_ADJUSTMENT[level]
+            + _PEAK_ADJUSTMENT[self._peak_active(now)]
+            + _HOUR_ADJUSTMENT[time.localtime(now).tm_hour]
+        )
         return round(max(1.0, min(MAX_MULTIPLIER, mult)), 2)
     
     @property
     def is_in_peak_window(self) -> bool:
         """Returns True if currently in medication peak window."""
-        if not self.medication_time:
+        return self._peak_active(time.time())
+
+    def _peak_active(self, now: float) -> bool:
+        bounds = self._peak_window()
+        if bounds is None:
             return False
-        now = datetime.now()
-        start = self.medication_time + timedelta(hours=self.peak_window_hours[0])
-        end = self.medication_time + timedelta(hours=self.peak_window_hours[1])
-        return start <= now <= end
+        return bounds[0] <= now <= bounds[1]
     
     @property
     def peak_window_status(self) -> Dict[str, Any]:
         """Returns detailed peak window information."""
-        if not self.medication_time:
+        return self._peak_status_at(time.time())
+
+    def _peak_status_at(self, now: float) -> Dict[str, Any]:
+        bounds = self._peak_window()
+        if bounds is None:
             return {"active": False, "reason": "no_medication_logged"}
-        
-        now = datetime.now()
-        start = self.medication_time + timedelta(hours=self.peak_window_hours[0])
-        end = self.medication_time + timedelta(hours=self.peak_window_hours[1])
-        
+
+        start, end = bounds
+
         if now < start:
-            mins_until = int((start - now).total_seconds() / 60)
+            mins_until = int((start - now) / 60)
             return {"active": False, "reason": "not_yet", "minutes_until_peak": mins_until}
         elif now > end:
             return {"active": False, "reason": "ended"}
         else:
-            mins_remaining = int((end - now).total_seconds() / 60)
+            mins_remaining = int((end - now) / 60)
             return {"active": True, "minutes_remaining": mins_remaining}
-    
+
     def load_from_db(self):
         """Loads state from database."""
         from adhd_os.infrastructure.database import DB
-        
-        # Load persistent config
-        self.base_multiplier = DB.get_state("base_multiplier", 1.5)
-        self.peak_window_hours = tuple(DB.get_state("peak_window_hours", [1, 5]))
-        self.current_task = DB.get_state("current_task", None)
-        self.energy_level = int(DB.get_state("energy_level", 5))
-        
-        med_time_iso = DB.get_state("medication_time", None)
+
+        self._type_multipliers.clear()
+        # Load persistent config in one read
+        saved = DB.get_state_values(list(_PERSISTED_KEYS))
+        self.base_multiplier = saved.get("base_multiplier", 1.5)
+        self.peak_window_hours = tuple(saved.get("peak_window_hours", [1, 5]))
+        self.current_task = saved.get("current_task")
+        self.energy_level = int(saved.get("energy_level", 5))
+
+        med_time_iso = saved.get("medication_time")
         if med_time_iso:
             try:
                 self.medication_time = datetime.fromisoformat(med_time_iso)
             except ValueError:
                 self.medication_time = None
-        
+
     def save_to_db(self):
-        """Saves persistent state to database."""
+        """Saves persistent state to database in one transaction."""
         from adhd_os.infrastructure.database import DB
-        DB.save_state("base_multiplier", self.base_multiplier)
-        DB.save_state("peak_window_hours", list(self.peak_window_hours))
-        DB.save_state("current_task", self.current_task)
-        DB.save_state("energy_level", self.energy_level)
-        DB.save_state(
-            "medication_time",
-            self.medication_time.isoformat() if self.medication_time else None,
-        )
+        DB.save_states({
+            "base_multiplier": self.base_multiplier,
+            "peak_window_hours": list(self.peak_window_hours),
+            "current_task": self.current_task,
+            "energy_level": self.energy_level,
+            "medication_time": self.medication_time.isoformat() if self.medication_time else None,
+        })
 
     def get_task_type_multiplier(self, task_type: str) -> Optional[float]:
-        """Returns learned multiplier from DB."""
+        """Returns learned multiplier from DB, memoized until the next completion of that type."""
+        if task_type in self._type_multipliers:
+            return self._type_multipliers[task_type]
         from adhd_os.infrastructure.database import DB
-        return DB.get_task_multiplier(task_type)
+        multiplier = self._type_multipliers[task_type] = DB.get_task_multiplier(task_type)
+        return multiplier
 
     def log_task_completion(self, task_type: str, estimated: int, actual: int):
         """Logs task completion to DB."""
         from adhd_os.infrastructure.database import DB
         
         # Update in-memory history for immediate feedback (optional)
-        if task_type not in self.task_history:
-            self.task_history[task_type] = []
-        self.task_history[task_type].append({
+        history = self.task_history.get(task_type)
+        if history is None:
+            history = self.task_history[task_type] = deque(maxlen=TASK_HISTORY_WINDOW)
+        history.append({
             "estimated": estimated,
             "actual": actual,
             "timestamp": datetime.now().isoformat()
@@ -137,6 +215,7 @@ class UserState:
             task_type, estimated, actual, 
             self.energy_level, self.is_in_peak_window
         )
+        self._type_multipliers.pop(task_type, None)
 
 # Global state instance
 USER_STATE = UserState()
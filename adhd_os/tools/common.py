@@ -1,8 +1,9 @@
 import asyncio
 import logging
 import os
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Tuple
 
 from google.adk.tools import FunctionTool
 
@@ -16,6 +17,10 @@ from adhd_os.infrastructure.machines import BODY_DOUBLE, FOCUS_TIMER
 
 _main_loop: asyncio.AbstractEventLoop | None = None
 
+# Strong references to fire-and-forget tasks; the loop itself only keeps weak
+# ones, so an unreferenced task can be garbage-collected before it finishes.
+_background_tasks: set = set()
+
 
 def capture_event_loop():
     """Call from the main async entry point to store a reference to the event loop."""
@@ -26,12 +31,14 @@ def capture_event_loop():
 def _fire_and_forget(coro):
     """Safely schedule a coroutine as a background task."""
     try:
-        loop = asyncio.get_running_loop()
-        task = loop.create_task(coro)
-        task.add_done_callback(_handle_task_exception)
-        return
+        task = asyncio.create_task(coro)
     except RuntimeError:
         pass
+    else:
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        task.add_done_callback(_handle_task_exception)
+        return
 
     # Fallback: running in a worker thread — use the stored main loop
     if _main_loop is not None and _main_loop.is_running():
@@ -57,31 +64,28 @@ def _handle_task_exception(task):
         logger.error("Background task failed: %s", exc, exc_info=exc)
 
 
+# (epoch minute, result) for get_current_time; its output only changes per minute.
+_time_cache: Optional[Tuple[int, Dict[str, str]]] = None
+
 @FunctionTool
 def get_current_time() -> Dict:
     """Returns current time and temporal context."""
-    now = datetime.now()
-    return {
-        "time": now.strftime("%H:%M"),
-        "day": now.strftime("%A"),
-        "date": now.strftime("%Y-%m-%d"),
-        "period": "morning" if now.hour < 12 else "afternoon" if now.hour < 17 else "evening"
-    }
+    global _time_cache
+    minute = int(time.time()) // 60
+    if _time_cache is None or _time_cache[0] != minute:
+        now = datetime.now()
+        _time_cache = (minute, {
+            "time": now.strftime("%H:%M"),
+            "day": now.strftime("%A"),
+            "date": now.strftime("%Y-%m-%d"),
+            "period": "morning" if now.hour < 12 else "afternoon" if now.hour < 17 else "evening"
+        })
+    return dict(_time_cache[1])
 
 @FunctionTool
 def get_user_state() -> Dict:
     """Returns comprehensive user state for agent context."""
-    return {
-        "user_id": USER_STATE.user_id,
-        "energy_level": USER_STATE.energy_level,
-        "dynamic_multiplier": USER_STATE.dynamic_multiplier,
-        "base_multiplier": USER_STATE.base_multiplier,
-        "peak_window": USER_STATE.peak_window_status,
-        "current_task": USER_STATE.current_task,
-        "focus_block_active": USER_STATE.focus_block_active,
-        "mood_indicators": USER_STATE.mood_indicators[-5:],  # Last 5
-        "time": datetime.now().strftime("%H:%M")
-    }
+    return USER_STATE.snapshot()
 
 @FunctionTool
 def update_user_state(
@@ -107,7 +111,7 @@ def update_user_state(
         changes.append(f"task={current_task[:20]}")
     
     if mood_indicator:
-        USER_STATE.mood_indicators.append(mood_indicator)
+        USER_STATE.add_mood_indicator(mood_indicator)
         changes.append(f"mood={mood_indicator}")
 
     if changes:
@@ -176,7 +180,7 @@ def store_task_decomposition(task_description: str, plan_json: Dict) -> Dict:
     from adhd_os.models.schemas import DecompositionPlan
     try:
         # Validate plan structure
-        plan = DecompositionPlan(**plan_json)
+        plan = DecompositionPlan.model_validate(plan_json)
         TASK_CACHE.store_with_energy(task_description, plan, USER_STATE.energy_level)
         return {"stored": True, "message": "Plan cached successfully."}
     except Exception as e:
@@ -282,14 +286,22 @@ def get_recent_history(limit: int = 50) -> List[Dict]:
     from adhd_os.infrastructure.database import DB
     return DB.get_recent_history(limit)
 
+# Project root for the read-only file tools, resolved once at import.
+_PROJECT_ROOT = os.path.realpath(os.getcwd())
+
+
+def _project_path(path: str) -> Optional[str]:
+    """Resolves *path* against the project root, or None if it escapes it."""
+    target = os.path.realpath(os.path.join(_PROJECT_ROOT, path))
+    if os.path.commonpath((_PROJECT_ROOT, target)) != _PROJECT_ROOT:
+        return None
+    return target
+
 @FunctionTool
 def safe_list_dir(path: str = ".") -> List[str]:
     """Lists files in the project directory (read-only)."""
-    from pathlib import Path
-    base_path = Path.cwd().resolve()
-    target_path = (base_path / path).resolve()
-    
-    if not target_path.is_relative_to(base_path):
+    target_path = _project_path(path)
+    if target_path is None:
         return ["Error: Access denied. Stay within project root."]
     
     try:
@@ -300,11 +312,8 @@ def safe_list_dir(path: str = ".") -> List[str]:
 @FunctionTool
 def safe_read_file(path: str) -> str:
     """Reads a file from the project directory (read-only)."""
-    from pathlib import Path
-    base_path = Path.cwd().resolve()
-    target_path = (base_path / path).resolve()
-    
-    if not target_path.is_relative_to(base_path):
+    target_path = _project_path(path)
+    if target_path is None:
         return "Error: Access denied. Stay within project root."
     
     try:
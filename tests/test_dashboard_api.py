@@ -1,8 +1,9 @@
 import asyncio
+import json
 import os
 import sys
 import unittest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.testclient import TestClient
 
@@ -53,6 +54,43 @@ class DashboardApiTests(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         mock_turn.assert_awaited_once_with("Help me start", session_id="session-1")
 
+    def test_chat_stream_endpoint_emits_deltas_then_turn(self):
+        async def fake_stream(text, session_id=None):
+            yield {"type": "delta", "author": "task_initiation_agent", "text": "Open "}
+            yield {"type": "turn", "turn": {"session_id": session_id, "messages": [{"text": text}]}}
+
+        with patch.object(backend.RUNTIME, "startup", AsyncMock()), \
+             patch.object(backend.RUNTIME, "stream_chat_turn", fake_stream):
+            with TestClient(backend.app) as client:
+                response = client.post("/api/chat/stream", json={"session_id": "session-1", "text": "Help me start"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("event: delta", response.text)
+        self.assertIn('"text": "Open "', response.text)
+        self.assertIn("event: turn", response.text)
+        self.assertIn('"session_id": "session-1"', response.text)
+
+    def test_chat_stream_endpoint_reports_errors_and_closes_the_stream(self):
+        closed = []
+
+        async def failing_stream(text, session_id=None):
+            try:
+                yield {"type": "delta", "author": "task_initiation_agent", "text": "Open "}
+                raise RuntimeError("model exploded")
+            finally:
+                closed.append(True)
+
+        with patch.object(backend.RUNTIME, "startup", AsyncMock()), \
+             patch.object(backend.RUNTIME, "stream_chat_turn", failing_stream):
+            with TestClient(backend.app) as client:
+                response = client.post("/api/chat/stream", json={"session_id": "session-1", "text": "Help me start"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("event: delta", response.text)
+        self.assertIn("event: error", response.text)
+        self.assertIn('"detail": "Chat turn failed."', response.text)
+        self.assertEqual(closed, [True])
+
     def test_provider_settings_endpoint_persists_runtime_settings(self):
         payload = {
             "google_api_key_present": True,
@@ -240,6 +278,99 @@ class DashboardApiTests(unittest.TestCase):
         self.assertIn("event: checkin_due", chunk)
         self.assertIn('"task": "Deep work"', chunk)
 
+    def test_read_endpoints_query_off_the_event_loop(self):
+        def snapshot():
+            with self.assertRaises(RuntimeError):
+                asyncio.get_running_loop()
+            return {"current_energy": 5, "tasks_completed_today": 2, "current_multiplier": 1.5}
+
+        backend._invalidate_stats_cache()
+        with patch.object(backend.RUNTIME, "startup", AsyncMock()), \
+             patch.object(backend.RUNTIME, "get_stats_snapshot", side_effect=snapshot):
+            with TestClient(backend.app) as client:
+                response = client.get("/api/stats")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tasks_completed_today"], 2)
+
+    def test_stats_endpoint_caches_briefly_and_honours_etag(self):
+        backend._invalidate_stats_cache()
+        snapshot = MagicMock(return_value={"current_energy": 5, "tasks_completed_today": 0, "current_multiplier": 1.5})
+        with patch.object(backend.RUNTIME, "startup", AsyncMock()), \
+             patch.object(backend.RUNTIME, "get_stats_snapshot", snapshot), \
+             patch.object(backend.RUNTIME, "update_user_state_data", AsyncMock(return_value={})):
+            with TestClient(backend.app) as client:
+                first = client.get("/api/stats")
+                revalidated = client.get("/api/stats", headers={"If-None-Match": first.headers["etag"]})
+                self.assertEqual(snapshot.call_count, 1)
+
+                client.patch("/api/user-state", json={"energy_level": 7})
+                client.get("/api/stats")
+                self.assertEqual(snapshot.call_count, 2)
+
+        self.assertEqual(first.json()["current_energy"], 5)
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_stats_polled_during_a_mutation_are_not_cached_stale(self):
+        backend._invalidate_stats_cache()
+        snapshot = MagicMock(return_value={"current_energy": 5, "tasks_completed_today": 0, "current_multiplier": 1.5})
+
+        with patch.object(backend.RUNTIME, "startup", AsyncMock()), \
+             patch.object(backend.RUNTIME, "get_stats_snapshot", snapshot):
+            with TestClient(backend.app) as client:
+                async def create_task_item(**kwargs):
+                    # A dashboard poll lands while the write is still in flight.
+                    await backend.get_stats(MagicMock(headers={}))
+                    return {"task": {"id": 1}}
+
+                with patch.object(backend.RUNTIME, "create_task_item", create_task_item), \
+                     patch.object(backend.RUNTIME, "chat_turn", AsyncMock(return_value={})):
+                    client.post("/api/tasks", json={"title": "Pay rent", "status": "done"})
+                    client.get("/api/stats")
+                    self.assertEqual(snapshot.call_count, 2)
+
+                    client.post("/api/chat/turn", json={"session_id": "session-1", "text": "I finished it"})
+                    client.get("/api/stats")
+                    self.assertEqual(snapshot.call_count, 3)
+
+    def test_history_endpoint_returns_rows_without_response_validation(self):
+        rows = [{"id": "history-1", "task_type": "email", "completed_at": "2026-01-05T09:30:00", "duration_minutes": 12.0}]
+        with patch.object(backend.RUNTIME, "startup", AsyncMock()), \
+             patch.object(backend.RUNTIME, "get_task_history", return_value=rows):
+            with TestClient(backend.app) as client:
+                response = client.get("/api/history", params={"limit": 5})
+                schema = client.get("/openapi.json").json()
+
+        self.assertEqual(response.json(), rows)
+        documented = schema["paths"]["/api/history"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        self.assertEqual(documented["type"], "array")
+        self.assertIn("duration_minutes", documented["items"]["properties"])
+
+    def test_large_json_responses_are_gzipped(self):
+        rows = [
+            {"id": f"history-{i}", "task_type": "email", "completed_at": "2026-01-05T09:30:00", "duration_minutes": 12.0}
+            for i in range(50)
+        ]
+        with patch.object(backend.RUNTIME, "startup", AsyncMock()), \
+             patch.object(backend.RUNTIME, "get_task_history", return_value=rows):
+            with TestClient(backend.app) as client:
+                response = client.get("/api/history", headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.json(), rows)
+
+    def test_fast_json_response_renders_with_and_without_orjson(self):
+        from datetime import datetime
+
+        content = {"when": datetime(2026, 1, 5, 9, 30), "items": [1, 2]}
+        rendered = backend.FastJSONResponse(content).body
+        with patch.object(backend, "orjson", None):
+            fallback = backend.FastJSONResponse(content).body
+
+        self.assertEqual(json.loads(rendered)["items"], [1, 2])
+        self.assertEqual(json.loads(fallback)["items"], [1, 2])
+        self.assertTrue(json.loads(fallback)["when"].startswith("2026-01-05"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 import tempfile
@@ -5,6 +6,7 @@ import unittest
 
 from unittest.mock import patch
 
+from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
 from google.adk.runners import Runner
 from google.genai import types
@@ -12,11 +14,12 @@ from google.genai import types
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from adhd_os.agents.activation import body_double_agent, decomposer_agent, task_init_agent
-from adhd_os.agents.emotional import catastrophe_agent, rsd_agent
-from adhd_os.agents.orchestrator import orchestrator
-from adhd_os.agents.reflector import reflector_agent
-from adhd_os.agents.temporal import time_calibrator_agent
+from adhd_os.agents.activation import get_task_init_agent
+from adhd_os.agents.emotional import get_catastrophe_agent, get_rsd_agent
+from adhd_os.agents.fast_router import ROUTES, match_route
+from adhd_os.agents.orchestrator import get_orchestrator, get_shutdown_agent, orchestrator
+from adhd_os.models.schemas import SessionSummary
+from adhd_os.models.providers import CoalescingGemini, RateLimitedLiteLlm, get_llm
 from adhd_os.infrastructure.database import DatabaseManager
 from adhd_os.infrastructure.persistence import SqliteSessionService
 
@@ -37,37 +40,93 @@ def _event_texts(event):
     return [part.text for part in parts if getattr(part, "text", None)]
 
 
+class LazyAgentConstructionTests(unittest.TestCase):
+    def test_agent_builders_return_cached_instances(self):
+        self.assertIs(get_orchestrator(), get_orchestrator())
+        self.assertIs(orchestrator, get_orchestrator())
+        self.assertIs(get_catastrophe_agent(), get_catastrophe_agent())
+
+    def test_agents_with_same_model_share_one_client(self):
+        self.assertIs(get_catastrophe_agent().model, get_rsd_agent().model)
+        self.assertIs(get_task_init_agent().model, get_rsd_agent().model)
+        self.assertIs(get_llm("gemini/gemini-3-flash-preview"), get_llm("gemini/gemini-3-flash-preview"))
+
+    def test_gemini_models_use_native_client(self):
+        gemini = get_llm("gemini/gemini-3-flash-preview")
+        self.assertIsInstance(gemini, CoalescingGemini)
+        self.assertEqual(gemini.model, "gemini-3-flash-preview")
+        self.assertIsInstance(get_llm("anthropic/claude-sonnet-4-6"), RateLimitedLiteLlm)
+
+    def test_anthropic_clients_mark_system_prompt_for_caching(self):
+        points = get_llm("anthropic/claude-sonnet-4-6")._additional_args["cache_control_injection_points"]
+        self.assertIn({"location": "message", "role": "system"}, points)
+        self.assertIs(get_catastrophe_agent().model, get_llm("anthropic/claude-sonnet-4-6"))
+
+
+class CoalescingGeminiTests(unittest.IsolatedAsyncioTestCase):
+    async def test_identical_concurrent_requests_share_one_upstream_call(self):
+        calls = []
+
+        async def fake_generate(model_self, llm_request, stream=False):
+            calls.append(stream)
+            await asyncio.sleep(0.02)
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text="shared")]),
+                turn_complete=True,
+            )
+
+        model = CoalescingGemini(model="gemini-3-flash-preview")
+
+        async def _collect(text, stream=False):
+            request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+            return [r.content.parts[0].text async for r in model.generate_content_async(request, stream=stream)]
+
+        with patch("google.adk.models.google_llm.Gemini.generate_content_async", new=fake_generate):
+            first, second, other = await asyncio.gather(_collect("same"), _collect("same"), _collect("different"))
+            self.assertEqual(first, ["shared"])
+            self.assertEqual(second, ["shared"])
+            self.assertEqual(other, ["shared"])
+            self.assertEqual(len(calls), 2)
+
+            await asyncio.gather(_collect("same", stream=True), _collect("same", stream=True))
+            self.assertEqual(len(calls), 4)
+
+
+    async def test_client_follows_api_key_changes(self):
+        model = CoalescingGemini(model="gemini-3-flash-preview")
+        with patch.dict(os.environ, {"GOOGLE_API_KEY": "old-key"}):
+            first = model.api_client
+            self.assertIs(model.api_client, first)
+            self.assertEqual(first._api_client.api_key, "old-key")
+        with patch.dict(os.environ, {"GOOGLE_API_KEY": "new-key"}):
+            self.assertEqual(model.api_client._api_client.api_key, "new-key")
+
+
 class RoutingRunnerTests(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         self.temp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
         self.temp.close()
         self.db = DatabaseManager(db_path=self.temp.name)
         self.session_service = SqliteSessionService(db=self.db)
+        cache_db_patch = patch("adhd_os.infrastructure.cache.DB", self.db)
+        cache_db_patch.start()
+        self.addCleanup(cache_db_patch.stop)
         self.runner = Runner(
             agent=orchestrator,
             app_name="test_app",
             session_service=self.session_service,
         )
-        self.agent_models = {
-            task_init_agent.name: task_init_agent.model,
-            decomposer_agent.name: decomposer_agent.model,
-            body_double_agent.name: body_double_agent.model,
-            time_calibrator_agent.name: time_calibrator_agent.model,
-            catastrophe_agent.name: catastrophe_agent.model,
-            rsd_agent.name: rsd_agent.model,
-            reflector_agent.name: reflector_agent.model,
-        }
-
     def tearDown(self):
         os.unlink(self.temp.name)
 
     async def test_runner_transfers_canonical_prompts_to_expected_agents(self):
         prompt_to_agent = dict(ROUTING_CASES)
-        orchestrator_model = orchestrator.model
-        agent_models = self.agent_models
+        expected_agents = {agent_name for _, agent_name in ROUTING_CASES}
 
         async def fake_generate(model_self, llm_request, stream=False):
-            if model_self is orchestrator_model:
+            # Agents sharing a model reuse one client, so identify the caller by label.
+            agent_name = llm_request.config.labels.get("adk_agent_name")
+            if agent_name == orchestrator.name:
                 prompt_text = llm_request.model_dump()["contents"][-1]["parts"][0]["text"]
                 target_agent = prompt_to_agent[prompt_text]
                 yield LlmResponse(
@@ -87,21 +146,21 @@ class RoutingRunnerTests(unittest.IsolatedAsyncioTestCase):
                 )
                 return
 
-            for agent_name, model in agent_models.items():
-                if model_self is model:
-                    yield LlmResponse(
-                        content=types.Content(
-                            role="model",
-                            parts=[types.Part(text=f"{agent_name} handled the request")],
-                        ),
-                        partial=False,
-                        turn_complete=True,
-                    )
-                    return
+            if agent_name in expected_agents:
+                yield LlmResponse(
+                    content=types.Content(
+                        role="model",
+                        parts=[types.Part(text=f"{agent_name} handled the request")],
+                    ),
+                    partial=False,
+                    turn_complete=True,
+                )
+                return
 
-            raise AssertionError(f"Unexpected LiteLlm instance encountered: {model_self!r}")
+            raise AssertionError(f"Unexpected agent encountered: {agent_name!r}")
 
-        with patch("google.adk.models.lite_llm.LiteLlm.generate_content_async", new=fake_generate):
+        with patch("google.adk.models.lite_llm.LiteLlm.generate_content_async", new=fake_generate), \
+                patch("google.adk.models.google_llm.Gemini.generate_content_async", new=fake_generate):
             for prompt, expected_agent in ROUTING_CASES:
                 with self.subTest(prompt=prompt, expected_agent=expected_agent):
                     session = await self.session_service.create_session(
@@ -144,6 +203,129 @@ class RoutingRunnerTests(unittest.IsolatedAsyncioTestCase):
                     ]
                     self.assertIn(f"{expected_agent} handled the request", agent_texts)
 
+    async def test_keyword_prompts_skip_the_orchestrator_model(self):
+        called = []
+
+        async def fake_generate(model_self, llm_request, stream=False):
+            agent_name = llm_request.config.labels.get("adk_agent_name")
+            called.append(agent_name)
+            if agent_name == orchestrator.name:
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text="Tell me more.")]),
+                    turn_complete=True,
+                )
+                return
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=f"{agent_name} handled the request")]),
+                turn_complete=True,
+            )
+
+        async def _run(prompt):
+            session = await self.session_service.create_session(app_name="test_app", user_id="test_user")
+            return [
+                event
+                async for event in self.runner.run_async(
+                    user_id="test_user",
+                    session_id=session.id,
+                    new_message=types.Content(role="user", parts=[types.Part(text=prompt)]),
+                )
+            ]
+
+        with patch("google.adk.models.lite_llm.LiteLlm.generate_content_async", new=fake_generate), \
+                patch("google.adk.models.google_llm.Gemini.generate_content_async", new=fake_generate):
+            events = await _run("How long will this take?")
+            self.assertEqual(called, ["time_calibrator_agent"])
+            self.assertTrue(any(e.actions.transfer_to_agent == "time_calibrator_agent" for e in events))
+
+            called.clear()
+            await _run("I'm worried this boring report is too big")
+            self.assertEqual(called, [orchestrator.name])
+
+
+class FastRouterTests(unittest.TestCase):
+    def test_routes_only_unambiguous_keyword_matches(self):
+        self.assertEqual(match_route("I’m stuck and can’t start"), "task_initiation_agent")
+        self.assertEqual(match_route("I feel rejected"), "rsd_shield_agent")
+        self.assertIsNone(match_route("Finished the boring report!"))
+        self.assertIsNone(match_route("Is it realistic to schedule this today?"))
+        self.assertIsNone(match_route("What should I have for lunch"))
+
+    def test_every_route_targets_an_orchestrator_sub_agent(self):
+        sub_agent_names = {agent.name for agent in get_orchestrator().sub_agents}
+        self.assertLessEqual(set(ROUTES), sub_agent_names)
+
+
+class ShutdownFanoutTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.temp.close()
+        self.db = DatabaseManager(db_path=self.temp.name)
+        self.session_service = SqliteSessionService(db=self.db)
+
+    def tearDown(self):
+        os.unlink(self.temp.name)
+
+    async def test_shutdown_runs_pattern_analysis_and_summary_concurrently(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_generate(model_self, llm_request, stream=False):
+            nonlocal in_flight, max_in_flight
+            agent_name = llm_request.config.labels.get("adk_agent_name")
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            text = f"{agent_name} done"
+            if agent_name == "session_summarizer":
+                text = SessionSummary(
+                    session_date="2026-01-05", energy_trajectory="started 4, ended 6",
+                    tasks_discussed=["QBR"], tasks_completed=["QBR outline"], accomplishments=[],
+                    narrative_summary="You showed up.", barriers_encountered=[], interventions_used=[],
+                    open_loops=[], notable_patterns=[], tomorrow_priorities=["QBR draft"],
+                ).model_dump_json()
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                partial=False,
+                turn_complete=True,
+            )
+
+        runner = Runner(
+            agent=get_shutdown_agent(),
+            app_name="test_app",
+            session_service=self.session_service,
+        )
+        session = await self.session_service.create_session(app_name="test_app", user_id="test_user")
+
+        with patch("google.adk.models.lite_llm.LiteLlm.generate_content_async", new=fake_generate), \
+                patch("google.adk.models.google_llm.Gemini.generate_content_async", new=fake_generate):
+            events = [
+                event
+                async for event in runner.run_async(
+                    user_id="test_user",
+                    session_id=session.id,
+                    new_message=types.Content(role="user", parts=[types.Part(text="shutdown")]),
+                )
+            ]
+
+        authors = {event.author for event in events}
+        self.assertIn("pattern_analysis_agent", authors)
+        self.assertIn("session_summarizer", authors)
+        self.assertEqual(max_in_flight, 2)
+
+        summaries = [
+            event.actions.state_delta["session_summary"]
+            for event in events
+            if "session_summary" in event.actions.state_delta
+        ]
+        self.assertEqual(summaries[0]["tomorrow_priorities"], ["QBR draft"])
+
+        await self.session_service.flush()
+        reloaded = await self.session_service.get_session(
+            app_name="test_app", user_id="test_user", session_id=session.id
+        )
+        self.assertEqual(reloaded.state["session_summary"]["tomorrow_priorities"], ["QBR draft"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -54,6 +54,20 @@ class DelayedRunner(FakeRunner):
         return _events()
 
 
+class StreamingRunner(FakeRunner):
+    def run_async(self, *, new_message, **kwargs):
+        self.calls.append({"text": new_message.parts[0].text, **kwargs})
+
+        async def _events():
+            for chunk in ("Open ", "the file."):
+                event = make_event("model", chunk)
+                event.partial = True
+                yield event
+            yield make_event("model", "Open the file.")
+
+        return _events()
+
+
 class RuntimeTests(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         self.temp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
@@ -105,6 +119,13 @@ class RuntimeTests(unittest.IsolatedAsyncioTestCase):
         self.db_patcher.stop()
         os.unlink(self.temp.name)
 
+    async def test_startup_defers_agent_runner_until_first_turn(self):
+        await self.runtime.startup()
+        self.assertIsNone(self.runtime._runner)
+
+        await self.runtime.chat_turn("hello", None)
+        self.assertIsNotNone(self.runtime._runner)
+
     async def test_bootstrap_resumes_recent_session(self):
         session = await self.session_service.create_session(
             app_name="test_app",
@@ -324,6 +345,52 @@ class RuntimeTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(delayed_runtime.runner.max_active, 1)
         self.assertEqual(len(self.db.get_conversation_messages(session.id)), 4)
 
+    async def test_shutdown_runs_through_dedicated_fanout_runner(self):
+        session = await self.session_service.create_session(
+            app_name="test_app",
+            user_id="test-user",
+        )
+
+        result = await self.runtime.shutdown_session(session.id)
+
+        # The acknowledgment returns before the summary fan-out has run.
+        self.assertEqual(result["messages"][1]["text"], "Session saved. Work mode complete!")
+        self.assertEqual(self.runtime.shutdown_runner.calls, [])
+
+        await self.runtime.drain_background_tasks()
+
+        self.assertEqual([call["text"] for call in self.runtime.shutdown_runner.calls], ["shutdown"])
+        self.assertIsNot(self.runtime.shutdown_runner, self.runtime.runner)
+        self.assertEqual(self.runtime.runner.calls, [])
+        transcript = [message["text"] for message in self.db.get_conversation_messages(session.id)]
+        self.assertEqual(transcript[-1], "Echo: shutdown")
+
+    async def test_stream_chat_turn_yields_deltas_then_stores_final_text(self):
+        from adhd_os.runtime import ADHDOSRuntime
+
+        streaming_runtime = ADHDOSRuntime(
+            app_name="test_app",
+            user_state=self.user_state,
+            db=self.db,
+            event_bus=self.event_bus,
+            body_double=self.body_double,
+            focus_timer=self.focus_timer,
+            agent=None,
+            runner_factory=StreamingRunner,
+            session_service=self.session_service,
+        )
+        session = await self.session_service.create_session(
+            app_name="test_app",
+            user_id="test-user",
+        )
+
+        chunks = [chunk async for chunk in streaming_runtime.stream_chat_turn("help", session.id)]
+
+        self.assertEqual([c["text"] for c in chunks if c["type"] == "delta"], ["Open ", "the file."])
+        self.assertEqual(chunks[-1]["type"], "turn")
+        self.assertEqual(chunks[-1]["turn"]["messages"][-1]["text"], "Open the file.")
+        self.assertEqual(len(self.db.get_conversation_messages(session.id)), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
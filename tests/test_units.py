@@ -9,7 +9,7 @@ import sys
 import tempfile
 import unittest
 from datetime import datetime, timedelta
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -35,6 +35,43 @@ class TestDatabaseManager(unittest.TestCase):
         self.db.save_state("energy", 7)
         self.assertEqual(self.db.get_state("energy"), 7)
 
+    def test_user_state_saves_in_one_transaction_and_loads_back(self):
+        from adhd_os.state import UserState
+        saved = UserState(energy_level=8, current_task="Taxes", medication_time=datetime(2026, 5, 1, 8, 0))
+        statements = []
+        with self.db.get_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        with patch("adhd_os.infrastructure.database.DB", self.db):
+            saved.save_to_db()
+            with self.db.get_connection() as conn:
+                conn.set_trace_callback(None)
+            loaded = UserState()
+            loaded.load_from_db()
+        self.assertEqual(sum(s.strip().upper().startswith("COMMIT") for s in statements), 1)
+        self.assertEqual(
+            (loaded.energy_level, loaded.current_task, loaded.medication_time, loaded.peak_window_hours),
+            (8, "Taxes", saved.medication_time, (1, 5)),
+        )
+
+    def test_state_round_trip_without_orjson(self):
+        from adhd_os.infrastructure import database
+        value = {"energy": 7, "tags": ["a", "b"], "note": "café"}
+        self.db.save_state("blob", value)
+        with patch.object(database, "orjson", None):
+            self.assertEqual(self.db.get_state("blob"), value)
+            self.db.save_state("blob", value)
+        self.assertEqual(self.db.get_state("blob"), value)
+
+    def test_json_dumps_matches_stdlib_key_and_default_handling(self):
+        import json
+        from adhd_os.infrastructure import database
+        value = {1: "one", "when": datetime(2026, 1, 2)}
+        encoded = database.json_dumps(value, default=str)
+        with patch.object(database, "orjson", None):
+            fallback = database.json_dumps(value, default=str)
+        self.assertEqual(json.loads(encoded)["1"], "one")
+        self.assertEqual(json.loads(encoded).keys(), json.loads(fallback).keys())
+
     def test_get_state_default(self):
         self.assertIsNone(self.db.get_state("missing"))
         self.assertEqual(self.db.get_state("missing", 42), 42)
@@ -43,19 +80,19 @@ class TestDatabaseManager(unittest.TestCase):
     def test_cache_and_retrieve_plan(self):
         plan = {"steps": ["a", "b"]}
         import json
-        self.db.cache_plan("h1", "write tests", json.dumps(plan), 5)
-        result = self.db.get_cached_plan("h1")
+        self.db.cache_plan(1, "write tests", json.dumps(plan), 5)
+        result = self.db.get_cached_plan(1)
         self.assertEqual(result, plan)
 
     def test_get_cached_plan_miss(self):
-        self.assertIsNone(self.db.get_cached_plan("nonexistent"))
+        self.assertIsNone(self.db.get_cached_plan(404))
 
     # -- get_similar_tasks ---
     def test_get_similar_tasks_with_keywords(self):
         import json
-        self.db.cache_plan("h1", "write unit tests", json.dumps({}), 5)
-        self.db.cache_plan("h2", "deploy to production", json.dumps({}), 5)
-        self.db.cache_plan("h3", "write integration tests", json.dumps({}), 5)
+        self.db.cache_plan(1, "write unit tests", json.dumps({}), 5)
+        self.db.cache_plan(2, "deploy to production", json.dumps({}), 5)
+        self.db.cache_plan(3, "write integration tests", json.dumps({}), 5)
 
         results = self.db.get_similar_tasks(["write"])
         self.assertEqual(len(results), 2)
@@ -64,10 +101,44 @@ class TestDatabaseManager(unittest.TestCase):
     def test_get_similar_tasks_with_limit(self):
         import json
         for i in range(10):
-            self.db.cache_plan(f"h{i}", f"task {i}", json.dumps({}), 5)
+            self.db.cache_plan(i, f"task {i}", json.dumps({}), 5)
         results = self.db.get_similar_tasks([], limit=3)
         self.assertEqual(len(results), 3)
 
+    def test_get_similar_tasks_uses_fts_index_and_tracks_updates(self):
+        import json
+        self.db.cache_plan(1, "write unit tests", json.dumps({}), 5)
+        self.db.cache_plan(2, "email the landlord", json.dumps({}), 5)
+        self.db.cache_plan(1, "plan the offsite", json.dumps({}), 5)  # re-cached under same hash
+
+        self.assertEqual(self.db.get_similar_tasks(["writing"]), [])
+        self.assertEqual(self.db.get_similar_tasks(["offsite!"]), ["plan the offsite"])
+        self.assertEqual(self.db.get_similar_tasks(['"email" OR NOT']), ["email the landlord"])
+
+    def test_legacy_text_hash_cache_is_rebuilt_with_integer_keys(self):
+        with self.db.get_connection() as conn:
+            conn.execute("DROP TABLE task_cache_fts")
+            conn.execute("DROP TABLE task_cache")
+            conn.execute(
+                "CREATE TABLE task_cache (hash TEXT PRIMARY KEY, task_description TEXT, "
+                "plan_json TEXT, energy_level INTEGER, created_at TIMESTAMP)"
+            )
+            conn.execute("INSERT INTO task_cache VALUES ('abc123', 'old', '{}', 5, NULL)")
+        from adhd_os.infrastructure.database import DatabaseManager
+        reopened = DatabaseManager(db_path=self.db.db_path)
+        reopened.cache_plan(-42, "new task", "{}", 5)
+        self.assertEqual(reopened.get_cached_plan(-42), {})
+        self.assertEqual(reopened.get_similar_tasks(["old"]), [])
+
+    def test_fts_index_is_backfilled_for_existing_databases(self):
+        import json
+        self.db.cache_plan(1, "file taxes", json.dumps({}), 5)
+        with self.db.get_connection() as conn:
+            conn.execute("DROP TABLE task_cache_fts")
+        from adhd_os.infrastructure.database import DatabaseManager
+        reopened = DatabaseManager(db_path=self.db.db_path)
+        self.assertEqual(reopened.get_similar_tasks(["taxes"]), ["file taxes"])
+
     # -- task history ---
     def test_log_and_get_task_history(self):
         self.db.log_task_completion("coding", 30, 45, 6, True)
@@ -76,6 +147,39 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(len(history), 2)
         self.assertEqual(history[0]["type"], "coding")
 
+    def test_task_completions_are_flushed_in_batches(self):
+        from adhd_os.infrastructure import database
+        with patch.object(database, "WRITE_FLUSH_INTERVAL", 60):
+            for i in range(100):
+                self.db.log_task_completion("email", 10, 12, 5, False)
+            self.assertEqual(self.db._write_queue.qsize(), 100)
+
+            statements = []
+            with patch.object(database.ManagedConnection, "executemany",
+                              side_effect=lambda sql, rows: statements.append(len(rows))):
+                self.db.flush_writes()
+            self.assertEqual(statements, [64, 36])
+
+            self.db.log_task_completion("email", 10, 12, 5, False)
+            self.assertEqual(self.db.get_task_history_count(), 1)  # reads flush first
+            self.db.close()
+        self.assertIsNone(self.db._writer)
+
+    def test_failed_flush_keeps_rows_for_retry(self):
+        import sqlite3
+        from adhd_os.infrastructure import database
+        with patch.object(database, "WRITE_FLUSH_INTERVAL", 60):
+            for _ in range(3):
+                self.db.log_task_completion("email", 10, 12, 5, False)
+            with patch.object(database.ManagedConnection, "executemany",
+                              side_effect=sqlite3.OperationalError("database is locked")):
+                with self.assertRaises(sqlite3.OperationalError):
+                    self.db.flush_writes()
+                with self.assertLogs(database.logger, "WARNING"):
+                    self.assertEqual(self.db.get_task_history_count(), 0)  # logged, not raised
+            self.assertEqual(self.db.get_task_history_count(), 3)
+            self.db.close()
+
     def test_get_task_multiplier_insufficient_data(self):
         self.db.log_task_completion("rare", 10, 20, 5, True)
         self.assertIsNone(self.db.get_task_multiplier("rare"))
@@ -87,12 +191,149 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertIsNotNone(mult)
         self.assertAlmostEqual(mult, 2.0)
 
+    def test_get_task_multiplier_averages_most_recent_rows(self):
+        with patch("adhd_os.infrastructure.database.time.time_ns") as fake_ns:
+            for day, actual in enumerate([40, 40, 10, 20, 30], start=1):
+                fake_ns.return_value = int(datetime(2026, 1, day, 9, 0).timestamp()) * 10**9
+                self.db.log_task_completion("coding", 10, actual, 5, True)
+            self.db.log_task_completion("coding", 0, 99, 5, True)  # ignored: no estimate
+        self.assertAlmostEqual(self.db.get_task_multiplier("coding", limit=3), 2.0)
+
     # -- public connection ---
     def test_get_connection(self):
         conn = self.db.get_connection()
         self.assertIsNotNone(conn)
         conn.close()
 
+    def test_connections_are_pooled_and_reset_on_release(self):
+        with self.db.get_connection() as conn:
+            conn.execute("SELECT 1")
+        with self.db.get_connection() as again:
+            self.assertIs(again, conn)
+
+        with self.assertRaises(RuntimeError):
+            with self.db.get_connection() as conn:
+                conn.execute("INSERT INTO user_state (key, value) VALUES ('pending', '1')")
+                raise RuntimeError("boom")
+        self.assertIsNone(self.db.get_state("pending"))
+
+        held = [self.db.get_connection() for _ in range(2)]
+        self.assertIsNot(held[0], held[1])
+        for conn in held:
+            conn.close()
+
+    def test_point_reads_never_touch_the_writer_pool(self):
+        import json
+        self.db.save_state("energy", 6)
+        self.db.save_app_setting("model_mode", "quality")
+        self.db.cache_plan(7, "file taxes", json.dumps({"ok": True}), 5)
+        with patch.object(self.db, "_get_conn", side_effect=AssertionError("writer used for a read")):
+            self.assertEqual(self.db.get_state("energy"), 6)
+            self.assertEqual(self.db.get_state_values(["energy"]), {"energy": 6})
+            self.assertEqual(self.db.get_app_setting("model_mode"), "quality")
+            self.assertEqual(self.db.get_cached_plan(7), {"ok": True})
+            self.assertEqual(self.db.get_similar_tasks(["taxes"]), ["file taxes"])
+
+    def test_connections_apply_performance_pragmas(self):
+        with self.db.get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+            self.assertEqual(conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0], 10000)
+        for acquire in (self.db.get_connection, self.db.get_read_connection):
+            with acquire() as conn:
+                with self.subTest(acquire=acquire.__name__):
+                    self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -65536)
+                    self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)  # MEMORY
+                    self.assertEqual(conn.execute("PRAGMA mmap_size").fetchone()[0], 268435456)
+
+    def test_checkpoint_truncates_the_wal(self):
+        self.db.save_state("energy", 5)
+        wal_path = self.db.db_path + "-wal"
+        self.assertGreater(os.path.getsize(wal_path), 0)
+        self.db.checkpoint()
+        self.assertEqual(os.path.getsize(wal_path), 0)
+        self.assertEqual(self.db.get_state("energy"), 5)
+
+    def test_read_connections_are_read_only_and_see_committed_writes(self):
+        import sqlite3
+        self.db.log_task_completion("email", 10, 12, 5, False)
+        self.assertEqual(self.db.get_task_history_count(), 1)
+
+        with self.db.get_read_connection() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM task_history")
+        with self.db.get_read_connection() as again:
+            self.assertIs(again, conn)
+        self.assertEqual(self.db.get_tasks_completed_today(), 1)
+
+    def test_conversation_batch_is_one_transaction(self):
+        statements = []
+        with self.db.get_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        stored = self.db.store_conversation_messages([
+            {"session_id": "s1", "role": "user", "kind": "message", "text": " hi ", "created_at": "2026-01-05T09:00:00"},
+            {"session_id": "s1", "role": "assistant", "kind": "message", "text": "hello", "created_at": "2026-01-05T09:00:01"},
+        ])
+        with self.db.get_connection() as conn:
+            conn.set_trace_callback(None)
+
+        self.assertEqual([m["text"] for m in stored], ["hi", "hello"])
+        self.assertLess(stored[0]["id"], stored[1]["id"])
+        self.assertEqual([m["text"] for m in self.db.get_conversation_messages("s1")], ["hi", "hello"])
+        self.assertEqual(sum(s.strip().upper().startswith("COMMIT") for s in statements), 1)
+        with self.assertRaises(ValueError):
+            self.db.store_conversation_messages([{"session_id": "s1", "role": "user", "kind": "message", "text": "  "}])
+
+    def test_schema_init_commits_once(self):
+        from adhd_os.infrastructure.database import DatabaseManager
+        statements = []
+        connect = DatabaseManager._connect
+
+        def traced_connect(manager, read_only=False):
+            conn = connect(manager, read_only)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        self.db.close()
+        with patch.object(DatabaseManager, "_connect", traced_connect):
+            DatabaseManager(db_path=self.db.db_path)
+        boundaries = [s.strip().split()[0].upper() for s in statements
+                      if s.strip().upper().startswith(("BEGIN", "COMMIT"))]
+        self.assertEqual(boundaries, ["BEGIN", "COMMIT"])
+
+    def test_planner_statistics_are_collected_at_init(self):
+        with self.db.get_connection() as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertIn("sqlite_stat1", tables)
+
+    def test_hot_queries_use_indexes(self):
+        """EXPLAIN QUERY PLAN guard: no full table scans on the hot read paths."""
+        import re
+        from adhd_os.infrastructure import database, persistence
+        from google.adk.sessions.base_session_service import GetSessionConfig
+        queries = {
+            "history": (database._SQL_HISTORY, (50,)),
+            "multiplier": (database._SQL_TASK_MULTIPLIER, ("coding", 20)),
+            "today": (database._SQL_STATS_COMPLETED_TODAY, database._local_day_bounds()),
+            "history_items": (database._SQL_HISTORY_ITEMS, (50, 50, 50)),
+            "recent_sessions": (database._SQL_RECENT_SESSIONS, (10,)),
+            "cached_plan": (database._SQL_GET_CACHED_PLAN, (1,)),
+            "session_events": persistence._events_query("s", None),
+            "session_events_since": persistence._events_query("s", GetSessionConfig(after_timestamp=1.0)),
+            "session_payloads": ("SELECT id, type, data_json, timestamp FROM events WHERE session_id = ? ORDER BY id ASC", ("s",)),
+            "user_sessions": (
+                "SELECT id FROM sessions WHERE user_id = ? AND app_name = ? ORDER BY created_at DESC",
+                ("u", "a"),
+            ),
+        }
+        full_scan = re.compile(r"^SCAN (?!\(|CONSTANT)\w+$")
+        with self.db.get_connection() as conn:
+            for name, (sql, params) in queries.items():
+                with self.subTest(query=name):
+                    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+                    self.assertFalse([step for step in plan if full_scan.match(step)], plan)
+                    if name != "history_items":  # merges at most 2 * limit rows
+                        self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
     def test_machine_state_round_trip(self):
         snapshot = {"state": "active", "task": "write code", "remaining_minutes": 12}
         self.db.save_machine_state("body_double", snapshot)
@@ -154,6 +395,35 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(self.db.get_tasks_completed_today(), 1)
         self.assertEqual(history[0]["task_type"], "Pay rent")
 
+    def test_today_count_excludes_earlier_days(self):
+        self.db.log_task_completion("coding", 10, 20, 5, True)
+        yesterday = int((datetime.now() - timedelta(days=1)).timestamp()) * 10**9
+        with self.db.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO task_history (task_type, estimated_minutes, actual_minutes, timestamp) "
+                "VALUES ('old', 10, 10, ?)",
+                (yesterday,),
+            )
+        self.assertEqual(self.db.get_tasks_completed_today(), 1)
+
+    def test_legacy_iso_history_timestamps_are_converted_to_ns(self):
+        logged_at = datetime.now().replace(microsecond=0)
+        with self.db.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO task_history (task_type, estimated_minutes, actual_minutes, timestamp) "
+                "VALUES ('legacy', 10, 15, ?)",
+                (logged_at.isoformat(),),
+            )
+        from adhd_os.infrastructure.database import DatabaseManager
+        reopened = DatabaseManager(db_path=self.db.db_path)
+        with reopened.get_connection() as conn:
+            stored = conn.execute("SELECT timestamp FROM task_history").fetchone()[0]
+
+        self.assertEqual(stored, int(logged_at.timestamp()) * 10**9)
+        self.assertEqual(reopened.get_tasks_completed_today(), 1)
+        self.assertEqual(reopened.get_recent_history()[0]["date"], logged_at.date().isoformat())
+        self.assertTrue(reopened.get_task_history_items()[0]["completed_at"].startswith(logged_at.isoformat()))
+
 
 # ---------------------------------------------------------------------------
 # Event Bus
@@ -205,6 +475,141 @@ class TestEventBus(unittest.TestCase):
         # Should not raise
         asyncio.run(self.bus.publish(EventType.ENERGY_UPDATED, {"level": 1}))
 
+    def test_handler_kind_is_classified_once_at_subscribe(self):
+        from adhd_os.infrastructure.event_bus import EventType
+        received = []
+
+        async def async_handler(data):
+            received.append(("async", data["n"]))
+
+        def sync_handler(data):
+            received.append(("sync", data["n"]))
+
+        self.bus.subscribe(EventType.CHECKIN_DUE, async_handler)
+        self.bus.subscribe(EventType.CHECKIN_DUE, sync_handler)
+        with patch("adhd_os.infrastructure.event_bus.inspect.iscoroutinefunction") as check:
+            asyncio.run(self.bus.publish(EventType.CHECKIN_DUE, {"n": 1}))
+        check.assert_not_called()
+        self.assertCountEqual(received, [("async", 1), ("sync", 1)])
+
+        self.bus.unsubscribe(EventType.CHECKIN_DUE, async_handler)
+        self.bus.unsubscribe(EventType.CHECKIN_DUE, sync_handler)
+        self.assertNotIn(EventType.CHECKIN_DUE, self.bus._subscribers)
+
+    def test_handlers_may_resubscribe_during_dispatch(self):
+        from adhd_os.infrastructure.event_bus import EventType
+        calls = []
+
+        def late(data):
+            calls.append("late")
+
+        def once(data):
+            calls.append("once")
+            self.bus.unsubscribe(EventType.TASK_STARTED, once)
+            self.bus.subscribe(EventType.TASK_STARTED, late)
+
+        def steady(data):
+            calls.append("steady")
+
+        self.bus.subscribe(EventType.TASK_STARTED, once)
+        self.bus.subscribe(EventType.TASK_STARTED, steady)
+        asyncio.run(self.bus.publish(EventType.TASK_STARTED, {}))
+        self.assertEqual(calls, ["once", "steady"])
+        asyncio.run(self.bus.publish(EventType.TASK_STARTED, {}))
+        self.assertEqual(calls, ["once", "steady", "steady", "late"])
+
+    def test_async_handlers_run_concurrently(self):
+        from adhd_os.infrastructure.event_bus import EventType
+
+        async def scenario():
+            first_started = asyncio.Event()
+            second_started = asyncio.Event()
+
+            async def first(data):
+                first_started.set()
+                await second_started.wait()
+
+            async def second(data):
+                second_started.set()
+                await first_started.wait()
+
+            async def failing(data):
+                raise ValueError("boom")
+
+            for handler in (first, failing, second):
+                self.bus.subscribe(EventType.FOCUS_BLOCK_STARTED, handler)
+            # Sequential awaits would deadlock: each handler waits on the other.
+            await asyncio.wait_for(
+                self.bus.publish(EventType.FOCUS_BLOCK_STARTED, {}), timeout=1
+            )
+
+        asyncio.run(scenario())
+
+    def test_event_log_is_bounded_and_serialized_once(self):
+        from adhd_os.infrastructure.event_bus import EVENT_LOG_SIZE, EventBus, EventType
+        db = MagicMock()
+        bus = EventBus(db=db)
+
+        async def burst():
+            for i in range(EVENT_LOG_SIZE + 5):
+                await bus.publish(EventType.CHECKIN_DUE, {"i": i})
+
+        with patch("adhd_os.infrastructure.database.json_dumps", return_value="{}") as dumps:
+            asyncio.run(burst())
+        self.assertEqual(dumps.call_count, EVENT_LOG_SIZE + 5)
+        self.assertEqual(len(bus._event_log), EVENT_LOG_SIZE)
+        recent = bus.get_recent_events(2)
+        self.assertEqual([e["data"]["i"] for e in recent], [EVENT_LOG_SIZE + 3, EVENT_LOG_SIZE + 4])
+        self.assertEqual(bus.get_recent_events(0), [])
+
+    def test_setup_logging_routes_through_queue_listener(self):
+        import json
+        import logging
+        import logging.handlers
+        from adhd_os.infrastructure import logging as app_logging
+
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = os.path.join(tmp, "app.jsonl")
+            try:
+                with patch.object(app_logging.sys, "stdout", MagicMock()):
+                    app_logging.setup_logging(log_file)
+                    self.assertIsInstance(root.handlers[0], logging.handlers.QueueHandler)
+                    logging.getLogger("adhd_os.test").info("queued", extra={"props": {"k": 1}})
+                    app_logging._stop_listener()
+            finally:
+                root.handlers, root.level = saved_handlers, saved_level
+            with open(log_file) as fh:
+                record = json.loads(fh.readline())
+        self.assertEqual(record["message"], "queued")
+        self.assertEqual(record["k"], 1)
+
+    def test_json_formatter_timestamps_match_local_isoformat(self):
+        import json
+        import logging
+        from adhd_os.infrastructure.logging import JsonFormatter
+
+        formatter = JsonFormatter()
+        base = datetime(2026, 3, 4, 5, 6, 7).timestamp()
+        for created in (base + 0.25, base + 0.5, base + 1.000001):
+            record = logging.makeLogRecord({"msg": "tick", "created": created})
+            stamp = json.loads(formatter.format(record))["timestamp"]
+            delta = datetime.fromisoformat(stamp) - datetime.fromtimestamp(created)
+            self.assertLessEqual(abs(delta.total_seconds()), 1e-6)
+
+    def test_full_log_queue_drops_records_instead_of_blocking(self):
+        import logging
+        import queue
+        from adhd_os.infrastructure import logging as app_logging
+
+        log_queue = queue.Queue(maxsize=1)
+        handler = app_logging._DroppingQueueHandler(log_queue)
+        for message in ("first", "second"):
+            handler.handle(logging.makeLogRecord({"msg": message}))
+        self.assertEqual(log_queue.qsize(), 1)
+        self.assertEqual(log_queue.get_nowait().getMessage(), "first")
+
 
 # ---------------------------------------------------------------------------
 # State
@@ -232,6 +637,18 @@ class TestUserState(unittest.TestCase):
         # Should be lower due to high energy + peak window
         self.assertLessEqual(mult, self.state.base_multiplier + 0.5)
 
+    def test_dynamic_multiplier_time_of_day(self):
+        import time as time_module
+        self.state.energy_level = 6  # no energy adjustment; no medication -> +0.3
+        expected = {9: 1.8, 16: 1.95, 21: 2.05, 0: 1.8, 12: 1.8}
+        for hour, multiplier in expected.items():
+            fixed = time_module.localtime(datetime(2026, 1, 5, hour, 30).timestamp())
+            with self.subTest(hour=hour), patch("adhd_os.state.time.localtime", return_value=fixed):
+                self.assertEqual(self.state.dynamic_multiplier, multiplier)
+        for level in (-3, 15):
+            self.state.energy_level = level
+            self.assertGreaterEqual(self.state.dynamic_multiplier, 1.0)
+
     def test_peak_window_no_medication(self):
         self.assertFalse(self.state.is_in_peak_window)
         status = self.state.peak_window_status
@@ -244,6 +661,46 @@ class TestUserState(unittest.TestCase):
         status = self.state.peak_window_status
         self.assertTrue(status["active"])
 
+    def test_peak_window_bounds_follow_their_inputs(self):
+        self.state.medication_time = datetime.now() - timedelta(hours=2)
+        self.assertTrue(self.state.is_in_peak_window)
+        self.state.peak_window_hours = (3, 5)
+        self.assertFalse(self.state.is_in_peak_window)
+        self.assertEqual(self.state.peak_window_status["reason"], "not_yet")
+        self.state.medication_time = datetime.now() - timedelta(hours=4)
+        self.assertTrue(self.state.is_in_peak_window)
+        self.state.medication_time = None
+        self.assertFalse(self.state.is_in_peak_window)
+
+    def test_in_memory_task_history_is_bounded(self):
+        from adhd_os.state import TASK_HISTORY_WINDOW
+        with patch("adhd_os.infrastructure.database.DB") as db:
+            for actual in range(TASK_HISTORY_WINDOW + 5):
+                self.state.log_task_completion("email", 10, actual)
+        history = self.state.task_history["email"]
+        self.assertEqual(len(history), TASK_HISTORY_WINDOW)
+        self.assertEqual(history[0]["actual"], 5)
+        self.assertEqual(db.log_task_completion.call_count, TASK_HISTORY_WINDOW + 5)
+
+    def test_mood_indicators_are_bounded(self):
+        from adhd_os.state import MOOD_HISTORY_SIZE
+        for n in range(MOOD_HISTORY_SIZE + 3):
+            self.state.add_mood_indicator(f"mood-{n}")
+        self.assertEqual(len(self.state.mood_indicators), MOOD_HISTORY_SIZE)
+        last = MOOD_HISTORY_SIZE + 2
+        self.assertEqual(self.state.snapshot()["mood_indicators"], [f"mood-{n}" for n in range(last - 4, last + 1)])
+
+    def test_task_type_multiplier_is_memoized_until_next_completion(self):
+        with patch("adhd_os.infrastructure.database.DB") as db:
+            db.get_task_multiplier.return_value = 1.8
+            self.assertEqual(self.state.get_task_type_multiplier("email"), 1.8)
+            self.assertEqual(self.state.get_task_type_multiplier("email"), 1.8)
+            self.assertEqual(db.get_task_multiplier.call_count, 1)
+            self.state.log_task_completion("email", 10, 20)
+            db.get_task_multiplier.return_value = 1.9
+            self.assertEqual(self.state.get_task_type_multiplier("email"), 1.9)
+            self.assertEqual(db.get_task_multiplier.call_count, 2)
+
     def test_peak_window_ended(self):
         self.state.medication_time = datetime.now() - timedelta(hours=10)
         self.assertFalse(self.state.is_in_peak_window)
@@ -271,6 +728,24 @@ class TestUserState(unittest.TestCase):
         finally:
             os.unlink(tmp.name)
 
+    def test_snapshot_is_reused_until_a_field_changes(self):
+        first = self.state.snapshot()
+        with patch.object(type(self.state), "peak_window_status", new=property(lambda s: 1 / 0)):
+            self.assertEqual(self.state.snapshot(), first)  # served from cache, no recompute
+
+        self.state.energy_level = 9
+        self.assertEqual(self.state.snapshot()["energy_level"], 9)
+        self.state.add_mood_indicator("overwhelmed")
+        self.assertEqual(self.state.snapshot()["mood_indicators"], ["overwhelmed"])
+
+    def test_snapshot_expires_after_ttl(self):
+        from adhd_os.state import SNAPSHOT_TTL_SECONDS
+        with patch("adhd_os.state.time.monotonic", return_value=1000.0):
+            self.state.snapshot()
+        self.state.mood_indicators.append("untracked")  # bypasses invalidation
+        with patch("adhd_os.state.time.monotonic", return_value=1000.0 + SNAPSHOT_TTL_SECONDS):
+            self.assertEqual(self.state.snapshot()["mood_indicators"], ["untracked"])
+
 
 # ---------------------------------------------------------------------------
 # Machines (BodyDouble + FocusTimer)
@@ -297,6 +772,19 @@ class TestBodyDoubleMachine(unittest.TestCase):
         from adhd_os.infrastructure.machines import BodyDoubleState
         self.assertEqual(self.machine.state, BodyDoubleState.IDLE)
 
+    def test_checkin_messages_rotate(self):
+        self.machine.task = "taxes"
+        self.machine.duration_minutes = 60
+        self.machine.checkin_interval = 10
+        messages = []
+        for count in (1, 2, 3, 4):
+            self.machine.checkin_count = count
+            messages.append(self.machine._checkin_message())
+        self.assertEqual(messages[0], "Check-in 1/5: still on 'taxes'?")
+        self.assertEqual(messages[1], "20 minutes in. How's 'taxes' going?")
+        self.assertIn("Take a breath", messages[2])
+        self.assertEqual(messages[3], "Check-in 4/5: still on 'taxes'?")
+
     def test_get_status_idle(self):
         status = self.machine.get_status()
         self.assertEqual(status["state"], "idle")
@@ -501,6 +989,332 @@ class TestTFIDFCache(unittest.TestCase):
         finally:
             os.unlink(tmp.name)
 
+    def test_fuzzy_index_scores_match_dense_tfidf(self):
+        from adhd_os.infrastructure.cache import _FuzzyIndex, _cosine_similarity, _tfidf_vectors, _tokenize
+        descriptions = ["write unit tests", "write the quarterly report", "report bugs in tests", "email landlord"]
+        index = _FuzzyIndex(list(enumerate(descriptions)))
+        corpus = [_tokenize(d) for d in descriptions]
+        for query in ("write report report", "unit tests", "landlord email now"):
+            tokens = _tokenize(query)
+            q_vec, d_vecs = _tfidf_vectors(tokens, corpus)
+            scores = [_cosine_similarity(q_vec, d) for d in d_vecs]
+            score, best = index.best_match(tokens)
+            self.assertEqual(best, scores.index(max(scores)))
+            self.assertAlmostEqual(score, max(scores), places=9)
+        self.assertEqual(index.best_match(["passport"]), (0.0, None))
+
+    def test_fuzzy_index_is_built_once_per_store(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        try:
+            from adhd_os.infrastructure.database import DatabaseManager
+            from adhd_os.infrastructure import cache as cache_module
+            from adhd_os.models.schemas import DecompositionPlan
+            db = DatabaseManager(db_path=tmp.name)
+            plan = DecompositionPlan(
+                task_name="Clean kitchen",
+                original_estimate_minutes=20,
+                calibrated_estimate_minutes=30,
+                multiplier_applied=1.5,
+                steps=[{"step_number": 1, "action": "clear counter", "duration_minutes": 5, "energy_required": "low"}],
+                rabbit_hole_risks=[],
+                activation_phrase="Pick up one dish",
+            )
+            with patch.object(cache_module, "DB", db):
+                cache_module.TaskCache().store_with_energy("clean the kitchen counters", plan, 5)
+                cache = cache_module.TaskCache()
+                with patch.object(cache, "_fetch_all_cache_rows", wraps=cache._fetch_all_cache_rows) as fetch:
+                    self.assertIsNone(cache.get("renew passport", 5))
+                    self.assertEqual(cache.get("clean kitchen counters", 5).task_name, "Clean kitchen")
+                    self.assertEqual(fetch.call_count, 1)
+                    cache.store_with_energy("renew my passport", plan, 5)
+                    self.assertIsNotNone(cache.get("renew passport", 5))
+                    self.assertEqual(fetch.call_count, 2)
+
+                # A plan stored by another process shows up once the miss and index expire.
+                cache_module.TaskCache().store_with_energy("water the plants", plan, 5)
+                self.assertIsNone(cache.get("water plants", 5))
+                import time
+                clock = time.monotonic() + cache.INDEX_TTL_SECONDS + cache.MISS_TTL_SECONDS
+                with patch("adhd_os.infrastructure.cache.time.monotonic", lambda: clock):
+                    self.assertIsNotNone(cache.get("water plants", 5))
+        finally:
+            os.unlink(tmp.name)
+
+    def test_repeat_lookups_skip_sqlite(self):
+        """Exact hits and misses are memoized; a store replaces a remembered miss."""
+        from adhd_os.infrastructure.cache import TaskCache
+        from adhd_os.models.schemas import DecompositionPlan
+        db = MagicMock()
+        db.get_cached_plan_json.return_value = None
+        db.get_similar_tasks.return_value = []
+        with patch("adhd_os.infrastructure.cache.DB", db):
+            cache = TaskCache()
+            self.assertIsNone(cache.get("file taxes", 5))
+            self.assertIsNone(cache.get("file taxes", 5))
+            self.assertEqual(db.get_cached_plan_json.call_count, 1)
+
+            plan = DecompositionPlan(
+                task_name="File taxes",
+                original_estimate_minutes=60,
+                calibrated_estimate_minutes=90,
+                multiplier_applied=1.5,
+                steps=[{"step_number": 1, "action": "open portal", "duration_minutes": 5, "energy_required": "low"}],
+                rabbit_hole_risks=[],
+                activation_phrase="Open the portal",
+            )
+            cache.store_with_energy("file taxes", plan, 5)
+            self.assertIs(cache.get("file taxes", 5), plan)
+            self.assertEqual(db.get_cached_plan_json.call_count, 1)
+
+    def test_memo_evicts_by_size_and_age_and_counts_outcomes(self):
+        from adhd_os.infrastructure.cache import TaskCache
+        db = MagicMock()
+        db.get_cached_plan_json.return_value = None
+        clock = [0.0]
+        with patch("adhd_os.infrastructure.cache.DB", db), \
+             patch.object(TaskCache, "MAX_MEMO_ENTRIES", 2), \
+             patch("adhd_os.infrastructure.cache.time.monotonic", lambda: clock[0]), \
+             patch.object(TaskCache, "MISS_TTL_SECONDS", 50):
+            cache = TaskCache()
+            for task in ("file taxes", "email landlord", "book dentist"):
+                cache.get(task, 5)
+            self.assertEqual(cache.evictions, 1)  # oldest pushed out by size
+            clock[0] = 100.0
+            self.assertIsNone(cache.get("book dentist", 5))  # expired, so re-read
+            self.assertEqual(cache.evictions, 2)
+            self.assertEqual(db.get_cached_plan_json.call_count, 4)
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Tests for the agent reply cache and its model callbacks."""
+
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.tmp.close()
+        from adhd_os.infrastructure.database import DatabaseManager
+        self.db = DatabaseManager(db_path=self.tmp.name)
+        db_patch = patch("adhd_os.infrastructure.cache.DB", self.db)
+        db_patch.start()
+        self.addCleanup(db_patch.stop)
+
+    def tearDown(self):
+        os.unlink(self.tmp.name)
+
+    def test_repeat_phrasing_hits_within_energy_bucket(self):
+        from adhd_os.infrastructure.cache import ResponseCache
+        cache = ResponseCache()
+        cache.store("rsd_shield_agent", "My boss hates me.", 5, "That stings.")
+        self.assertEqual(cache.get("rsd_shield_agent", "my boss hates me", 6), "That stings.")
+        self.assertIsNone(cache.get("rsd_shield_agent", "my boss hates me", 2))
+        self.assertIsNone(cache.get("catastrophe_check_agent", "my boss hates me", 5))
+        self.assertIsNone(cache.get("rsd_shield_agent", "my friend ignored my text", 5))
+
+    def test_callbacks_store_then_short_circuit(self):
+        from types import SimpleNamespace
+        from google.adk.models.llm_request import LlmRequest
+        from google.adk.models.llm_response import LlmResponse
+        from google.genai import types
+        from adhd_os.agents.callbacks import (
+            response_cache_after_model,
+            response_cache_before_model,
+        )
+
+        user_content = types.Content(role="user", parts=[types.Part(text="I'm stuck starting my taxes")])
+        context = SimpleNamespace(
+            agent_name="task_initiation_agent", user_content=user_content,
+            invocation_id="inv-1", session=SimpleNamespace(events=[]),
+        )
+        request = LlmRequest(contents=[user_content])
+
+        self.assertIsNone(response_cache_before_model(context, request))
+        response_cache_after_model(
+            context,
+            LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Open the form.")])),
+        )
+
+        cached = response_cache_before_model(context, request)
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.content.parts[0].text, "Open the form.")
+
+    def test_tool_calls_are_not_cached(self):
+        from types import SimpleNamespace
+        from google.adk.models.llm_response import LlmResponse
+        from google.genai import types
+        from adhd_os.agents.callbacks import response_cache_after_model
+
+        user_content = types.Content(role="user", parts=[types.Part(text="I'm stuck starting my taxes")])
+        context = SimpleNamespace(
+            agent_name="task_initiation_agent", user_content=user_content,
+            invocation_id="inv-1", session=SimpleNamespace(events=[]),
+        )
+        response_cache_after_model(
+            context,
+            LlmResponse(content=types.Content(role="model", parts=[
+                types.Part(function_call=types.FunctionCall(name="get_user_state", args={}))
+            ])),
+        )
+        self.assertEqual(self.db.get_cached_responses("task_initiation_agent", "mid"), [])
+
+
+    def test_short_follow_ups_and_other_contexts_miss(self):
+        from adhd_os.infrastructure.cache import ResponseCache
+        cache = ResponseCache()
+        cache.store("rsd_shield_agent", "ok let's do it", 5, "Great, step one.")
+        self.assertIsNone(cache.get("rsd_shield_agent", "ok let's do it", 5))
+
+        cache.store(
+            "rsd_shield_agent", "my boss hates me", 5, "That stings.",
+            previous_reply="What happened at work?",
+        )
+        self.assertEqual(
+            cache.get("rsd_shield_agent", "my boss hates me", 5, previous_reply="What happened at work?"),
+            "That stings.",
+        )
+        self.assertIsNone(cache.get("rsd_shield_agent", "my boss hates me", 5))
+        self.assertIsNone(
+            cache.get("rsd_shield_agent", "my boss hates me", 5, previous_reply="How was the review?")
+        )
+
+    def test_replies_after_a_tool_ran_are_not_cached_or_served(self):
+        from types import SimpleNamespace
+        from google.adk.events import Event
+        from google.adk.models.llm_request import LlmRequest
+        from google.adk.models.llm_response import LlmResponse
+        from google.genai import types
+        from adhd_os.agents.callbacks import response_cache_after_model, response_cache_before_model
+
+        user_content = types.Content(role="user", parts=[types.Part(text="body double me for taxes")])
+        tool_call = Event(
+            invocation_id="inv-1", author="motivation_agent",
+            content=types.Content(role="model", parts=[
+                types.Part(function_call=types.FunctionCall(name="activate_body_double", args={}))
+            ]),
+        )
+        transfer = Event(
+            invocation_id="inv-2", author="orchestrator",
+            content=types.Content(role="model", parts=[
+                types.Part(function_call=types.FunctionCall(name="transfer_to_agent", args={}))
+            ]),
+        )
+        after_tool = SimpleNamespace(
+            agent_name="motivation_agent", user_content=user_content,
+            invocation_id="inv-1", session=SimpleNamespace(events=[tool_call]),
+        )
+        response_cache_after_model(after_tool, LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="Body double started for 25 min!")])
+        ))
+        self.assertEqual(self.db.get_cached_responses("motivation_agent", "mid"), [])
+
+        # Another agent's transfer call in the same invocation does not count.
+        fresh = SimpleNamespace(
+            agent_name="motivation_agent", user_content=user_content,
+            invocation_id="inv-2", session=SimpleNamespace(events=[tool_call, transfer]),
+        )
+        response_cache_after_model(fresh, LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="Let's make it a game.")])
+        ))
+        self.assertIsNotNone(response_cache_before_model(fresh, LlmRequest(contents=[user_content])))
+        self.assertIsNone(response_cache_before_model(after_tool, LlmRequest(contents=[user_content])))
+
+
+class TestAgentContextInjection(unittest.TestCase):
+    """Tests that time and user state are pre-injected instead of fetched by tool calls."""
+
+    def test_context_block_inserted_before_latest_user_turn(self):
+        import json
+        from google.adk.models.llm_request import LlmRequest
+        from google.genai import types
+        from adhd_os.agents.callbacks import inject_context_before_model
+        from adhd_os.state import USER_STATE
+
+        history = [
+            types.Content(role="user", parts=[types.Part(text="hi")]),
+            types.Content(role="model", parts=[types.Part(text="hello")]),
+        ]
+        user_content = types.Content(role="user", parts=[types.Part(text="help")])
+        request = LlmRequest(contents=[*history, user_content])
+
+        self.assertIsNone(inject_context_before_model(None, request))
+
+        # Earlier turns stay a stable prefix; the block sits before the latest turn.
+        self.assertEqual(request.contents[:2], history)
+        self.assertIs(request.contents[-1], user_content)
+        text = request.contents[2].parts[0].text
+        self.assertTrue(text.startswith("<context>") and text.endswith("</context>"))
+        payload = json.loads(text[len("<context>"):-len("</context>")])
+        self.assertIn("time", payload["now"])
+        self.assertEqual(payload["user_state"]["energy_level"], USER_STATE.energy_level)
+
+    def test_agents_no_longer_expose_time_and_state_tools(self):
+        from adhd_os.agents.orchestrator import get_orchestrator
+        orchestrator = get_orchestrator()
+        for agent in [orchestrator, *orchestrator.sub_agents]:
+            tool_names = {getattr(tool, "name", None) for tool in agent.tools}
+            self.assertNotIn("get_current_time", tool_names, agent.name)
+            self.assertNotIn("get_user_state", tool_names, agent.name)
+
+
+# ---------------------------------------------------------------------------
+# Model selection
+# ---------------------------------------------------------------------------
+class TestModelSelection(unittest.TestCase):
+    """Tests for config.get_model role routing."""
+
+    def test_env_is_parsed_once_into_typed_fields(self):
+        from adhd_os.envs import _load_env
+        with patch.dict(os.environ, {
+            "ADHD_OS_CORS_ORIGINS": "http://a.test, ,http://b.test",
+            "ADHD_OS_DEMO_MODE": "yes",
+            "ANTHROPIC_MAX_CONCURRENT": "not-a-number",
+        }):
+            env = _load_env()
+        self.assertEqual(env.cors_origins, ("http://a.test", "http://b.test"))
+        self.assertTrue(env.demo_mode)
+        self.assertEqual(env.anthropic_max_concurrent, 4)
+
+    def test_pattern_analysis_escalates_on_large_history(self):
+        from adhd_os.config import (
+            MODELS, ModelMode, PATTERN_ANALYSIS_ESCALATION_ROWS, get_model,
+        )
+        self.assertEqual(get_model("pattern_analysis"), MODELS["pattern_analysis_fast"])
+        self.assertEqual(
+            get_model("pattern_analysis", history_size=PATTERN_ANALYSIS_ESCALATION_ROWS - 1),
+            MODELS["pattern_analysis_fast"],
+        )
+        self.assertEqual(
+            get_model("pattern_analysis", history_size=PATTERN_ANALYSIS_ESCALATION_ROWS),
+            MODELS["pattern_analysis_quality"],
+        )
+        self.assertEqual(
+            get_model("pattern_analysis", ModelMode.QUALITY),
+            MODELS["pattern_analysis_quality"],
+        )
+
+    def test_pattern_analysis_model_is_chosen_per_run(self):
+        from types import SimpleNamespace
+        from google.adk.models.llm_request import LlmRequest
+        from adhd_os.agents import pattern_analysis
+        from adhd_os.config import MODELS, ModelMode, PATTERN_ANALYSIS_ESCALATION_ROWS
+
+        agent = pattern_analysis.build_pattern_analysis_agent()
+        context = SimpleNamespace(agent_name=agent.name)
+        for rows, role in ((3, "pattern_analysis_fast"), (PATTERN_ANALYSIS_ESCALATION_ROWS, "pattern_analysis_quality")):
+            request = LlmRequest(model=agent.canonical_model.model)
+            with patch.object(pattern_analysis.DB, "get_task_history_count", return_value=rows), \
+                    patch.object(pattern_analysis, "MODEL_MODE", ModelMode.PRODUCTION):
+                asyncio.run(pattern_analysis.route_model_before_model(context, request))
+            self.assertEqual(request.model, MODELS[role].split("/", 1)[1])
+
+    def test_decomposer_routes_by_mode(self):
+        from adhd_os.config import MODELS, ModelMode, get_model
+        self.assertEqual(get_model("decomposer"), MODELS["decomposer_fast"])
+        self.assertEqual(get_model("decomposer", ModelMode.QUALITY), MODELS["decomposer_quality"])
+        picks = {get_model("decomposer", ModelMode.AB_TEST) for _ in range(64)}
+        self.assertEqual(picks, {MODELS["decomposer_quality"], MODELS["decomposer_fast"]})
+        self.assertEqual(get_model("temporal", ModelMode.QUALITY), MODELS["temporal"])
+
 
 # ---------------------------------------------------------------------------
 # Dynamic multiplier ceiling (Improvement #9)
@@ -596,6 +1410,48 @@ class TestInputSanitization(unittest.TestCase):
         mock_start.assert_awaited_once_with("task", 5, 5)
         self.assertEqual(result["status"], "activating")
 
+    def test_current_time_is_computed_once_per_minute(self):
+        from adhd_os.tools import common
+        clock = [1_800_000_000.0]
+        with patch.object(common, "_time_cache", None), \
+             patch.object(common.time, "time", lambda: clock[0]), \
+             patch.object(common, "datetime", wraps=datetime) as dt:
+            first = common.get_current_time.func()
+            first["time"] = "mutated"
+            clock[0] += 30
+            self.assertNotEqual(common.get_current_time.func()["time"], "mutated")
+            self.assertEqual(dt.now.call_count, 1)
+            clock[0] += 60
+            common.get_current_time.func()
+            self.assertEqual(dt.now.call_count, 2)
+
+    def test_file_tools_stay_inside_project_root(self):
+        from adhd_os.tools import common
+        root = tempfile.mkdtemp()
+        with open(os.path.join(root, "notes.txt"), "w", encoding="utf-8") as f:
+            f.write("hello")
+        with patch.object(common, "_PROJECT_ROOT", os.path.realpath(root)):
+            self.assertEqual(common.safe_read_file.func("notes.txt"), "hello")
+            self.assertEqual(common.safe_list_dir.func("."), ["notes.txt"])
+            self.assertTrue(common.safe_read_file.func("../outside.txt").startswith("Error: Access denied"))
+            self.assertTrue(common.safe_list_dir.func("/")[0].startswith("Error: Access denied"))
+        os.unlink(os.path.join(root, "notes.txt"))
+        os.rmdir(root)
+
+    def test_fire_and_forget_holds_tasks_until_done(self):
+        from adhd_os.tools import common
+
+        async def scenario():
+            gate = asyncio.Event()
+            common._fire_and_forget(gate.wait())
+            held = len(common._background_tasks)
+            gate.set()
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            return held, len(common._background_tasks)
+
+        self.assertEqual(asyncio.run(scenario()), (1, 0))
+
 
 # ---------------------------------------------------------------------------
 # Session pruning (Improvement #6)
@@ -647,6 +1503,8 @@ class TestEventPersistence(unittest.TestCase):
             from adhd_os.infrastructure.database import DatabaseManager
             db = DatabaseManager(db_path=tmp.name)
             db.persist_bus_event("task_completed", '{"task": "test"}')
+            self.assertEqual(db._write_queue.qsize(), 1)  # queued, not written inline
+            db.flush_writes()
             with db.get_connection() as conn:
                 rows = conn.execute("SELECT event_type, data_json FROM bus_events").fetchall()
                 self.assertEqual(len(rows), 1)
@@ -654,6 +1512,186 @@ class TestEventPersistence(unittest.TestCase):
         finally:
             os.unlink(tmp.name)
 
+    def test_write_timestamps_are_local_iso(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        try:
+            from adhd_os.infrastructure.database import DatabaseManager
+            from adhd_os.infrastructure.persistence import SqliteSessionService
+            from google.adk.events import Event
+            db = DatabaseManager(db_path=tmp.name)
+            before = datetime.now() - timedelta(seconds=1)
+            db.persist_bus_event("task_completed", "{}")
+            db.flush_writes()
+            service = SqliteSessionService(db=db)
+
+            async def append():
+                session = await service.create_session(app_name="app", user_id="u")
+                await service.append_event(session, Event(author="user"))
+                return await service.get_session(app_name="app", user_id="u", session_id=session.id)
+
+            session = asyncio.run(append())
+            with db.get_connection() as conn:
+                bus_ts = conn.execute("SELECT timestamp FROM bus_events").fetchone()[0]
+            after = datetime.now() + timedelta(seconds=1)
+
+            self.assertTrue(before <= datetime.fromisoformat(bus_ts) <= after)
+            self.assertTrue(before.timestamp() <= session.last_update_time <= after.timestamp())
+        finally:
+            os.unlink(tmp.name)
+
+    def test_get_session_loads_only_adk_events_in_order(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        try:
+            from adhd_os.infrastructure.database import DatabaseManager
+            from adhd_os.infrastructure.persistence import SqliteSessionService
+            from google.adk.events import Event
+            db = DatabaseManager(db_path=tmp.name)
+            service = SqliteSessionService(db=db)
+
+            async def scenario():
+                session = await service.create_session(app_name="app", user_id="u")
+                await service.append_event(session, Event(author="user"))
+                with db.get_connection() as conn:
+                    conn.execute(
+                        "INSERT INTO events (session_id, type, data_json, timestamp) VALUES (?, ?, ?, ?)",
+                        (session.id, "note", "not an event", datetime.now().isoformat()),
+                    )
+                await service.append_event(session, Event(author="agent"))
+                return await service.get_session(app_name="app", user_id="u", session_id=session.id)
+
+            loaded = asyncio.run(scenario())
+            self.assertEqual([event.author for event in loaded.events], ["user", "agent"])
+        finally:
+            os.unlink(tmp.name)
+
+    def test_queued_appends_commit_in_one_transaction(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        try:
+            from adhd_os.infrastructure.database import DatabaseManager
+            from adhd_os.infrastructure.persistence import SqliteSessionService
+            from google.adk.events import Event
+            db = DatabaseManager(db_path=tmp.name)
+            service = SqliteSessionService(db=db)
+            statements = []
+
+            async def scenario():
+                session = await service.create_session(app_name="app", user_id="u")
+                with db.get_connection() as conn:
+                    conn.set_trace_callback(statements.append)
+                await service.append_events(session, [Event(author=a) for a in ("tool", "result")])
+                await service.append_event(session, Event(author="agent"))
+                await service.flush()
+                with db.get_connection() as conn:
+                    conn.set_trace_callback(None)
+                return session, await service.get_session(app_name="app", user_id="u", session_id=session.id)
+
+            session, loaded = asyncio.run(scenario())
+            self.assertEqual([e.author for e in session.events], ["tool", "result", "agent"])
+            self.assertEqual([e.author for e in loaded.events], ["tool", "result", "agent"])
+            self.assertEqual(sum(s.strip().upper().startswith("COMMIT") for s in statements), 1)
+        finally:
+            os.unlink(tmp.name)
+
+    def test_failed_appends_are_retried_in_order(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        try:
+            import sqlite3
+            from adhd_os.infrastructure.database import DatabaseManager
+            from adhd_os.infrastructure.persistence import SqliteSessionService
+            from google.adk.events import Event
+            db = DatabaseManager(db_path=tmp.name)
+            service = SqliteSessionService(db=db)
+            real_write = service._write_batch
+            failing = [True]
+
+            def flaky_write(batch):
+                if failing[0]:
+                    raise sqlite3.OperationalError("database is locked")
+                real_write(batch)
+
+            async def scenario():
+                session = await service.create_session(app_name="app", user_id="u")
+                with patch.object(service, "_write_batch", side_effect=flaky_write):
+                    await service.append_event(session, Event(author="user"))
+                    with self.assertRaises(RuntimeError):
+                        await service.flush()
+                    await service.append_event(session, Event(author="agent"))
+                    failing[0] = False
+                    await service.flush()
+                return await service.get_session(app_name="app", user_id="u", session_id=session.id)
+
+            loaded = asyncio.run(scenario())
+            self.assertEqual([e.author for e in loaded.events], ["user", "agent"])
+        finally:
+            os.unlink(tmp.name)
+
+    def test_append_touches_session_with_the_event_timestamp(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        try:
+            from adhd_os.infrastructure.database import DatabaseManager
+            from adhd_os.infrastructure.persistence import SqliteSessionService
+            from google.adk.events import Event
+            db = DatabaseManager(db_path=tmp.name)
+            service = SqliteSessionService(db=db)
+            stamp = datetime(2026, 5, 1, 9, 30).timestamp()
+
+            async def scenario():
+                session = await service.create_session(app_name="app", user_id="u")
+                await service.append_event(session, Event(author="user", timestamp=stamp - 60))
+                await service.append_event(session, Event(author="agent", timestamp=stamp))
+                return session, await service.get_session(app_name="app", user_id="u", session_id=session.id)
+
+            session, loaded = asyncio.run(scenario())
+            self.assertEqual(session.last_update_time, stamp)
+            self.assertEqual(loaded.last_update_time, stamp)
+        finally:
+            os.unlink(tmp.name)
+
+    def test_get_session_pushes_event_filters_into_sql(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        try:
+            from adhd_os.infrastructure.database import DatabaseManager
+            from adhd_os.infrastructure.persistence import SqliteSessionService
+            from google.adk.events import Event
+            from google.adk.sessions.base_session_service import GetSessionConfig
+            db = DatabaseManager(db_path=tmp.name)
+            service = SqliteSessionService(db=db)
+            base = datetime(2026, 5, 1, 9, 0).timestamp()
+
+            async def scenario():
+                session = await service.create_session(app_name="app", user_id="u")
+                for offset, author in enumerate(("a", "b", "c")):
+                    await service.append_event(session, Event(author=author, timestamp=base + offset))
+
+                async def authors(**kwargs):
+                    loaded = await service.get_session(
+                        app_name="app", user_id="u", session_id=session.id, **kwargs
+                    )
+                    return [event.author for event in loaded.events]
+
+                with patch("adhd_os.infrastructure.persistence.SESSION_EVENT_WINDOW", 2):
+                    default = await authors()
+                return (
+                    await authors(config=GetSessionConfig(num_recent_events=2)),
+                    await authors(config=GetSessionConfig(after_timestamp=base + 1)),
+                    await authors(load_events=False),
+                    default,
+                )
+
+            recent, after, none, default = asyncio.run(scenario())
+            self.assertEqual(default, ["b", "c"])
+            self.assertEqual(recent, ["b", "c"])
+            self.assertEqual(after, ["b", "c"])
+            self.assertEqual(none, [])
+        finally:
+            os.unlink(tmp.name)
+
     def test_publish_persists(self):
         """Calling EventBus.publish persists to DB."""
         tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
@@ -666,9 +1704,8 @@ class TestEventPersistence(unittest.TestCase):
             with patch("adhd_os.infrastructure.database.DB", db):
                 bus = EventBus()
                 asyncio.run(bus.publish(EventType.TASK_COMPLETED, {"x": 1}))
-                with db.get_connection() as conn:
-                    rows = conn.execute("SELECT event_type FROM bus_events").fetchall()
-                    self.assertEqual(len(rows), 1)
+                rows = db.get_recent_bus_events()  # reads flush queued writes first
+                self.assertEqual([row["event_type"] for row in rows], ["task_completed"])
         finally:
             os.unlink(tmp.name)
 
@@ -704,5 +1741,52 @@ class TestHealthEndpoint(unittest.TestCase):
         self.assertIn("Database unavailable", resp.json()["detail"])
 
 
+# ---------------------------------------------------------------------------
+# Anthropic rate limiting
+# ---------------------------------------------------------------------------
+class TestAdaptiveConcurrencyLimiter(unittest.IsolatedAsyncioTestCase):
+    """Tests for the AIMD concurrency cap and token bucket."""
+
+    def _limiter(self, max_concurrent=4, requests_per_minute=0):
+        from adhd_os.infrastructure.rate_limit import AdaptiveConcurrencyLimiter
+        self.now = 0.0
+        return AdaptiveConcurrencyLimiter(
+            max_concurrent, requests_per_minute, clock=lambda: self.now,
+        )
+
+    async def test_caps_concurrent_calls(self):
+        limiter = self._limiter(max_concurrent=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    async def test_rate_limit_halves_cap_then_recovers_additively(self):
+        limiter = self._limiter(max_concurrent=4)
+        limiter.record_rate_limited()
+        self.assertEqual(limiter.limit, 2)
+        self.now += limiter.BACKOFF_SECONDS
+        async with limiter.slot():
+            self.assertEqual(limiter.limit, 3)
+        self.now += 10 * limiter.BACKOFF_SECONDS
+        async with limiter.slot():
+            self.assertEqual(limiter.limit, 4)
+
+    async def test_token_bucket_reports_wait_when_empty(self):
+        limiter = self._limiter(requests_per_minute=60)
+        for _ in range(60):
+            self.assertEqual(limiter._take_token(), 0.0)
+        self.assertAlmostEqual(limiter._take_token(), 1.0)
+        self.now += 1.0
+        self.assertEqual(limiter._take_token(), 0.0)
+
+
 if __name__ == "__main__":
     unittest.main()